@@ -0,0 +1,335 @@
+import logging
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from postgres_setup import PostgresConnector
+from query_cache import ALL_TABLES
+
+
+"""Consultas analíticas do notebook AnaliseDados_BancoFicticio.ipynb, lidas das tabelas base"""
+
+CONSULTA_VOLUME_POR_TIPO = """
+WITH volume_por_tipo AS (
+    SELECT
+        tipo_dado,
+        latencia,
+        SUM(volume) as volume_total,
+        COUNT(*) as qtd_fontes,
+        AVG(volume) as volume_medio
+    FROM dados_origem
+    GROUP BY tipo_dado, latencia
+)
+SELECT
+    tipo_dado,
+    latencia,
+    volume_total,
+    qtd_fontes,
+    volume_medio,
+    ROUND((volume_total * 100.0 / SUM(volume_total) OVER ()), 2) as porcentagem_total
+FROM volume_por_tipo
+ORDER BY volume_total DESC;"""
+
+CONSULTA_FLUXOS_MENSAIS = """
+WITH fluxos_mensais AS (
+    SELECT
+        DATE_TRUNC('month', data_atualizacao) as mes,
+        COUNT(*) as novos_fluxos,
+        COUNT(*) FILTER (WHERE status = 'ativo') as fluxos_ativos
+    FROM fluxo_dados
+    GROUP BY DATE_TRUNC('month', data_atualizacao)
+)
+SELECT
+    TO_CHAR(mes, 'Month') as nome_mes,
+    novos_fluxos,
+    fluxos_ativos,
+    SUM(novos_fluxos) OVER (ORDER BY mes) as total_acumulado,
+    ROUND(AVG(novos_fluxos) OVER (ORDER BY mes ROWS BETWEEN 2 PRECEDING AND CURRENT ROW), 2) as media_movel_3m
+FROM fluxos_mensais
+ORDER BY mes;
+"""
+
+CONSULTA_DESEMPENHO_ANALISTAS = """
+SELECT
+    a.responsavel,
+    COUNT(*) as total_analises,
+    COUNT(DISTINCT a.id_fluxo) as fluxos_distintos,
+    COUNT(DISTINCT d.tipo_dado) as tipos_dados_analisados,
+    MAX(a.data_analise) as ultima_analise,
+    MIN(a.data_analise) as primeira_analise,
+    DATE_PART('day', MAX(a.data_analise) - MIN(a.data_analise)) as dias_atuando
+FROM analises a
+JOIN fluxo_dados f ON a.id_fluxo = f.id_fluxo
+JOIN dados_origem d ON f.id_origem = d.id_origem
+GROUP BY a.responsavel
+ORDER BY total_analises DESC;
+"""
+
+CONSULTAS_NOTEBOOK = {
+    'volume_por_tipo': CONSULTA_VOLUME_POR_TIPO,
+    'fluxos_mensais': CONSULTA_FLUXOS_MENSAIS,
+    'desempenho_analistas': CONSULTA_DESEMPENHO_ANALISTAS
+}
+
+
+"""Tabelas de resumo; chaves NULL são gravadas como sentinelas ('' ou -infinity) para caberem na PK"""
+
+CREATE_RESUMOS_SQL = {
+    'resumo_watermarks': """
+    CREATE TABLE IF NOT EXISTS resumo_watermarks (
+        tabela VARCHAR(63) PRIMARY KEY,
+        ultimo_id BIGINT NOT NULL DEFAULT 0
+    );
+    """,
+
+    'resumo_volume_tipo': """
+    CREATE TABLE IF NOT EXISTS resumo_volume_tipo (
+        tipo_dado VARCHAR(100) NOT NULL,
+        latencia VARCHAR(50) NOT NULL,
+        volume_total NUMERIC NOT NULL DEFAULT 0,
+        qtd_volume BIGINT NOT NULL DEFAULT 0,
+        qtd_fontes BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (tipo_dado, latencia)
+    );
+    """,
+
+    'resumo_fluxo_mensal': """
+    CREATE TABLE IF NOT EXISTS resumo_fluxo_mensal (
+        mes TIMESTAMP PRIMARY KEY,
+        novos_fluxos BIGINT NOT NULL DEFAULT 0,
+        fluxos_ativos BIGINT NOT NULL DEFAULT 0
+    );
+    """,
+
+    'resumo_analista': """
+    CREATE TABLE IF NOT EXISTS resumo_analista (
+        responsavel VARCHAR(255) PRIMARY KEY,
+        total_analises BIGINT NOT NULL DEFAULT 0,
+        fluxos_distintos BIGINT NOT NULL DEFAULT 0,
+        tipos_dados_analisados BIGINT NOT NULL DEFAULT 0,
+        primeira_analise TIMESTAMP,
+        ultima_analise TIMESTAMP
+    );
+    ALTER TABLE resumo_analista
+        ADD COLUMN IF NOT EXISTS fluxos_distintos BIGINT NOT NULL DEFAULT 0,
+        ADD COLUMN IF NOT EXISTS tipos_dados_analisados BIGINT NOT NULL DEFAULT 0;
+    """,
+
+    # Pares já contados: só servem para deduplicar os contadores de resumo_analista
+    'resumo_analista_fluxo': """
+    CREATE TABLE IF NOT EXISTS resumo_analista_fluxo (
+        responsavel VARCHAR(255) NOT NULL,
+        id_fluxo INTEGER NOT NULL,
+        PRIMARY KEY (responsavel, id_fluxo)
+    );
+    """,
+
+    'resumo_analista_tipo': """
+    CREATE TABLE IF NOT EXISTS resumo_analista_tipo (
+        responsavel VARCHAR(255) NOT NULL,
+        tipo_dado VARCHAR(100) NOT NULL,
+        PRIMARY KEY (responsavel, tipo_dado)
+    );
+    """
+}
+
+TABELAS_BASE = {'dados_origem': 'id_origem', 'fluxo_dados': 'id_fluxo', 'analises': 'id_analise'}
+
+
+""" Agregação incremental de cada tabela base: só processa IDs em (%(de)s, %(ate)s].
+
+Os pares (responsavel, fluxo/tipo) novos, devolvidos pelo ON CONFLICT DO
+NOTHING, incrementam os contadores distintos na linha do analista.
+"""
+
+REFRESH_SQL = {
+    'dados_origem': ["""
+    INSERT INTO resumo_volume_tipo AS r (tipo_dado, latencia, volume_total, qtd_volume, qtd_fontes)
+    SELECT tipo_dado, COALESCE(latencia, ''), COALESCE(SUM(volume), 0), COUNT(volume), COUNT(*)
+    FROM dados_origem
+    WHERE id_origem > %(de)s AND id_origem <= %(ate)s
+    GROUP BY tipo_dado, COALESCE(latencia, '')
+    ON CONFLICT (tipo_dado, latencia) DO UPDATE SET
+        volume_total = r.volume_total + EXCLUDED.volume_total,
+        qtd_volume = r.qtd_volume + EXCLUDED.qtd_volume,
+        qtd_fontes = r.qtd_fontes + EXCLUDED.qtd_fontes;
+    """],
+
+    'fluxo_dados': ["""
+    INSERT INTO resumo_fluxo_mensal AS r (mes, novos_fluxos, fluxos_ativos)
+    SELECT
+        COALESCE(DATE_TRUNC('month', data_atualizacao), '-infinity'::timestamp),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE status = 'ativo')
+    FROM fluxo_dados
+    WHERE id_fluxo > %(de)s AND id_fluxo <= %(ate)s
+    GROUP BY 1
+    ON CONFLICT (mes) DO UPDATE SET
+        novos_fluxos = r.novos_fluxos + EXCLUDED.novos_fluxos,
+        fluxos_ativos = r.fluxos_ativos + EXCLUDED.fluxos_ativos;
+    """],
+
+    'analises': ["""
+    INSERT INTO resumo_analista AS r (responsavel, total_analises, primeira_analise, ultima_analise)
+    SELECT COALESCE(responsavel, ''), COUNT(*), MIN(data_analise), MAX(data_analise)
+    FROM analises
+    WHERE id_analise > %(de)s AND id_analise <= %(ate)s
+    GROUP BY 1
+    ON CONFLICT (responsavel) DO UPDATE SET
+        total_analises = r.total_analises + EXCLUDED.total_analises,
+        primeira_analise = LEAST(r.primeira_analise, EXCLUDED.primeira_analise),
+        ultima_analise = GREATEST(r.ultima_analise, EXCLUDED.ultima_analise);
+    """, """
+    WITH novos AS (
+        INSERT INTO resumo_analista_fluxo (responsavel, id_fluxo)
+        SELECT DISTINCT COALESCE(responsavel, ''), id_fluxo
+        FROM analises
+        WHERE id_analise > %(de)s AND id_analise <= %(ate)s
+        ON CONFLICT DO NOTHING
+        RETURNING responsavel
+    )
+    UPDATE resumo_analista r SET fluxos_distintos = r.fluxos_distintos + n.qtd
+    FROM (SELECT responsavel, COUNT(*) AS qtd FROM novos GROUP BY responsavel) n
+    WHERE r.responsavel = n.responsavel;
+    """, """
+    WITH novos AS (
+        INSERT INTO resumo_analista_tipo (responsavel, tipo_dado)
+        SELECT DISTINCT COALESCE(a.responsavel, ''), d.tipo_dado
+        FROM analises a
+        JOIN fluxo_dados f ON a.id_fluxo = f.id_fluxo
+        JOIN dados_origem d ON f.id_origem = d.id_origem
+        WHERE a.id_analise > %(de)s AND a.id_analise <= %(ate)s
+        ON CONFLICT DO NOTHING
+        RETURNING responsavel
+    )
+    UPDATE resumo_analista r SET tipos_dados_analisados = r.tipos_dados_analisados + n.qtd
+    FROM (SELECT responsavel, COUNT(*) AS qtd FROM novos GROUP BY responsavel) n
+    WHERE r.responsavel = n.responsavel;
+    """]
+}
+
+
+class ResumosAnaliticos:
+    """Resumos das análises do notebook mantidos incrementalmente por faixa de IDs.
+
+    Cada atualização agrega apenas as linhas com ID acima do watermark de cada
+    tabela base, então a leitura dos resumos custa O(grupos) e não O(linhas).
+    Os resumos acompanham inserções; linhas alteradas ou removidas nas tabelas
+    base exigem reconstruir(). Cargas concorrentes que confirmam IDs menores
+    depois de uma atualização também devem ser seguidas de reconstruir().
+    """
+
+    def __init__(self, connector: PostgresConnector):
+        self.connector = connector
+
+    """Cria as tabelas de resumo e os watermarks, se ainda não existirem; resumos criados antes dos contadores distintos exigem reconstruir()"""
+
+    def criar(self) -> None:
+        for tabela, sql in CREATE_RESUMOS_SQL.items():
+            logging.info("Creating summary table: %s", tabela)
+            self.connector.execute_query(sql, return_data=False)
+
+    """Agrega as linhas novas de cada tabela base e avança os watermarks; retorna as faixas processadas"""
+
+    def atualizar(self) -> Dict[str, tuple]:
+        faixas = {}
+        with self.connector.connection() as conn:
+            with conn.cursor() as cur:
+                for tabela, coluna in TABELAS_BASE.items():
+                    cur.execute(
+                        "INSERT INTO resumo_watermarks (tabela) VALUES (%s) ON CONFLICT DO NOTHING",
+                        (tabela,)
+                    )
+                    # FOR UPDATE serializa atualizações concorrentes do mesmo resumo
+                    cur.execute(
+                        "SELECT ultimo_id FROM resumo_watermarks WHERE tabela = %s FOR UPDATE",
+                        (tabela,)
+                    )
+                    de = cur.fetchone()[0]
+                    cur.execute(f"SELECT COALESCE(MAX({coluna}), 0) FROM {tabela}")
+                    ate = cur.fetchone()[0]
+                    if ate <= de:
+                        continue
+
+                    for sql in REFRESH_SQL[tabela]:
+                        cur.execute(sql, {'de': de, 'ate': ate})
+                    cur.execute(
+                        "UPDATE resumo_watermarks SET ultimo_id = %s WHERE tabela = %s",
+                        (ate, tabela)
+                    )
+                    faixas[tabela] = (de, ate)
+
+        if faixas:
+            logging.info("Summary tables refreshed: %s", faixas)
+            self.connector.notify_write(CREATE_RESUMOS_SQL)
+        return faixas
+
+    """Apaga os resumos e os recalcula do zero"""
+
+    def reconstruir(self) -> Dict[str, tuple]:
+        self.connector.execute_query(
+            f"TRUNCATE {', '.join(CREATE_RESUMOS_SQL)};", return_data=False
+        )
+        return self.atualizar()
+
+    """Ouvinte de escrita: atualiza os resumos quando uma tabela base é gravada"""
+
+    def ao_escrever(self, tabelas: Iterable[str]) -> None:
+        tabelas = set(tabelas)
+        if ALL_TABLES in tabelas or tabelas & set(TABELAS_BASE):
+            self.atualizar()
+
+    """Atualiza os resumos automaticamente após insert_data/execute_query do conector e cargas do gerador"""
+
+    def registrar(self, generator: Optional[object] = None) -> None:
+        self.connector.add_write_listener(self.ao_escrever)
+        # Um gerador criado com conector=self.connector já repassa suas cargas aos ouvintes do conector
+        if generator is not None and getattr(generator, 'conector', None) is not self.connector:
+            generator.ouvintes_escrita.append(self.ao_escrever)
+
+    """Volume por tipo de dado e latência (consulta 1 do notebook)"""
+
+    def volume_por_tipo(self) -> pd.DataFrame:
+        return self.connector.execute_query("""
+        SELECT
+            tipo_dado,
+            NULLIF(latencia, '') as latencia,
+            CASE WHEN qtd_volume > 0 THEN volume_total END as volume_total,
+            qtd_fontes,
+            volume_total / NULLIF(qtd_volume, 0) as volume_medio,
+            ROUND((volume_total * 100.0 / SUM(volume_total) OVER ()), 2) as porcentagem_total
+        FROM resumo_volume_tipo
+        ORDER BY volume_total DESC;
+        """)
+
+    """Fluxos por mês com total acumulado e média móvel trimestral (consulta 2 do notebook)"""
+
+    def fluxos_mensais(self) -> pd.DataFrame:
+        return self.connector.execute_query("""
+        SELECT
+            TO_CHAR(NULLIF(mes, '-infinity'::timestamp), 'Month') as nome_mes,
+            novos_fluxos,
+            fluxos_ativos,
+            SUM(novos_fluxos) OVER (ORDER BY NULLIF(mes, '-infinity'::timestamp)) as total_acumulado,
+            ROUND(AVG(novos_fluxos) OVER (
+                ORDER BY NULLIF(mes, '-infinity'::timestamp) ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
+            ), 2) as media_movel_3m
+        FROM resumo_fluxo_mensal
+        ORDER BY NULLIF(mes, '-infinity'::timestamp);
+        """)
+
+    """Atividade por responsável (consulta 3 do notebook)"""
+
+    def desempenho_analistas(self) -> pd.DataFrame:
+        return self.connector.execute_query("""
+        SELECT
+            NULLIF(r.responsavel, '') as responsavel,
+            r.total_analises,
+            r.fluxos_distintos,
+            r.tipos_dados_analisados,
+            r.ultima_analise,
+            r.primeira_analise,
+            DATE_PART('day', r.ultima_analise - r.primeira_analise) as dias_atuando
+        FROM resumo_analista r
+        ORDER BY r.total_analises DESC;
+        """)
@@ -0,0 +1,201 @@
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import QueueHandler, RotatingFileHandler
+from typing import Optional
+
+
+class TruncarMensagens(logging.Filter):
+    """Corta mensagens longas (ex.: o texto completo de uma query) antes da gravação.
+
+    Fica no handler de destino, então getMessage() roda na thread do escritor e
+    não na thread que executou a query.
+    """
+
+    def __init__(self, max_caracteres: int = 2000):
+        super().__init__()
+        self.max_caracteres = max_caracteres
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        mensagem = record.getMessage()
+        if len(mensagem) > self.max_caracteres:
+            record.msg = f"{mensagem[:self.max_caracteres]}... [{len(mensagem) - self.max_caracteres} caracteres omitidos]"
+            record.args = None
+        return True
+
+class FilaNaoBloqueante(QueueHandler):
+    """QueueHandler que nunca bloqueia quem loga: com a fila cheia o registro é descartado e contado.
+
+    O registro vai para a fila sem ser formatado (só threads do mesmo processo o
+    consomem), então a formatação também sai do caminho da query.
+    """
+
+    def __init__(self, fila: queue.Queue):
+        super().__init__(fila)
+        self.descartados = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+class ArquivoRotativoEmLote(RotatingFileHandler):
+    """RotatingFileHandler que não faz flush a cada registro; o escritor chama flush_lote()"""
+
+    def flush(self) -> None:
+        pass
+
+    def flush_lote(self) -> None:
+        super().flush()
+
+    def close(self) -> None:
+        self.flush_lote()
+        super().close()
+
+_FIM = object()
+
+
+class EscritorLogAssincrono:
+    """Thread que esvazia a fila de logs em lotes e grava no handler de destino.
+
+    Cada lote tem até tamanho_lote registros e termina com um único flush; sem
+    registros novos, o buffer é descarregado a cada intervalo_flush segundos.
+    """
+
+    def __init__(
+        self,
+        handler: logging.Handler,
+        tamanho_fila: int = 10000,
+        tamanho_lote: int = 256,
+        intervalo_flush: float = 1.0
+    ):
+        if tamanho_lote < 1:
+            raise ValueError("tamanho_lote deve ser positivo")
+
+        self.handler = handler
+        self.fila: queue.Queue = queue.Queue(maxsize=tamanho_fila)
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_flush = intervalo_flush
+        self.queue_handler = FilaNaoBloqueante(self.fila)
+        self._thread: Optional[threading.Thread] = None
+
+    def _descarregar(self) -> None:
+        flush = getattr(self.handler, 'flush_lote', self.handler.flush)
+        flush()
+
+    def _executar(self) -> None:
+        while True:
+            try:
+                registro = self.fila.get(timeout=self.intervalo_flush)
+            except queue.Empty:
+                self._descarregar()
+                continue
+
+            lote = [registro]
+            while len(lote) < self.tamanho_lote:
+                try:
+                    lote.append(self.fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            for registro in lote:
+                if registro is _FIM:
+                    self._descarregar()
+                    return
+                try:
+                    self.handler.handle(registro)
+                except Exception:
+                    self.handler.handleError(registro)
+            self._descarregar()
+
+    def iniciar(self) -> 'EscritorLogAssincrono':
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name='async_logging', daemon=True)
+            self._thread.start()
+        return self
+
+    """Grava o que restou na fila e encerra a thread"""
+
+    def parar(self) -> None:
+        if self._thread is None:
+            return
+        # put bloqueante: o marcador de fim não pode ser descartado com a fila cheia
+        self.fila.put(_FIM)
+        self._thread.join()
+        self._thread = None
+        self.handler.close()
+
+_lock = threading.Lock()
+_ativo: Optional[EscritorLogAssincrono] = None
+_configuracao_ativa: Optional[tuple] = None
+
+
+""" Instala no logger raiz um QueueHandler não bloqueante com escrita em lote e rotação por tamanho.
+
+Idempotente para a mesma configuração (vários conectores compartilham o
+escritor); uma configuração diferente substitui a anterior. Handlers de
+arquivo do logger raiz que escrevem no mesmo arquivo são removidos para não
+duplicar linhas.
+"""
+
+def configurar_log_assincrono(
+    arquivo: str,
+    nivel: int = logging.INFO,
+    formato: str = '%(asctime)s - %(levelname)s - %(message)s',
+    max_bytes: int = 10 * 2 ** 20,
+    backup_count: int = 5,
+    tamanho_fila: int = 10000,
+    tamanho_lote: int = 256,
+    intervalo_flush: float = 1.0,
+    max_caracteres: int = 2000
+    ) -> EscritorLogAssincrono:
+    global _ativo, _configuracao_ativa
+
+    configuracao = (arquivo, nivel, formato, max_bytes, backup_count,
+                    tamanho_fila, tamanho_lote, intervalo_flush, max_caracteres)
+    with _lock:
+        if _ativo is not None and _configuracao_ativa == configuracao:
+            return _ativo
+        _parar_ativo()
+
+        handler = ArquivoRotativoEmLote(
+            arquivo, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True
+        )
+        handler.setFormatter(logging.Formatter(formato))
+        escritor = EscritorLogAssincrono(handler, tamanho_fila, tamanho_lote, intervalo_flush)
+        handler.addFilter(TruncarMensagens(max_caracteres))
+
+        raiz = logging.getLogger()
+        for existente in list(raiz.handlers):
+            if isinstance(existente, logging.FileHandler) and existente.baseFilename == handler.baseFilename:
+                raiz.removeHandler(existente)
+                existente.close()
+        raiz.addHandler(escritor.queue_handler)
+        if raiz.getEffectiveLevel() > nivel:
+            raiz.setLevel(nivel)
+
+        _ativo = escritor.iniciar()
+        _configuracao_ativa = configuracao
+        return _ativo
+
+def _parar_ativo() -> None:
+    global _ativo, _configuracao_ativa
+    if _ativo is None:
+        return
+    logging.getLogger().removeHandler(_ativo.queue_handler)
+    _ativo.parar()
+    _ativo = None
+    _configuracao_ativa = None
+
+"""Remove o handler assíncrono do logger raiz, gravando os registros pendentes"""
+
+def parar_log_assincrono() -> None:
+    with _lock:
+        _parar_ativo()
+
+atexit.register(parar_log_assincrono)
@@ -0,0 +1,94 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from postgres_setup import PostgresConnector
+
+
+Consulta = Union[str, Tuple[str, Optional[tuple]]]
+
+class AsyncPostgresConnector:
+    """Variante asyncio do PostgresConnector para consultas analíticas concorrentes.
+
+    O psycopg2 é bloqueante, então cada chamada roda em uma thread dedicada com
+    uma conexão própria do pool. O executor tem o mesmo tamanho máximo do pool,
+    de modo que nenhuma chamada fica presa esperando conexão.
+    """
+
+    def __init__(
+        self,
+        dbname: str,
+        user: str,
+        password: str,
+        host: str = 'localhost',
+        port: str = '5432',
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_idle_timeout: float = 300.0
+    ):
+        self.connector = PostgresConnector(
+            dbname,
+            user,
+            password,
+            host,
+            port,
+            use_pool=True,
+            pool_min_size=pool_min_size,
+            pool_max_size=pool_max_size,
+            pool_idle_timeout=pool_idle_timeout
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_max_size,
+            thread_name_prefix='async_postgres'
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    """Executa uma chamada bloqueante do conector em uma thread do executor"""
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def execute_query(
+        self,
+        query: str,
+        params: tuple = None,
+        return_data: bool = True
+    ) -> Optional[pd.DataFrame]:
+        return await self._run(self.connector.execute_query, query, params, return_data)
+
+    async def create_database_tables(self) -> None:
+        await self._run(self.connector.create_database_tables)
+
+    async def insert_data(self, table: str, data: Dict) -> pd.DataFrame:
+        return await self._run(self.connector.insert_data, table, data)
+
+    async def get_table_info(self, table: str) -> pd.DataFrame:
+        return await self._run(self.connector.get_table_info, table)
+
+    """Executa as consultas concorrentemente e retorna os DataFrames na mesma ordem.
+
+    Cada consulta pode ser a string SQL ou uma tupla (query, params). O tempo
+    total tende ao da consulta mais lenta, limitado pelo tamanho do pool.
+    """
+
+    async def gather(self, queries: Sequence[Consulta]) -> List[pd.DataFrame]:
+        tarefas = []
+        for consulta in queries:
+            query, params = (consulta, None) if isinstance(consulta, str) else consulta
+            tarefas.append(self.execute_query(query, params))
+        return list(await asyncio.gather(*tarefas))
+
+    """Fecha o executor e as conexões do pool"""
+
+    async def close(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self.connector.close()
@@ -0,0 +1,50 @@
+"""Compara o throughput (linhas/s) de inserir_dados_no_banco com executemany e com COPY,
+com e sem carga_massiva (índices secundários e FKs refeitos no fim).
+
+Os dados são gravados de verdade: rode contra um banco de testes.
+
+Uso:
+    python benchmarks/bench_carga.py --origem 1000 --fluxo 2000 --analises 3000 [--carga-massiva]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_random_data import DbConfig, DataGenerator
+from bench_pool import credenciais
+
+
+def medir(generator: DataGenerator, metodo: str, args, carga_massiva: bool = False) -> None:
+    # A geração fica fora da medição: apenas a carga é cronometrada
+    generator.gerar_dados_origem(args.origem)
+    generator.gerar_fluxo_dados(args.fluxo)
+    generator.gerar_analises(args.analises)
+    total = args.origem + args.fluxo + args.analises
+
+    inicio = time.perf_counter()
+    generator.inserir_dados_no_banco(metodo=metodo, carga_massiva=carga_massiva)
+    duracao = time.perf_counter() - inicio
+
+    nome = f"{metodo}+massiva" if carga_massiva else metodo
+    print(f"{nome:<20} {total} linhas em {duracao:8.3f} s  ({total / duracao:12,.0f} linhas/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--origem', type=int, default=1000)
+    parser.add_argument('--fluxo', type=int, default=2000)
+    parser.add_argument('--analises', type=int, default=3000)
+    parser.add_argument('--carga-massiva', action='store_true', help='mede também com índices/FKs adiados')
+    args = parser.parse_args()
+
+    with DataGenerator(DbConfig(**credenciais())) as generator:
+        for metodo in ('executemany', 'copy'):
+            medir(generator, metodo, args)
+            if args.carga_massiva:
+                medir(generator, metodo, args, carga_massiva=True)
+
+
+if __name__ == '__main__':
+    main()
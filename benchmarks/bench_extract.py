@@ -0,0 +1,61 @@
+"""Compara a leitura de uma tabela inteira via execute_query (read_sql ou COPY) com a extração paralela por faixas.
+
+A extração paralela só escala com núcleos livres no cliente e no servidor:
+em uma máquina de um núcleo os processos de decodificação só somam custo.
+
+Uso:
+    python benchmarks/bench_extract.py --tabela analises --workers 1 2 4 8
+    python benchmarks/bench_extract.py --tabela fluxo_dados --coluna data_criacao
+    python benchmarks/bench_extract.py --tabela fluxo_dados --copy-format binary csv --workers 1
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_pool import credenciais
+from postgres_setup import PostgresConnector
+
+
+def medir(nome: str, funcao) -> None:
+    inicio = time.perf_counter()
+    linhas = len(funcao())
+    segundos = time.perf_counter() - inicio
+    print(f"{nome:<32} {segundos:8.3f} s  {linhas / segundos:14,.0f} linhas/s  ({linhas} linhas)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tabela', default='analises')
+    parser.add_argument('--coluna', default=None, help='coluna de partição (padrão: chave primária)')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--faixas-por-worker', type=int, default=2)
+    parser.add_argument('--copy-format', nargs='+', default=['auto'], choices=['auto', 'binary', 'csv'])
+    args = parser.parse_args()
+    # read_sql_query avisa a cada chamada com conexão psycopg2
+    warnings.filterwarnings('ignore', message='pandas only supports SQLAlchemy')
+
+    connector = PostgresConnector(**credenciais(), use_pool=True, pool_max_size=max(args.workers))
+    try:
+        medir('execute_query', lambda: connector.execute_query(f"SELECT * FROM {args.tabela}"))
+        for copy_format in args.copy_format:
+            medir(f"execute_query copy={copy_format}", lambda: connector.execute_query(
+                f"SELECT * FROM {args.tabela}", copy_format=copy_format
+            ))
+        for copy_format in args.copy_format:
+            for workers in args.workers:
+                medir(f"parallel_extract {copy_format} workers={workers}", lambda: connector.parallel_extract(
+                    args.tabela,
+                    partition_column=args.coluna,
+                    workers=workers,
+                    partitions=workers * args.faixas_por_worker,
+                    copy_format=copy_format
+                ))
+    finally:
+        connector.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""Mede as consultas do notebook com EXPLAIN ANALYZE sem e com os índices de desempenho.
+
+Uso:
+    python benchmarks/bench_indices.py --repeticoes 5
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_pool import credenciais
+from postgres_setup import PostgresConnector
+from schema_advisor import comparar_planos, remover_indices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--planos', action='store_true', help='mostra os nós do plano antes/depois')
+    args = parser.parse_args()
+
+    connector = PostgresConnector(**credenciais())
+    remover_indices(connector)
+    comparacao = comparar_planos(connector, repeticoes=args.repeticoes)
+
+    with pd.option_context('display.width', 200, 'display.max_columns', None, 'display.max_colwidth', 120):
+        print(comparacao[['consulta', 'antes_ms', 'depois_ms', 'speedup', 'blocos_antes', 'blocos_depois']])
+        if args.planos:
+            for linha in comparacao.itertuples():
+                print(f"\n{linha.consulta}\n  antes:  {linha.nos_antes}\n  depois: {linha.nos_depois}")
+
+if __name__ == '__main__':
+    main()
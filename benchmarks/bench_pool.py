@@ -0,0 +1,63 @@
+"""Compara a latência por query do PostgresConnector com e sem pool de conexões.
+
+Uso:
+    python benchmarks/bench_pool.py --queries 500
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from postgres_setup import PostgresConnector
+
+
+def credenciais() -> dict:
+    load_dotenv()
+    return {
+        'dbname': os.getenv('DB_NAME', 'smart_data_db'),
+        'user': os.getenv('DB_USER', 'postgres'),
+        'password': os.getenv('DB_PASSWORD', 'postgres'),
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'port': os.getenv('DB_PORT', '5432')
+    }
+
+def medir(connector: PostgresConnector, num_queries: int) -> list:
+    latencias = []
+    for _ in range(num_queries):
+        inicio = time.perf_counter()
+        connector.execute_query("SELECT 1", return_data=False)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return latencias
+
+def resumo(nome: str, latencias: list) -> None:
+    ordenadas = sorted(latencias)
+    p99 = ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * 0.99))]
+    print(
+        f"{nome:<10} média={statistics.mean(latencias):8.3f} ms  "
+        f"p50={statistics.median(latencias):8.3f} ms  p99={p99:8.3f} ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+
+    creds = credenciais()
+
+    sem_pool = PostgresConnector(**creds)
+    resumo('sem pool', medir(sem_pool, args.queries))
+
+    com_pool = PostgresConnector(**creds, use_pool=True)
+    try:
+        resumo('com pool', medir(com_pool, args.queries))
+    finally:
+        com_pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+"""Suíte de benchmarks: geração, carga, execute_query e consultas do notebook em vários tamanhos.
+
+Cada tamanho é o total de linhas, dividido 1:2:3 entre dados_origem, fluxo_dados
+e analises (as proporções dos padrões do gerador). Para cada etapa registra
+linhas/s, pico de RSS e, nas etapas de consulta, latências p50/p99. A execução
+é acrescentada ao histórico JSON e comparada com a baseline: etapas mais lentas,
+com p99 ou RSS maiores que a tolerância são marcadas como regressão (saída 1).
+
+Os dados são gravados em um banco próprio da suíte (--banco, padrão
+<DB_NAME>_bench, criado se não existir), esvaziado antes de cada tamanho: as
+consultas medem exatamente as linhas do tamanho, e cada resultado guarda a
+contagem real das tabelas. Só resultados com as mesmas contagens são comparados
+com a baseline. Tamanhos grandes (10M) exigem memória para os DataFrames de uma vez.
+
+Uso:
+    python benchmarks/bench_suite.py --tamanhos 1000 10000 100000
+    python benchmarks/bench_suite.py --tamanhos 1000 10000 --salvar-baseline
+    python benchmarks/bench_suite.py --sem-banco --tamanhos 1000000
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import warnings
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+    import resource
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psycopg2
+from psycopg2 import sql
+
+from analytical_views import CONSULTAS_NOTEBOOK
+from bench_pool import credenciais
+from generate_random_data import DbConfig, DataGenerator
+from postgres_setup import PostgresConnector
+
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+HISTORICO_PADRAO = os.path.join(DIRETORIO, 'historico.json')
+BASELINE_PADRAO = os.path.join(DIRETORIO, 'baseline.json')
+
+# Métrica -> True se valores maiores são melhores
+METRICAS = {'linhas_por_segundo': True, 'p99_ms': False, 'rss_pico_mb': False}
+
+TABELAS = ('dados_origem', 'fluxo_dados', 'analises')
+
+
+class MonitorRss:
+    """Amostra o RSS do processo em uma thread e guarda o pico do trecho monitorado.
+
+    Sem psutil, usa ru_maxrss: o pico de toda a vida do processo, não só do trecho.
+    """
+
+    def __init__(self, intervalo: float = 0.005):
+        self.intervalo = intervalo
+        self.pico = 0
+        self._parar = threading.Event()
+        self._thread = None
+
+    def _rss(self) -> int:
+        if psutil is not None:
+            return psutil.Process().memory_info().rss
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _amostrar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self.pico = max(self.pico, self._rss())
+
+    def __enter__(self):
+        self.pico = self._rss()
+        self._thread = threading.Thread(target=self._amostrar, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._parar.set()
+        self._thread.join()
+        self.pico = max(self.pico, self._rss())
+
+def percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+""" Mede uma etapa: executa funcao repeticoes vezes; funcao retorna as linhas processadas na execução """
+
+def medir_etapa(
+    etapa: str,
+    tamanho: int,
+    funcao: Callable[[], int],
+    repeticoes: int = 1
+    ) -> Dict:
+    latencias = []
+    linhas = 0
+    with MonitorRss() as monitor:
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            linhas += funcao()
+            latencias.append((time.perf_counter() - inicio) * 1000)
+
+    segundos = sum(latencias) / 1000
+    resultado = {
+        'tamanho': tamanho,
+        'etapa': etapa,
+        'execucoes': repeticoes,
+        'linhas': linhas,
+        'segundos': segundos,
+        'linhas_por_segundo': linhas / segundos if segundos > 0 else None,
+        'rss_pico_mb': monitor.pico / 2 ** 20,
+        'p50_ms': statistics.median(latencias) if repeticoes > 1 else None,
+        'p99_ms': percentil(latencias, 0.99) if repeticoes > 1 else None
+    }
+    print(
+        f"{tamanho:>10} {etapa:<28} {segundos:9.3f} s  "
+        f"{resultado['linhas_por_segundo'] or 0:14,.0f} linhas/s  "
+        f"RSS {resultado['rss_pico_mb']:8.1f} MB"
+        + (f"  p50={resultado['p50_ms']:.2f} ms p99={resultado['p99_ms']:.2f} ms" if repeticoes > 1 else "")
+    )
+    return resultado
+
+def dividir(tamanho: int) -> Tuple[int, int, int]:
+    num_origem = max(1, tamanho // 6)
+    num_fluxo = max(1, tamanho // 3)
+    return num_origem, num_fluxo, max(0, tamanho - num_origem - num_fluxo)
+
+""" Cria o banco da suíte se não existir (via banco de manutenção postgres) e as tabelas do projeto """
+
+def preparar_banco(creds: Dict) -> None:
+    admin = psycopg2.connect(**dict(creds, dbname='postgres'))
+    try:
+        admin.autocommit = True
+        with admin.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (creds['dbname'],))
+            if cur.fetchone() is None:
+                cur.execute(sql.SQL("CREATE DATABASE {} ENCODING 'UTF8' TEMPLATE template0").format(
+                    sql.Identifier(creds['dbname'])
+                ))
+    finally:
+        admin.close()
+
+    connector = PostgresConnector(**creds)
+    try:
+        connector.create_database_tables()
+    finally:
+        connector.close()
+
+def esvaziar_tabelas(connector: PostgresConnector) -> None:
+    connector.execute_query(f"TRUNCATE {', '.join(TABELAS)} RESTART IDENTITY", return_data=False)
+
+def contar_linhas(connector: PostgresConnector) -> Dict[str, int]:
+    contagens = connector.execute_query(
+        "SELECT " + ", ".join(f"(SELECT COUNT(*) FROM {tabela}) AS {tabela}" for tabela in TABELAS)
+    )
+    return {tabela: int(contagens[tabela].iloc[0]) for tabela in TABELAS}
+
+def executar_tamanho(tamanho: int, args) -> List[Dict]:
+    num_origem, num_fluxo, num_analises = dividir(tamanho)
+    # --sem-banco não cria o banco da suíte; o gerador só consulta os IDs do banco configurado
+    creds = credenciais() if args.sem_banco else dict(credenciais(), dbname=args.banco)
+    vetorizado = not args.escalar
+    resultados = []
+
+    if not args.sem_banco:
+        connector = PostgresConnector(**creds)
+        try:
+            esvaziar_tabelas(connector)
+        finally:
+            connector.close()
+
+    with DataGenerator(DbConfig(**creds), seed=args.seed, esquema_compacto=args.esquema_compacto) as generator:
+        if args.pool_textos:
+            generator.configurar_pool_textos()
+
+        resultados.append(medir_etapa('gerar_dados_origem', tamanho, lambda: len(
+            generator.gerar_dados_origem(num_origem, vetorizado=vetorizado))))
+        resultados.append(medir_etapa('gerar_fluxo_dados', tamanho, lambda: len(
+            generator.gerar_fluxo_dados(num_fluxo, vetorizado=vetorizado))))
+        resultados.append(medir_etapa('gerar_analises', tamanho, lambda: len(
+            generator.gerar_analises(num_analises, vetorizado=vetorizado))))
+        if args.sem_banco:
+            return resultados
+
+        def inserir() -> int:
+            generator.inserir_dados_no_banco(metodo=args.metodo, carga_massiva=args.carga_massiva)
+            return num_origem + num_fluxo + num_analises
+        etapas_banco = [medir_etapa('inserir_dados_no_banco', tamanho, inserir)]
+        ids_fluxo = generator.df_fluxo['id_fluxo'].to_numpy()
+
+    connector = PostgresConnector(**creds, use_pool=True)
+    try:
+        consultas_pontuais = iter(ids_fluxo[i % len(ids_fluxo)] for i in range(args.queries))
+        etapas_banco.append(medir_etapa('execute_query', tamanho, lambda: len(connector.execute_query(
+            "SELECT * FROM fluxo_dados WHERE id_fluxo = %s", (int(next(consultas_pontuais)),)
+        )), repeticoes=args.queries))
+
+        for nome, consulta in CONSULTAS_NOTEBOOK.items():
+            etapas_banco.append(medir_etapa(
+                f"consulta_{nome}", tamanho,
+                lambda consulta=consulta: len(connector.execute_query(consulta)),
+                repeticoes=args.repeticoes
+            ))
+        contagens = contar_linhas(connector)
+    finally:
+        connector.close()
+
+    # O volume realmente consultado: só é comparável com baselines de mesmo volume
+    for resultado in etapas_banco:
+        resultado['linhas_tabelas'] = contagens
+    return resultados + etapas_banco
+
+""" Compara cada (tamanho, etapa) com a baseline; retorna as métricas que pioraram além da tolerância.
+
+Resultados medidos sobre contagens de linhas diferentes (linhas_tabelas) não são comparados.
+"""
+
+def regressoes(resultados: List[Dict], baseline: List[Dict], tolerancia: float) -> List[Dict]:
+    referencia = {(r['tamanho'], r['etapa']): r for r in baseline}
+    encontradas = []
+    for resultado in resultados:
+        base = referencia.get((resultado['tamanho'], resultado['etapa']))
+        if base is None or base.get('linhas_tabelas') != resultado.get('linhas_tabelas'):
+            continue
+        for metrica, maior_melhor in METRICAS.items():
+            atual, anterior = resultado.get(metrica), base.get(metrica)
+            if not atual or not anterior:
+                continue
+            variacao = atual / anterior - 1
+            if (maior_melhor and variacao < -tolerancia) or (not maior_melhor and variacao > tolerancia):
+                encontradas.append({
+                    'tamanho': resultado['tamanho'],
+                    'etapa': resultado['etapa'],
+                    'metrica': metrica,
+                    'baseline': anterior,
+                    'atual': atual,
+                    'variacao': variacao
+                })
+    return encontradas
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRETORIO, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _ler_json(caminho: str, padrao):
+    if not os.path.exists(caminho):
+        return padrao
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+def _gravar_json(caminho: str, dados) -> None:
+    # Grava em arquivo temporário e renomeia: uma interrupção não corrompe o histórico
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--metodo', choices=('executemany', 'copy'), default='copy')
+    parser.add_argument('--carga-massiva', action='store_true')
+    parser.add_argument('--escalar', action='store_true', help='usa o caminho Faker linha a linha em vez do vetorizado')
+    parser.add_argument('--pool-textos', action='store_true')
+    parser.add_argument('--esquema-compacto', action='store_true', help='colunas categóricas, int32 e datetime64')
+    parser.add_argument('--sem-banco', action='store_true', help='mede só a geração')
+    parser.add_argument('--queries', type=int, default=200, help='execuções da consulta pontual')
+    parser.add_argument('--repeticoes', type=int, default=5, help='execuções de cada consulta do notebook')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--banco', default=None, help='banco exclusivo da suíte, esvaziado a cada tamanho '
+                        '(padrão: <DB_NAME>_bench)')
+    parser.add_argument('--historico', default=HISTORICO_PADRAO)
+    parser.add_argument('--baseline', default=BASELINE_PADRAO)
+    parser.add_argument('--salvar-baseline', action='store_true')
+    parser.add_argument('--tolerancia', type=float, default=0.2)
+    args = parser.parse_args()
+    # read_sql_query avisa a cada chamada com conexão psycopg2; poluiria a saída da suíte
+    warnings.filterwarnings('ignore', message='pandas only supports SQLAlchemy')
+    args.banco = args.banco or f"{credenciais()['dbname']}_bench"
+    if not args.sem_banco:
+        preparar_banco(dict(credenciais(), dbname=args.banco))
+
+    resultados = []
+    for tamanho in args.tamanhos:
+        resultados.extend(executar_tamanho(tamanho, args))
+
+    execucao = {
+        'quando': datetime.now().isoformat(timespec='seconds'),
+        'commit': _commit_atual(),
+        'python': platform.python_version(),
+        'parametros': {k: v for k, v in vars(args).items() if k not in ('historico', 'baseline')},
+        'resultados': resultados
+    }
+    historico = _ler_json(args.historico, [])
+    historico.append(execucao)
+    _gravar_json(args.historico, historico)
+
+    if args.salvar_baseline:
+        _gravar_json(args.baseline, execucao)
+        print(f"Baseline gravada em {args.baseline}")
+        return
+
+    baseline = _ler_json(args.baseline, None)
+    if baseline is None:
+        print("Sem baseline para comparar (use --salvar-baseline)")
+        return
+
+    encontradas = regressoes(resultados, baseline['resultados'], args.tolerancia)
+    for r in encontradas:
+        print(
+            f"REGRESSÃO {r['tamanho']:>10} {r['etapa']:<28} {r['metrica']}: "
+            f"{r['baseline']:.3f} -> {r['atual']:.3f} ({r['variacao']:+.1%})"
+        )
+    if encontradas:
+        sys.exit(1)
+    print(f"Sem regressões em relação à baseline de {baseline['quando']} ({baseline.get('commit')})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import psycopg2
+
+
+"""Definições removidas durante uma carga; persistidas para que uma carga interrompida possa ser restaurada"""
+
+CREATE_PENDENTES_SQL = """
+CREATE TABLE IF NOT EXISTS carga_massiva_pendente (
+    tipo VARCHAR(10) NOT NULL,
+    tabela TEXT NOT NULL,
+    nome TEXT NOT NULL,
+    definicao TEXT NOT NULL,
+    PRIMARY KEY (tipo, nome)
+);
+"""
+
+# Índices secundários: ficam de fora PKs, índices únicos e os que sustentam constraints
+INDICES_SECUNDARIOS_SQL = """
+SELECT x.indrelid::regclass::text, x.indexrelid::regclass::text, pg_get_indexdef(x.indexrelid)
+FROM pg_index x
+WHERE x.indrelid IN (SELECT to_regclass(t) FROM unnest(%s::text[]) t)
+  AND NOT x.indisunique
+  AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+ORDER BY 2;
+"""
+
+FKS_SQL = """
+SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+FROM pg_constraint
+WHERE contype = 'f'
+  AND conparentid = 0
+  AND conrelid IN (SELECT to_regclass(t) FROM unnest(%s::text[]) t)
+ORDER BY 2;
+"""
+
+
+class SessaoCargaMassiva:
+    """Remove índices secundários e FKs das tabelas durante uma carga em massa e os refaz no fim.
+
+    Ao entrar, as definições são gravadas em carga_massiva_pendente e os objetos
+    removidos na mesma transação. Ao sair (com ou sem erro na carga), os índices
+    são reconstruídos em paralelo, um por conexão; as FKs voltam como NOT VALID
+    e são validadas em seguida, e as tabelas passam por ANALYZE. Cada objeto
+    restaurado sai da tabela de pendentes na mesma transação, então restaurar()
+    pode ser chamado de novo após uma interrupção. PKs continuam ativas na carga.
+    """
+
+    def __init__(
+        self,
+        conectar: Callable[[], 'psycopg2.extensions.connection'],
+        tabelas: Iterable[str] = ('dados_origem', 'fluxo_dados', 'analises'),
+        num_workers: int = 4,
+        maintenance_work_mem: Optional[str] = None
+    ):
+        if num_workers < 1:
+            raise ValueError("num_workers deve ser positivo")
+
+        self.conectar = conectar
+        self.tabelas = list(tabelas)
+        self.num_workers = num_workers
+        self.maintenance_work_mem = maintenance_work_mem
+        self.removidos: Dict[str, List[Tuple[str, str, str]]] = {'indice': [], 'fk': []}
+        self.estatisticas: Dict[str, float] = {}
+
+    def __enter__(self):
+        self.desativar()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        try:
+            self.restaurar()
+        except Exception:
+            # Não mascara o erro da carga; a falha de restauração fica no log e em carga_massiva_pendente
+            if exc_type is None:
+                raise
+            logging.exception("Falha ao restaurar índices/FKs após erro na carga")
+
+    """Grava as definições e remove FKs e índices secundários das tabelas"""
+
+    def desativar(self) -> Dict[str, List[Tuple[str, str, str]]]:
+        conn = self.conectar()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(CREATE_PENDENTES_SQL)
+                cur.execute("LOCK TABLE carga_massiva_pendente IN EXCLUSIVE MODE")
+                cur.execute("SELECT COUNT(*) FROM carga_massiva_pendente")
+                if cur.fetchone()[0]:
+                    raise RuntimeError(
+                        "Há uma carga massiva pendente; chame restaurar() antes de iniciar outra"
+                    )
+
+                cur.execute(FKS_SQL, (self.tabelas,))
+                fks = cur.fetchall()
+                cur.execute(INDICES_SECUNDARIOS_SQL, (self.tabelas,))
+                indices = cur.fetchall()
+
+                for tipo, objetos in (('fk', fks), ('indice', indices)):
+                    for tabela, nome, definicao in objetos:
+                        cur.execute(
+                            "INSERT INTO carga_massiva_pendente (tipo, tabela, nome, definicao) "
+                            "VALUES (%s, %s, %s, %s)",
+                            (tipo, tabela, nome, definicao)
+                        )
+                # FKs antes dos índices: nenhuma FK fica apontando para um índice removido
+                for tabela, nome, _ in fks:
+                    cur.execute(f'ALTER TABLE {tabela} DROP CONSTRAINT "{nome}"')
+                for _, nome, _ in indices:
+                    cur.execute(f"DROP INDEX {nome}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        self.removidos = {'indice': indices, 'fk': fks}
+        logging.info("Bulk load: dropped %d foreign keys and %d indexes", len(fks), len(indices))
+        return self.removidos
+
+    def _executar(self, comandos: List[str], tipo: str, nome: str) -> None:
+        conn = self.conectar()
+        try:
+            with conn.cursor() as cur:
+                if self.maintenance_work_mem:
+                    cur.execute("SET maintenance_work_mem = %s", (self.maintenance_work_mem,))
+                for comando in comandos:
+                    cur.execute(comando)
+                if tipo:
+                    cur.execute(
+                        "DELETE FROM carga_massiva_pendente WHERE tipo = %s AND nome = %s", (tipo, nome)
+                    )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _em_paralelo(self, tarefas: List[Tuple[List[str], str, str]]) -> List[Tuple[str, Exception]]:
+        falhas = []
+        if not tarefas:
+            return falhas
+        with ThreadPoolExecutor(max_workers=min(self.num_workers, len(tarefas))) as executor:
+            futuros = {executor.submit(self._executar, *tarefa): tarefa[2] for tarefa in tarefas}
+            for futuro, nome in futuros.items():
+                try:
+                    futuro.result()
+                except psycopg2.Error as e:
+                    falhas.append((nome, e))
+        return falhas
+
+    """ Reconstrói os índices e FKs pendentes, valida as FKs e roda ANALYZE.
+
+    Lança Exception listando as FKs que não validaram (ficam NOT VALID: novas
+    escritas são checadas, mas as linhas carregadas violam a referência).
+    """
+
+    def restaurar(self) -> Dict[str, float]:
+        conn = self.conectar()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(CREATE_PENDENTES_SQL)
+                cur.execute("SELECT tipo, tabela, nome, definicao FROM carga_massiva_pendente ORDER BY tipo, nome")
+                pendentes = cur.fetchall()
+                cur.execute(
+                    "SELECT t FROM unnest(%s::text[]) t WHERE to_regclass(t) IS NOT NULL",
+                    (sorted(set(self.tabelas) | {tabela for _, tabela, _, _ in pendentes}),)
+                )
+                existentes = [linha[0] for linha in cur.fetchall()]
+            conn.commit()
+        finally:
+            conn.close()
+
+        indices = [(tabela, nome, definicao) for tipo, tabela, nome, definicao in pendentes if tipo == 'indice']
+        fks = [(tabela, nome, definicao) for tipo, tabela, nome, definicao in pendentes if tipo == 'fk']
+
+        inicio = time.perf_counter()
+        # Em tabelas particionadas o índice do pai deve voltar para todas as partições
+        falhas = self._em_paralelo([
+            ([definicao.replace(' ON ONLY ', ' ON ', 1)], 'indice', nome)
+            for _, nome, definicao in indices
+        ])
+        if falhas:
+            raise Exception(f"Erro ao reconstruir índices: {falhas}")
+        segundos_indices = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        validar = []
+        for tabela, nome, definicao in fks:
+            ja_invalida = definicao.endswith(' NOT VALID')
+            definicao = definicao[:-len(' NOT VALID')] if ja_invalida else definicao
+            # NOT VALID: a FK volta sem varrer a tabela; a validação pesada vem depois, sem bloquear escritas
+            self._executar(
+                [f'ALTER TABLE {tabela} ADD CONSTRAINT "{nome}" {definicao} NOT VALID'], 'fk', nome
+            )
+            if not ja_invalida:
+                validar.append(([f'ALTER TABLE {tabela} VALIDATE CONSTRAINT "{nome}"'], None, nome))
+        falhas = self._em_paralelo(validar)
+        segundos_fks = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        if existentes:
+            self._executar([f"ANALYZE {', '.join(existentes)}"], None, 'analyze')
+
+        self.estatisticas = {
+            'indices': len(indices),
+            'fks': len(fks),
+            'segundos_indices': segundos_indices,
+            'segundos_fks': segundos_fks,
+            'segundos_analyze': time.perf_counter() - inicio
+        }
+        logging.info("Bulk load: restored %s", self.estatisticas)
+
+        if falhas:
+            raise Exception(f"FKs não validadas após a carga (mantidas NOT VALID): {falhas}")
+        return self.estatisticas
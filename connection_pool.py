@@ -0,0 +1,172 @@
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, Optional
+
+from psycopg2 import Error
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError
+
+
+class ConnectionPool:
+    """Pool de conexões thread-safe com health check e timeout de ociosidade"""
+
+    def __init__(
+        self,
+        connect: Callable,
+        min_size: int = 1,
+        max_size: int = 10,
+        idle_timeout: float = 300.0,
+        health_check: bool = True,
+        acquire_timeout: Optional[float] = 30.0
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Tamanhos do pool inválidos: exige 0 <= min_size <= max_size e max_size >= 1")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self.acquire_timeout = acquire_timeout
+
+        self._cond = threading.Condition()
+        # Conexões livres como pares (conexão, instante da devolução)
+        self._idle: List[tuple] = []
+        self._in_use: Dict[int, object] = {}
+        self._pending = 0
+        self._closed = False
+
+        for _ in range(min_size):
+            self._idle.append((self._connect(), time.monotonic()))
+
+    @property
+    def size(self) -> int:
+        with self._cond:
+            return len(self._idle) + len(self._in_use) + self._pending
+
+    """Descarta uma conexão sem propagar erros de fechamento"""
+
+    def _discard(self, conn) -> None:
+        try:
+            if not conn.closed:
+                conn.close()
+        except Error:
+            pass
+
+    """Verifica se uma conexão ociosa ainda pode ser reutilizada"""
+
+    def _is_healthy(self, conn, idle_since: float) -> bool:
+        if conn.closed:
+            return False
+        if self.idle_timeout is not None and time.monotonic() - idle_since > self.idle_timeout:
+            return False
+        if not self.health_check:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Error as e:
+            logging.warning("Conexão do pool descartada no health check: %s", e)
+            return False
+
+    """Fecha conexões ociosas além do mínimo que excederam o idle_timeout"""
+
+    def _evict_idle(self) -> None:
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        kept = []
+        for conn, idle_since in self._idle:
+            expired = now - idle_since > self.idle_timeout
+            if expired and len(kept) + len(self._in_use) >= self.min_size:
+                self._discard(conn)
+            else:
+                kept.append((conn, idle_since))
+        self._idle = kept
+
+    """Retira uma conexão do pool, criando uma nova se houver capacidade"""
+
+    def getconn(self):
+        deadline = None if self.acquire_timeout is None else time.monotonic() + self.acquire_timeout
+        while True:
+            candidate = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolError("Pool de conexões fechado")
+
+                    self._evict_idle()
+                    if self._idle:
+                        # LIFO: a conexão mais recente tem menor chance de ter expirado
+                        candidate = self._idle.pop()
+                        break
+                    if len(self._in_use) + self._pending < self.max_size:
+                        break
+
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise PoolError(
+                            f"Tempo esgotado aguardando conexão do pool (max_size={self.max_size})"
+                        )
+                    self._cond.wait(remaining)
+                # Reserva a vaga enquanto o health check ou o connect rodam fora do lock
+                self._pending += 1
+
+            try:
+                if candidate is not None:
+                    conn, idle_since = candidate
+                    if not self._is_healthy(conn, idle_since):
+                        self._discard(conn)
+                        conn = None
+                else:
+                    conn = self._connect()
+            except BaseException:
+                with self._cond:
+                    self._pending -= 1
+                    self._cond.notify()
+                raise
+
+            with self._cond:
+                self._pending -= 1
+                if conn is not None and self._closed:
+                    self._discard(conn)
+                    raise PoolError("Pool de conexões fechado")
+                if conn is not None:
+                    self._in_use[id(conn)] = conn
+                    return conn
+                self._cond.notify()
+
+    """Devolve uma conexão ao pool, descartando-a se estiver quebrada"""
+
+    def putconn(self, conn, close: bool = False) -> None:
+        with self._cond:
+            if self._in_use.pop(id(conn), None) is None:
+                raise PoolError("Conexão não pertence a este pool")
+
+            if close or self._closed or conn.closed:
+                self._discard(conn)
+            else:
+                try:
+                    # Nunca devolve uma transação aberta ao pool
+                    if conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                    self._idle.append((conn, time.monotonic()))
+                except Error:
+                    self._discard(conn)
+            self._cond.notify()
+
+    """Fecha todas as conexões do pool"""
+
+    def closeall(self) -> None:
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._discard(conn)
+            for conn in self._in_use.values():
+                self._discard(conn)
+            self._idle = []
+            self._in_use = {}
+            self._cond.notify_all()
@@ -0,0 +1,307 @@
+import io
+import struct
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+"""OIDs dos tipos Postgres decodificados em colunas tipadas; os demais ficam como texto"""
+
+INTEGER_OIDS = {20, 21, 23}
+FLOAT_OIDS = {700, 701, 1700}
+BOOL_OID = 16
+DATE_OID = 1082
+TIMESTAMP_OID = 1114
+TIMESTAMPTZ_OID = 1184
+TEXT_OIDS = {18, 19, 25, 1042, 1043}
+
+"""Opções do COPY ... TO STDOUT lidas por decode_csv: NULL explícito distingue nulo de string vazia"""
+
+COPY_CSV_OPTIONS = "FORMAT csv, NULL '\\N'"
+
+"""Tipos de largura fixa no formato binário do COPY (big-endian); numeric (1700) não entra: tem formato próprio"""
+
+BINARY_FIXED_TYPES = {
+    BOOL_OID: '?',
+    21: '>i2',
+    23: '>i4',
+    20: '>i8',
+    700: '>f4',
+    701: '>f8',
+    DATE_OID: '>i4',
+    TIMESTAMP_OID: '>i8',
+    TIMESTAMPTZ_OID: '>i8'
+}
+
+# Mesmos tipos no formato do módulo struct, para o caminho linha a linha
+_STRUCT_FORMATS = {'?': '>?', '>i2': '>h', '>i4': '>i', '>i8': '>q', '>f4': '>f', '>f8': '>d'}
+
+_BINARY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+# Datas e timestamps binários contam dias/microssegundos a partir de 2000-01-01
+_EPOCA_POSTGRES = np.datetime64('2000-01-01T00:00:00', 'us')
+_EPOCA_POSTGRES_DIAS = np.datetime64('2000-01-01', 'D')
+
+""" Tipos (OIDs) das colunas de uma query, sem executá-la: LIMIT 0 só planeja e devolve a descrição """
+
+def describe_query(cursor, query: str, params=None) -> List[tuple]:
+    cursor.execute(f"SELECT * FROM ({query}) AS descricao LIMIT 0", params)
+    return [(desc[0], desc[1]) for desc in cursor.description]
+
+"""Formato do COPY para as colunas: binário quando todas têm largura fixa, CSV caso contrário"""
+
+def choose_format(type_oids: Sequence[int]) -> str:
+    return 'binary' if all(oid in BINARY_FIXED_TYPES for oid in type_oids) else 'csv'
+
+"""SQL do COPY (query) TO STDOUT no formato pedido ('csv' ou 'binary')"""
+
+def copy_sql(query: str, copy_format: str) -> str:
+    if copy_format not in ('csv', 'binary'):
+        raise ValueError(f"Formato de COPY inválido: {copy_format}")
+    options = COPY_CSV_OPTIONS if copy_format == 'csv' else 'FORMAT binary'
+    return f"COPY ({query.strip().rstrip(';')}) TO STDOUT WITH ({options})"
+
+def decode_copy(data: bytes, columns: Sequence[str], type_oids: Sequence[int], copy_format: str) -> pd.DataFrame:
+    if copy_format == 'binary':
+        return decode_binary(data, columns, type_oids)
+    return decode_csv(data, columns, type_oids)
+
+""" Executa query via COPY TO STDOUT em cursor e decodifica o resultado em um DataFrame tipado.
+
+copy_format='auto' usa o formato binário quando todas as colunas têm largura
+fixa (ids, números, datas) e CSV quando há texto ou numeric. params são
+interpolados com mogrify, pois o COPY não aceita parâmetros.
+"""
+
+def copy_to_dataframe(cursor, query: str, params=None, copy_format: str = 'auto') -> pd.DataFrame:
+    if params:
+        query = cursor.mogrify(query, params).decode()
+    query = query.strip().rstrip(';')
+    description = describe_query(cursor, query)
+    columns = [name for name, _ in description]
+    type_oids = [oid for _, oid in description]
+    if copy_format == 'auto':
+        copy_format = choose_format(type_oids)
+
+    buffer = io.BytesIO()
+    cursor.copy_expert(copy_sql(query, copy_format), buffer)
+    return decode_copy(buffer.getbuffer(), columns, type_oids, copy_format)
+
+def _pyarrow_csv():
+    try:
+        import pyarrow
+        import pyarrow.csv
+    except ImportError:
+        return None
+    return pyarrow
+
+""" Decodifica a saída de COPY ... TO STDOUT (FORMAT csv, NULL '\\N') em um DataFrame com colunas tipadas.
+
+Inteiros viram int64 (Int64 se houver nulos), numeric/float viram float64,
+timestamps viram datetime64 (UTC para timestamptz) e booleanos t/f viram bool.
+Com pyarrow instalado o parse é feito pelo leitor CSV do Arrow (multithread,
+strings sem um objeto Python por valor); sem ele, por pd.read_csv. Funciona
+em processos worker: recebe só bytes e listas.
+"""
+
+def decode_csv(data: bytes, columns: Sequence[str], type_oids: Sequence[int]) -> pd.DataFrame:
+    if not len(data):
+        return _empty_frame(columns, type_oids)
+
+    # Nomes internos posicionais: resultados de JOIN podem repetir nomes de coluna
+    internos = [f'c{i}' for i in range(len(columns))]
+    pa = _pyarrow_csv()
+    if pa is not None:
+        df = _read_csv_arrow(pa, data, internos, type_oids)
+    else:
+        df = _read_csv_pandas(data, internos, type_oids)
+
+    convertidas = {}
+    for coluna, oid in zip(internos, type_oids):
+        serie = df[coluna]
+        if oid in INTEGER_OIDS and serie.dtype != np.int64:
+            convertidas[coluna] = serie.astype('Int64')
+        elif oid in (TIMESTAMP_OID, DATE_OID) and not pd.api.types.is_datetime64_dtype(serie.dtype):
+            convertidas[coluna] = pd.to_datetime(serie, format='ISO8601')
+        elif oid == TIMESTAMPTZ_OID:
+            convertidas[coluna] = pd.to_datetime(serie, format='ISO8601', utc=True)
+        elif oid == BOOL_OID and serie.dtype != bool:
+            convertidas[coluna] = serie.map({'t': True, 'f': False, True: True, False: False})
+    if convertidas:
+        df = df.assign(**convertidas)
+    df.columns = list(columns)
+    return df
+
+def _read_csv_arrow(pa, data: bytes, columns: List[str], type_oids: Sequence[int]) -> pd.DataFrame:
+    tipos = {}
+    for coluna, oid in zip(columns, type_oids):
+        if oid in INTEGER_OIDS:
+            tipos[coluna] = pa.int64()
+        elif oid in FLOAT_OIDS:
+            tipos[coluna] = pa.float64()
+        elif oid == TIMESTAMP_OID:
+            tipos[coluna] = pa.timestamp('us')
+        elif oid == DATE_OID:
+            tipos[coluna] = pa.date32()
+        elif oid == BOOL_OID:
+            tipos[coluna] = pa.bool_()
+        else:
+            # timestamptz também chega como texto: o offset "-03" do Postgres é convertido pelo pandas
+            tipos[coluna] = pa.string()
+
+    tabela = pa.csv.read_csv(
+        pa.py_buffer(data),
+        read_options=pa.csv.ReadOptions(column_names=columns),
+        parse_options=pa.csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa.csv.ConvertOptions(
+            column_types=tipos,
+            null_values=['\\N'],
+            strings_can_be_null=True,
+            # "" entre aspas é string vazia; só o \N sem aspas é nulo
+            quoted_strings_can_be_null=False,
+            true_values=['t'],
+            false_values=['f']
+        )
+    )
+    return tabela.to_pandas(date_as_object=False)
+
+def _read_csv_pandas(data: bytes, columns: List[str], type_oids: Sequence[int]) -> pd.DataFrame:
+    # Inteiros ficam por conta da inferência do parser: int64, ou float64 quando há nulos
+    tipos = {
+        coluna: (np.float64 if oid in FLOAT_OIDS else str)
+        for coluna, oid in zip(columns, type_oids) if oid not in INTEGER_OIDS
+    }
+    return pd.read_csv(
+        io.BytesIO(data),
+        header=None,
+        names=columns,
+        dtype=tipos,
+        na_values=['\\N'],
+        keep_default_na=False
+    )
+
+""" Decodifica a saída de COPY ... TO STDOUT (FORMAT binary) em um DataFrame tipado.
+
+Quando todas as colunas têm largura fixa e não há nulos, cada linha tem o
+mesmo tamanho: o buffer inteiro vira uma view NumPy estruturada (np.frombuffer,
+sem cópia) e cada coluna sai de um único astype para a ordem de bytes nativa.
+Com nulos ou colunas de texto, as linhas são percorridas campo a campo.
+numeric (1700) não é suportado no formato binário: use CSV.
+"""
+
+def decode_binary(data: bytes, columns: Sequence[str], type_oids: Sequence[int]) -> pd.DataFrame:
+    if not len(data):
+        return _empty_frame(columns, type_oids)
+    for oid in type_oids:
+        if oid not in BINARY_FIXED_TYPES and oid not in TEXT_OIDS:
+            raise ValueError(f"Tipo OID {oid} não suportado no COPY binário; use copy_format='csv'")
+
+    buffer = memoryview(data)
+    if bytes(buffer[:len(_BINARY_SIGNATURE)]) != _BINARY_SIGNATURE:
+        raise ValueError("Saída de COPY binário sem a assinatura PGCOPY")
+    extensao = struct.unpack_from('>i', buffer, len(_BINARY_SIGNATURE) + 4)[0]
+    inicio = len(_BINARY_SIGNATURE) + 8 + extensao
+    # O fim dos dados é marcado por um contador de campos -1
+    fim = len(buffer) - 2
+
+    valores = _binary_fixed_view(buffer, inicio, fim, type_oids)
+    if valores is not None:
+        df = pd.DataFrame({
+            f'c{i}': _binary_column(valores[f'v{i}'], oid) for i, oid in enumerate(type_oids)
+        })
+    else:
+        df = _binary_rows(buffer, inicio, fim, type_oids)
+    df.columns = list(columns)
+    return df
+
+def _binary_fixed_view(buffer, inicio: int, fim: int, type_oids: Sequence[int]) -> Optional[np.ndarray]:
+    if not all(oid in BINARY_FIXED_TYPES for oid in type_oids):
+        return None
+    campos = [('n', '>i2')]
+    for i, oid in enumerate(type_oids):
+        campos += [(f'l{i}', '>i4'), (f'v{i}', BINARY_FIXED_TYPES[oid])]
+    linha = np.dtype(campos)
+    if (fim - inicio) % linha.itemsize:
+        return None
+
+    valores = np.frombuffer(buffer, dtype=linha, count=(fim - inicio) // linha.itemsize, offset=inicio)
+    # Um nulo (tamanho -1) encurta a linha e desalinha as seguintes: confere todos os tamanhos
+    if (valores['n'] != len(type_oids)).any():
+        return None
+    for i, oid in enumerate(type_oids):
+        if (valores[f'l{i}'] != np.dtype(BINARY_FIXED_TYPES[oid]).itemsize).any():
+            return None
+    return valores
+
+def _binary_column(valores: np.ndarray, oid: int):
+    if oid == TIMESTAMP_OID:
+        return _EPOCA_POSTGRES + valores.astype(np.int64).view('timedelta64[us]')
+    if oid == TIMESTAMPTZ_OID:
+        return pd.DatetimeIndex(_EPOCA_POSTGRES + valores.astype(np.int64).view('timedelta64[us]')).tz_localize('UTC')
+    if oid == DATE_OID:
+        return (_EPOCA_POSTGRES_DIAS + valores.astype(np.int64).view('timedelta64[D]')).astype('datetime64[s]')
+    if oid in INTEGER_OIDS:
+        return valores.astype(np.int64)
+    return valores.astype(valores.dtype.newbyteorder('='))
+
+def _binary_rows(buffer, inicio: int, fim: int, type_oids: Sequence[int]) -> pd.DataFrame:
+    formatos = [
+        _STRUCT_FORMATS[BINARY_FIXED_TYPES[oid]] if oid in BINARY_FIXED_TYPES else None for oid in type_oids
+    ]
+    colunas: List[list] = [[] for _ in type_oids]
+    posicao = inicio
+    while posicao < fim:
+        posicao += 2
+        for i, formato in enumerate(formatos):
+            tamanho = struct.unpack_from('>i', buffer, posicao)[0]
+            posicao += 4
+            if tamanho < 0:
+                colunas[i].append(None)
+                continue
+            if formato is None:
+                colunas[i].append(str(buffer[posicao:posicao + tamanho], 'utf-8'))
+            else:
+                colunas[i].append(struct.unpack_from(formato, buffer, posicao)[0])
+            posicao += tamanho
+
+    dados = {}
+    for i, oid in enumerate(type_oids):
+        valores = colunas[i]
+        if oid in (TIMESTAMP_OID, TIMESTAMPTZ_OID):
+            micros = pd.array(valores, dtype='Int64').to_numpy(dtype=np.int64, na_value=np.iinfo(np.int64).min)
+            serie = pd.Series(np.where(
+                micros == np.iinfo(np.int64).min,
+                np.datetime64('NaT', 'us'),
+                _EPOCA_POSTGRES + micros.view('timedelta64[us]')
+            ))
+            dados[f'c{i}'] = serie.dt.tz_localize('UTC') if oid == TIMESTAMPTZ_OID else serie
+        elif oid == DATE_OID:
+            dias = pd.array(valores, dtype='Int64')
+            dados[f'c{i}'] = pd.to_datetime(_EPOCA_POSTGRES_DIAS) + pd.to_timedelta(dias, unit='D')
+        elif oid in INTEGER_OIDS:
+            serie = pd.array(valores, dtype='Int64')
+            dados[f'c{i}'] = serie if serie.isna().any() else serie.to_numpy(dtype=np.int64)
+        elif oid in FLOAT_OIDS:
+            dados[f'c{i}'] = pd.array(valores, dtype='Float64').to_numpy(dtype=np.float64, na_value=np.nan)
+        elif oid == BOOL_OID and None not in valores:
+            dados[f'c{i}'] = np.array(valores, dtype=bool)
+        else:
+            dados[f'c{i}'] = pd.Series(valores, dtype=object)
+    return pd.DataFrame(dados)
+
+def _empty_frame(columns: Sequence[str], type_oids: Sequence[int]) -> pd.DataFrame:
+    tipos: Dict[int, object] = {}
+    for i, oid in enumerate(type_oids):
+        if oid in INTEGER_OIDS:
+            tipos[i] = np.int64
+        elif oid in FLOAT_OIDS:
+            tipos[i] = np.float64
+        elif oid in (TIMESTAMP_OID, DATE_OID):
+            tipos[i] = 'datetime64[ns]'
+        elif oid == TIMESTAMPTZ_OID:
+            tipos[i] = 'datetime64[ns, UTC]'
+        else:
+            tipos[i] = object
+    df = pd.DataFrame({f'c{i}': pd.Series(dtype=tipo) for i, tipo in tipos.items()})
+    df.columns = list(columns)
+    return df
@@ -1,10 +1,27 @@
+import io
+import logging
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 import random
 from datetime import datetime, timedelta
 from faker import Faker
 import psycopg2
-from typing import Tuple, Optional
-from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Union
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass
+
+from bulk_load import SessaoCargaMassiva
+from id_allocator import AlocadorIds
+from key_cache import CacheChaves
+from metrics import Metricas, etapa_medida
+from postgres_setup import PostgresConnector, _decoder_context
+from snapshot import arquivo_tabela, carregar_snapshot, iterar_lotes, salvar_snapshot
+from text_pool import PoolTextos, TIPOS_TEXTO
 
 
 """Configuração do banco de dados usando decorador para simplificação na criação da classe"""
@@ -18,6 +35,80 @@ class DbConfig:
 	host: str
 	port: str
 
+"""Colunas de cada tabela na ordem usada nas cargas em massa"""
+
+COLUNAS_TABELAS = {
+    'dados_origem': [
+        'id_origem', 'nome_origem', 'tipo_dado', 'volume', 'latencia', 'descricao'
+    ],
+    'fluxo_dados': [
+        'id_fluxo', 'id_origem', 'destino', 'status', 'data_criacao', 'data_atualizacao'
+    ],
+    'analises': [
+        'id_analise', 'id_fluxo', 'hipoteses', 'resultado', 'data_analise', 'responsavel'
+    ]
+}
+
+"""Atributo do DataGenerator que guarda o DataFrame de cada tabela"""
+
+ATRIBUTOS_TABELAS = {
+    'dados_origem': 'df_origem',
+    'fluxo_dados': 'df_fluxo',
+    'analises': 'df_analises'
+}
+
+"""Modo de esquema compacto: vocabulário fixo (atributo do DataGenerator) de cada coluna categórica"""
+
+VOCABULARIOS_COLUNAS = {
+    'tipo_dado': 'TIPOS_DADOS',
+    'latencia': 'PADROES_LATENCIA',
+    'destino': 'DESTINOS',
+    'status': 'STATUS'
+}
+
+"""Modo de esquema compacto: IDs SERIAL e volume são INTEGER no Postgres, então cabem em int32"""
+
+INTEIROS_COMPACTOS = {
+    'id_origem': np.int32,
+    'id_fluxo': np.int32,
+    'id_analise': np.int32,
+    'volume': np.int32
+}
+
+COLUNAS_DATAS = ('data_criacao', 'data_atualizacao', 'data_analise')
+
+""" Memória de cada coluna via memory_usage(deep=True), ao lado da estimativa sem o esquema compacto.
+
+bytes_padrao estima a mesma coluna como strings Python (object) e inteiros
+int64, o que o modo por linha produz a partir de listas de dicionários.
+"""
+
+def uso_memoria(df: pd.DataFrame) -> pd.DataFrame:
+    linhas = []
+    for coluna, atual in df.memory_usage(deep=True, index=False).items():
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            tamanhos = np.array([sys.getsizeof(c) for c in serie.cat.categories] + [0], dtype=np.int64)
+            # Código -1 (nulo) aponta para o 0 do fim: o None é um singleton, só custa o ponteiro
+            padrao = len(serie) * 8 + int(tamanhos[serie.cat.codes.to_numpy()].sum())
+        elif pd.api.types.is_integer_dtype(serie.dtype):
+            padrao = len(serie) * 8
+        else:
+            padrao = atual
+        linhas.append({'coluna': coluna, 'dtype': str(serie.dtype), 'bytes': int(atual), 'bytes_padrao': int(padrao)})
+    return pd.DataFrame(linhas)
+
+"""Linhas processadas pelas etapas que não retornam um único DataFrame, para as métricas de etapa"""
+
+def _linhas_dataframes(generator: 'DataGenerator', _) -> int:
+    return len(generator.df_origem) + len(generator.df_fluxo) + len(generator.df_analises)
+
+def _linhas_paralelo(generator: 'DataGenerator', resultado) -> int:
+    return resultado['linhas'] if isinstance(resultado, dict) else sum(len(df) for df in resultado)
+
+def _linhas_por_tabela(generator: 'DataGenerator', resultado: Dict[str, int]) -> int:
+    return sum(resultado.values())
+
 class DataGenerator:
 
     def __enter__(self):
@@ -28,14 +119,41 @@ class DataGenerator:
 
     """Classe para geração e manipulação de dados sintéticos"""
 
-    def __init__(self, db_config: DbConfig):
+    def __init__(
+        self,
+        db_config: DbConfig,
+        seed: int = 42,
+        usar_sequencias: bool = False,
+        ouvintes_escrita: Optional[List[Callable[[Iterable[str]], None]]] = None,
+        metricas: Optional[Metricas] = None,
+        esquema_compacto: bool = False,
+        conector: Optional[PostgresConnector] = None
+    ):
         self.db_config = db_config
+        # Chamados com as tabelas gravadas após cada carga confirmada (ex.: QueryCache.invalidate_tables)
+        self.ouvintes_escrita = list(ouvintes_escrita or [])
+        # Conector que compartilha o banco: as cargas do gerador também chegam aos ouvintes dele (cache de queries)
+        self.conector = conector
+        # Tempo e linhas de cada etapa (generator_stage_seconds / generator_rows_total)
+        self.metricas = metricas if metricas is not None else Metricas()
+        self.seed = seed
+        # Colunas de vocabulário fixo como Categorical, IDs/volume em int32 e datas em datetime64
+        self.esquema_compacto = esquema_compacto
+        # Reserva blocos de IDs nas sequences em vez de MAX(id): permite vários geradores no mesmo banco
+        self.usar_sequencias = usar_sequencias
+        self.alocador = None
+        # Chaves já gravadas por tabela (CacheChaves), usadas pelo modo incremental para sortear os pais
+        self.cache_chaves: Dict[str, CacheChaves] = {}
         self.fake = Faker('pt_BR')
-        Faker.seed(42)
+        Faker.seed(seed)
+        # Gerador NumPy usado pelos modos vetorizados, reprodutível a partir da seed
+        self.rng = np.random.default_rng(seed)
         self.conn = None
         self.df_origem = None
         self.df_fluxo = None
         self.df_analises = None
+        # Pool de textos Faker opcional usado pelos modos vetorizados
+        self.pool_textos = None
 
     # Constantes
         self.TIPOS_SISTEMAS = [
@@ -116,6 +234,28 @@ class DataGenerator:
     	except psycopg2.Error as e:
     		raise Exception(f"Erro ao conectar ao banco de dados: {e}")
 
+    """Ativa o pool de textos pré-gerados (opcionalmente persistido em diretorio_cache) nos modos vetorizados"""
+
+    def configurar_pool_textos(self, tamanho: int = 1000, diretorio_cache: Optional[str] = None) -> PoolTextos:
+        self.pool_textos = PoolTextos(
+            tamanho=tamanho,
+            locale='pt_BR',
+            seed=self.seed,
+            diretorio_cache=diretorio_cache
+        ).carregar()
+        return self.pool_textos
+
+    """Retorna num_registros textos de um tipo: sorteados do pool ou gerados pelo Faker, um por linha"""
+
+    def _textos(self, tipo: str, num_registros: int, categorico: bool = False) -> Union[np.ndarray, pd.Categorical]:
+        if self.pool_textos is not None:
+            # Colunas usadas sem concatenação podem ser Categorical sobre o pool no esquema compacto
+            if categorico and self.esquema_compacto:
+                return self.pool_textos.amostrar_categorico(tipo, num_registros, self.rng)
+            return self.pool_textos.amostrar(tipo, num_registros, self.rng)
+        gerar = TIPOS_TEXTO[tipo]
+        return np.asarray([gerar(self.fake) for _ in range(num_registros)], dtype=object)
+
     """Gerando dados randômicamente"""
 
     def get_ultimo_id(self, tabela: str, coluna: str) -> int:
@@ -128,15 +268,81 @@ class DataGenerator:
         except Exception as e:
             return 0 
 
+    """Retorna o ID imediatamente anterior ao bloco de num_registros IDs a gerar"""
+
+    def _base_ids(self, tabela: str, coluna: str, num_registros: int) -> int:
+        if not self.usar_sequencias:
+            return self.get_ultimo_id(tabela, coluna)
+
+        if self.conn is None or self.conn.closed:
+            self.connect()
+        if self.alocador is None or self.alocador.conn is not self.conn:
+            self.alocador = AlocadorIds(self.conn)
+        return self.alocador.reservar(tabela, coluna, num_registros) - 1
+
+    """Avisa os ouvintes de escrita (os do gerador e os do conector compartilhado) sobre as tabelas gravadas"""
+
+    def _notificar_escrita(self, tabelas: Iterable[str]) -> None:
+        tabelas = set(tabelas)
+        for ouvinte in self.ouvintes_escrita:
+            # A carga já foi confirmada: um ouvinte com erro não pode fazê-la parecer falha
+            try:
+                ouvinte(tabelas)
+            except Exception:
+                logging.exception("Falha no ouvinte de escrita %r para %s", ouvinte, sorted(tabelas))
+        if self.conector is not None:
+            self.conector.notify_write(tabelas)
+
+    """Sessão que remove índices secundários e FKs durante a carga e os refaz no fim (ver SessaoCargaMassiva)"""
+
+    def _sessao_carga(self, carga_massiva: bool):
+        if not carga_massiva:
+            return nullcontext()
+        # Encerra a transação de leitura desta conexão: os locks dela bloqueariam o DROP INDEX da sessão
+        if self.conn is not None and not self.conn.closed:
+            self.conn.commit()
+        return SessaoCargaMassiva(lambda: psycopg2.connect(**asdict(self.db_config)))
+
+    """Após uma carga com IDs explícitos, alinha as sequences SERIAL ao maior ID gravado"""
+
+    def _sincronizar_sequencias(self) -> None:
+        if not self.usar_sequencias:
+            return
+        if self.alocador is None or self.alocador.conn is not self.conn:
+            self.alocador = AlocadorIds(self.conn)
+        for tabela, colunas in COLUNAS_TABELAS.items():
+            self.alocador.sincronizar(tabela, colunas[0])
+
+    """Chaves já gravadas de uma tabela pai, atualizadas pela marca d'água; fluxo_dados traz também data_criacao"""
+
+    def _chaves_existentes(self, tabela: str) -> CacheChaves:
+        if self.conn is None or self.conn.closed:
+            self.connect()
+        cache = self.cache_chaves.get(tabela)
+        if cache is None or cache.conn is not self.conn:
+            colunas_datas = ('data_criacao',) if tabela == 'fluxo_dados' else ()
+            cache = self.cache_chaves[tabela] = CacheChaves(
+                self.conn, tabela, COLUNAS_TABELAS[tabela][0], colunas_datas
+            )
+        cache.atualizar()
+        if not len(cache):
+            raise ValueError(f"Não há registros em {tabela} para o modo incremental")
+        return cache
+
     # tabela dados_origem
 
-    def gerar_dados_origem(self, num_registros: int = 100) -> pd.DataFrame:
+    @etapa_medida('gerar_dados_origem')
+    def gerar_dados_origem(self, num_registros: int = 100, vetorizado: bool = False) -> pd.DataFrame:
         # Garantir que há conexão
         if self.conn is None or self.conn.closed:
             self.connect()
             
         # Obter último ID
-        ultimo_id = self.get_ultimo_id('dados_origem', 'id_origem')
+        ultimo_id = self._base_ids('dados_origem', 'id_origem', num_registros)
+
+        if vetorizado:
+            self.df_origem = self._gerar_origem_vetorizado(ultimo_id + 1, num_registros)
+            return self.df_origem
             
         data_base = datetime(2023, 1, 1)
         dados_origem = []
@@ -153,11 +359,29 @@ class DataGenerator:
                 'descricao': self.fake.text(max_nb_chars=200)
             })           
 
-        self.df_origem = pd.DataFrame(dados_origem)
+        self.df_origem = self._compactar(pd.DataFrame(dados_origem))
         return self.df_origem
 
-    def gerar_fluxo_dados(self, num_registros: int = 200) -> pd.DataFrame:
-        if self.df_origem is None:
+    """Gera o lote de origens com sorteios NumPy; textos vêm do pool, se configurado"""
+
+    def _gerar_origem_vetorizado(self, primeiro_id: int, num_registros: int) -> pd.DataFrame:
+        rng = self.rng
+        sistemas = np.asarray(self.TIPOS_SISTEMAS, dtype=object)[
+            rng.integers(0, len(self.TIPOS_SISTEMAS), num_registros)
+        ]
+
+        return self._compactar(pd.DataFrame({
+            'id_origem': np.arange(primeiro_id, primeiro_id + num_registros, dtype=np.int64),
+            'nome_origem': 'Sistema ' + sistemas + ' - ' + self._textos('empresa', num_registros),
+            'tipo_dado': self._sortear_vocabulario(self.TIPOS_DADOS, num_registros),
+            'volume': rng.integers(10000, 10000001, num_registros),
+            'latencia': self._sortear_vocabulario(self.PADROES_LATENCIA, num_registros),
+            'descricao': self._textos('texto', num_registros, categorico=True)
+        }))
+
+    @etapa_medida('gerar_fluxo_dados')
+    def gerar_fluxo_dados(self, num_registros: int = 200, vetorizado: bool = False, incremental: bool = False) -> pd.DataFrame:
+        if self.df_origem is None and not incremental:
             raise ValueError("Execute gerar_dados_origem primeiro")
 
         # Garantir que há conexão
@@ -165,7 +389,20 @@ class DataGenerator:
             self.connect()
 
         # Obter último ID
-        ultimo_id = self.get_ultimo_id('fluxo_dados', 'id_fluxo')
+        ultimo_id = self._base_ids('fluxo_dados', 'id_fluxo', num_registros)
+
+        if incremental:
+            # Pais sorteados entre todas as origens já gravadas, sem df_origem
+            self.df_fluxo = self._gerar_fluxo_vetorizado(
+                ultimo_id + 1, num_registros, self._chaves_existentes('dados_origem').ids
+            )
+            return self.df_fluxo
+
+        if vetorizado:
+            self.df_fluxo = self._gerar_fluxo_vetorizado(
+                ultimo_id + 1, num_registros, self.df_origem['id_origem'].to_numpy()
+            )
+            return self.df_fluxo
 
         data_base = datetime(2023, 1, 1)    
         fluxo_dados = []
@@ -192,11 +429,84 @@ class DataGenerator:
                 'data_atualizacao': data_atualizacao
             })
 
-        self.df_fluxo = pd.DataFrame(fluxo_dados)
+        self.df_fluxo = self._compactar(pd.DataFrame(fluxo_dados))
         return self.df_fluxo    
 
-    def gerar_analises(self, num_registros: int = 300) -> pd.DataFrame:
-        if self.df_fluxo is None:
+    """Sorteia IDs pai de um array ou de um range contíguo (sem materializar o range)"""
+
+    def _sortear_ids(self, ids: Union[np.ndarray, range], num_registros: int) -> np.ndarray:
+        if isinstance(ids, range):
+            return self.rng.integers(ids.start, ids.stop, num_registros)
+        return self.rng.choice(ids, num_registros)
+
+    """Sorteia valores de um vocabulário fixo; no esquema compacto monta o Categorical direto dos códigos sorteados"""
+
+    def _sortear_vocabulario(self, vocabulario: List[str], num_registros: int) -> Union[np.ndarray, pd.Categorical]:
+        codigos = self.rng.integers(0, len(vocabulario), num_registros)
+        if self.esquema_compacto:
+            return pd.Categorical.from_codes(codigos, categories=vocabulario)
+        return np.asarray(vocabulario, dtype=object)[codigos]
+
+    """No esquema compacto, converte colunas de vocabulário fixo em Categorical, IDs/volume em int32 e datas em datetime64"""
+
+    def _compactar(self, df: pd.DataFrame) -> pd.DataFrame:
+        if not self.esquema_compacto:
+            return df
+
+        colunas = {}
+        for coluna in df.columns:
+            serie = df[coluna]
+            if coluna in VOCABULARIOS_COLUNAS:
+                if isinstance(serie.dtype, pd.CategoricalDtype):
+                    continue
+                vocabulario = getattr(self, VOCABULARIOS_COLUNAS[coluna])
+                # Valor fora do vocabulário viraria nulo em silêncio
+                if (serie.notna() & ~serie.isin(vocabulario)).any():
+                    raise ValueError(f"Valores fora do vocabulário na coluna {coluna}")
+                colunas[coluna] = pd.Categorical(serie, categories=vocabulario)
+            elif coluna in INTEIROS_COMPACTOS and serie.dtype != INTEIROS_COMPACTOS[coluna]:
+                colunas[coluna] = serie.astype(INTEIROS_COMPACTOS[coluna])
+            elif coluna in COLUNAS_DATAS and not pd.api.types.is_datetime64_dtype(serie.dtype):
+                colunas[coluna] = pd.to_datetime(serie)
+        return df.assign(**colunas) if colunas else df
+
+    """Gera o lote de fluxos em uma única passada de arrays NumPy, sem laço Python por linha"""
+
+    def _gerar_fluxo_vetorizado(
+        self,
+        primeiro_id: int,
+        num_registros: int,
+        ids_origem: Union[np.ndarray, range]
+    ) -> pd.DataFrame:
+        rng = self.rng
+        data_base = np.datetime64('2023-01-01T00:00', 'm')
+
+        # Mesma distribuição do modo por linha: dias 0-30, horas 0-23, minutos 0-59
+        minutos_criacao = (
+            rng.integers(0, 31, num_registros) * 1440
+            + rng.integers(0, 24, num_registros) * 60
+            + rng.integers(0, 60, num_registros)
+        )
+        minutos_atualizacao = (
+            rng.integers(0, 31, num_registros) * 1440
+            + rng.integers(0, 24, num_registros) * 60
+            + rng.integers(0, 60, num_registros)
+        )
+        data_criacao = data_base + minutos_criacao.astype('timedelta64[m]')
+        data_atualizacao = data_criacao + minutos_atualizacao.astype('timedelta64[m]')
+
+        return self._compactar(pd.DataFrame({
+            'id_fluxo': np.arange(primeiro_id, primeiro_id + num_registros, dtype=np.int64),
+            'id_origem': self._sortear_ids(ids_origem, num_registros),
+            'destino': self._sortear_vocabulario(self.DESTINOS, num_registros),
+            'status': self._sortear_vocabulario(self.STATUS, num_registros),
+            'data_criacao': data_criacao.astype('datetime64[ns]'),
+            'data_atualizacao': data_atualizacao.astype('datetime64[ns]')
+        }))
+
+    @etapa_medida('gerar_analises')
+    def gerar_analises(self, num_registros: int = 300, vetorizado: bool = False, incremental: bool = False) -> pd.DataFrame:
+        if self.df_fluxo is None and not incremental:
             raise ValueError("Execute gerar_fluxo_dados primeiro")
 
         # Garantir que há conexão
@@ -204,7 +514,24 @@ class DataGenerator:
             self.connect()
 
         # Obter último ID
-        ultimo_id = self.get_ultimo_id('analises', 'id_analise')
+        ultimo_id = self._base_ids('analises', 'id_analise', num_registros)
+
+        if incremental:
+            # Pais sorteados entre todos os fluxos já gravados, sem df_fluxo
+            fluxos = self._chaves_existentes('fluxo_dados')
+            self.df_analises = self._gerar_analises_vetorizado(
+                ultimo_id + 1, num_registros, fluxos.ids, fluxos.datas['data_criacao']
+            )
+            return self.df_analises
+
+        if vetorizado:
+            self.df_analises = self._gerar_analises_vetorizado(
+                ultimo_id + 1,
+                num_registros,
+                self.df_fluxo['id_fluxo'].to_numpy(),
+                self.df_fluxo['data_criacao'].to_numpy(dtype='datetime64[ns]')
+            )
+            return self.df_analises
 
         analises = []
 
@@ -224,9 +551,37 @@ class DataGenerator:
                 'responsavel': self.fake.name()
             })
 
-        self.df_analises = pd.DataFrame(analises)
+        self.df_analises = self._compactar(pd.DataFrame(analises))
         return self.df_analises
 
+    """Gera o lote de análises sorteando as posições dos fluxos pai de uma vez, sem .loc por linha"""
+
+    def _gerar_analises_vetorizado(
+        self,
+        primeiro_id: int,
+        num_registros: int,
+        ids_fluxo: np.ndarray,
+        datas_criacao: np.ndarray
+    ) -> pd.DataFrame:
+        rng = self.rng
+
+        # Um único fancy-index recupera id_fluxo e data_criacao dos fluxos sorteados
+        posicoes = rng.integers(0, len(ids_fluxo), num_registros)
+        dias = rng.integers(1, 61, num_registros).astype('timedelta64[D]')
+        data_analise = datas_criacao[posicoes] + dias
+        tipos = np.asarray(self.TIPOS_ANALISE, dtype=object)[
+            rng.integers(0, len(self.TIPOS_ANALISE), num_registros)
+        ]
+
+        return self._compactar(pd.DataFrame({
+            'id_analise': np.arange(primeiro_id, primeiro_id + num_registros, dtype=np.int64),
+            'id_fluxo': ids_fluxo[posicoes],
+            'hipoteses': 'Hipótese: ' + tipos + ' - ' + self._textos('frase', num_registros),
+            'resultado': self._textos('texto', num_registros, categorico=True),
+            'data_analise': data_analise.astype('datetime64[ns]'),
+            'responsavel': self._textos('nome', num_registros, categorico=True)
+        }))
+
     def gerar_e_inserir_dados(self, 
         num_origem: int = 100, 
         num_fluxo: int = 200, 
@@ -242,53 +597,89 @@ class DataGenerator:
         self.inserir_dados_no_banco()
         return self.df_origem, self.df_fluxo, self.df_analises
 
-    """Inserindo dados no banco"""
+    """Inserindo dados no banco: metodo='executemany' (padrão) ou 'copy' para carga em massa via COPY FROM STDIN; carga_massiva=True adia índices secundários e FKs para o fim"""
 
-    def inserir_dados_no_banco(self) -> None:
+    @etapa_medida('inserir_dados_no_banco', linhas=_linhas_dataframes)
+    def inserir_dados_no_banco(self, metodo: str = 'executemany', tamanho_lote: int = 50000, carga_massiva: bool = False) -> None:
        if not all([self.df_origem is not None, 
                   self.df_fluxo is not None, 
                   self.df_analises is not None]):
                raise ValueError("Gere todos os dados antes de inserir no banco")
+
+       if metodo not in ('executemany', 'copy'):
+               raise ValueError(f"Método de inserção inválido: {metodo}")
        
        if self.conn is None or self.conn.closed:
                self.connect()
                
-       try:
-           with self.conn.cursor() as cursor:
-               # Inserção em lote dados_origem
-               dados_origem = [tuple(x) for x in self.df_origem.values]
-               cursor.executemany("""
-                       INSERT INTO dados_origem 
-                               (id_origem, nome_origem, tipo_dado, volume, latencia, 
-                                descricao)
-                       VALUES (%s, %s, %s, %s, %s, %s)
-                       """, dados_origem)
+       with self._sessao_carga(carga_massiva):
+           try:
+               with self.conn.cursor() as cursor:
+                   if metodo == 'copy':
+                       # Carga em massa: respeita a ordem das FKs (origem -> fluxo -> analises)
+                       self._copiar_dataframe(cursor, 'dados_origem', self.df_origem, tamanho_lote)
+                       self._copiar_dataframe(cursor, 'fluxo_dados', self.df_fluxo, tamanho_lote)
+                       self._copiar_dataframe(cursor, 'analises', self.df_analises, tamanho_lote)
+                   else:
+                       # Inserção em lote dados_origem
+                       dados_origem = [tuple(x) for x in self.df_origem.values]
+                       cursor.executemany("""
+                               INSERT INTO dados_origem 
+                                       (id_origem, nome_origem, tipo_dado, volume, latencia, 
+                                        descricao)
+                               VALUES (%s, %s, %s, %s, %s, %s)
+                               """, dados_origem)
                
-               # Inserção em lote fluxo_dados
-               dados_fluxo = [tuple(x) for x in self.df_fluxo.values]
-               cursor.executemany("""
-                       INSERT INTO fluxo_dados 
-                               (id_fluxo, id_origem, destino, status, 
-                                data_criacao, data_atualizacao)
-                       VALUES (%s, %s, %s, %s, %s, %s)
-                       """, dados_fluxo)
+                       # Inserção em lote fluxo_dados
+                       dados_fluxo = [tuple(x) for x in self.df_fluxo.values]
+                       cursor.executemany("""
+                               INSERT INTO fluxo_dados 
+                                       (id_fluxo, id_origem, destino, status, 
+                                        data_criacao, data_atualizacao)
+                               VALUES (%s, %s, %s, %s, %s, %s)
+                               """, dados_fluxo)
                
-               # Inserção em lote analises
-               dados_analises = [tuple(x) for x in self.df_analises.values]
-               cursor.executemany("""
-                       INSERT INTO analises 
-                               (id_analise, id_fluxo, hipoteses, resultado, 
-                                data_analise, responsavel)
-                       VALUES (%s, %s, %s, %s, %s, %s)
-                       """, dados_analises)
+                       # Inserção em lote analises
+                       dados_analises = [tuple(x) for x in self.df_analises.values]
+                       cursor.executemany("""
+                               INSERT INTO analises 
+                                       (id_analise, id_fluxo, hipoteses, resultado, 
+                                        data_analise, responsavel)
+                               VALUES (%s, %s, %s, %s, %s, %s)
+                               """, dados_analises)
                
-               self.conn.commit()
+                   self.conn.commit()
                        
-       except Exception as e:
-               self.conn.rollback()
-               raise Exception(f"Erro ao inserir dados: {e}")
-       finally:
-               cursor.close()
+           except Exception as e:
+                   self.conn.rollback()
+                   raise Exception(f"Erro ao inserir dados: {e}")
+           finally:
+                   cursor.close()
+
+       self._sincronizar_sequencias()
+       self._notificar_escrita(COLUNAS_TABELAS)
+
+    """Envia um DataFrame via COPY FROM STDIN em lotes de CSV em memória, sem gerar uma tupla Python por linha"""
+
+    def _copiar_dataframe(self, cursor, tabela: str, df: pd.DataFrame, tamanho_lote: int = 50000) -> None:
+        colunas = COLUNAS_TABELAS[tabela]
+        sql = f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+
+        for inicio in range(0, len(df), tamanho_lote):
+            lote = df.iloc[inicio:inicio + tamanho_lote]
+            # Inteiros com nulos viram float64 no pandas e sairiam como "1.0", que o COPY rejeita em INTEGER
+            flutuantes = {
+                coluna: 'Int64' for coluna in colunas
+                if coluna in INTEIROS_COMPACTOS and lote[coluna].dtype.kind == 'f'
+            }
+            if flutuantes:
+                lote = lote.astype(flutuantes)
+            buffer = io.StringIO()
+            lote.to_csv(
+                buffer, columns=colunas, index=False, header=False, na_rep='\\N'
+            )
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
         
     """ Executa todo o processo de geração e inserção de dados, retorna tupla com os 3 dataframes gerados """
 
@@ -303,6 +694,347 @@ class DataGenerator:
         self.inserir_dados_no_banco()
         return self.df_origem, self.df_fluxo, self.df_analises
 
+    """Insere via COPY apenas as tabelas informadas (ex.: o delta do modo incremental), na ordem das FKs"""
+
+    def inserir_tabelas(self, tabelas: Iterable[str], tamanho_lote: int = 50000) -> Dict[str, int]:
+        tabelas = set(tabelas)
+        tabelas = [tabela for tabela in COLUNAS_TABELAS if tabela in tabelas]
+        for tabela in tabelas:
+            if getattr(self, ATRIBUTOS_TABELAS[tabela]) is None:
+                raise ValueError(f"Gere {tabela} antes de inserir no banco")
+
+        if self.conn is None or self.conn.closed:
+            self.connect()
+
+        try:
+            with self.conn.cursor() as cursor:
+                for tabela in tabelas:
+                    self._copiar_dataframe(cursor, tabela, getattr(self, ATRIBUTOS_TABELAS[tabela]), tamanho_lote)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            raise Exception(f"Erro ao inserir dados: {e}")
+
+        self._sincronizar_sequencias()
+        self._notificar_escrita(tabelas)
+        return {tabela: len(getattr(self, ATRIBUTOS_TABELAS[tabela])) for tabela in tabelas}
+
+    """Acrescenta num_fluxo fluxos e num_analises análises aos dados já gravados, sorteando os pais no banco.
+
+    Os fluxos são inseridos antes de gerar as análises, então as novas análises
+    também podem referenciar os fluxos deste delta. Retorna as linhas por tabela.
+    """
+
+    @etapa_medida('gerar_incremental', linhas=_linhas_por_tabela)
+    def gerar_incremental(self, num_fluxo: int = 0, num_analises: int = 0, tamanho_lote: int = 50000) -> Dict[str, int]:
+        linhas = {}
+        if num_fluxo:
+            self.gerar_fluxo_dados(num_fluxo, incremental=True)
+            linhas.update(self.inserir_tabelas(['fluxo_dados'], tamanho_lote))
+        if num_analises:
+            self.gerar_analises(num_analises, incremental=True)
+            linhas.update(self.inserir_tabelas(['analises'], tamanho_lote))
+        return linhas
+
+    """Memória ocupada por df_origem, df_fluxo e df_analises: bytes atuais, estimativa sem esquema compacto e a redução"""
+
+    def relatorio_memoria(self) -> pd.DataFrame:
+        linhas = []
+        for tabela, atributo in ATRIBUTOS_TABELAS.items():
+            df = getattr(self, atributo)
+            if df is None:
+                continue
+            uso = uso_memoria(df)
+            linhas.append({
+                'tabela': tabela,
+                'linhas': len(df),
+                'bytes': int(uso['bytes'].sum()),
+                'bytes_padrao': int(uso['bytes_padrao'].sum())
+            })
+        relatorio = pd.DataFrame(linhas, columns=['tabela', 'linhas', 'bytes', 'bytes_padrao'])
+        relatorio['reducao'] = relatorio['bytes_padrao'] / relatorio['bytes']
+        return relatorio
+
+    """Grava df_origem, df_fluxo e df_analises como snapshot Parquet, para reutilizar a massa sem gerá-la de novo"""
+
+    def salvar_snapshot(self, diretorio: str, compressao: str = 'zstd') -> Dict[str, str]:
+        if any(getattr(self, atributo) is None for atributo in ATRIBUTOS_TABELAS.values()):
+            raise ValueError("Gere todos os dados antes de salvar o snapshot")
+
+        return salvar_snapshot(
+            {tabela: getattr(self, atributo) for tabela, atributo in ATRIBUTOS_TABELAS.items()},
+            diretorio,
+            compressao=compressao
+        )
+
+    """Recarrega os DataFrames de um snapshot (cópia Arrow mapeada em memória, colunas categóricas preservadas) sem tocar no banco"""
+
+    @etapa_medida('carregar_snapshot', linhas=_linhas_dataframes)
+    def carregar_snapshot(self, diretorio: str) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        dataframes = carregar_snapshot(diretorio, ATRIBUTOS_TABELAS)
+        for tabela, atributo in ATRIBUTOS_TABELAS.items():
+            setattr(self, atributo, dataframes[tabela])
+        return self.df_origem, self.df_fluxo, self.df_analises
+
+    """Carrega um snapshot do disco direto no banco via COPY, lendo o Parquet em lotes; retorna as linhas por tabela.
+
+    Os IDs do snapshot são gravados como estão: use em um banco sem essas linhas
+    (ex.: ao recriar um banco de testes).
+    """
+
+    @etapa_medida('inserir_snapshot', linhas=_linhas_por_tabela)
+    def inserir_snapshot(self, diretorio: str, tamanho_lote: int = 50000, carga_massiva: bool = False) -> Dict[str, int]:
+        for tabela in COLUNAS_TABELAS:
+            if not os.path.exists(arquivo_tabela(diretorio, tabela)):
+                raise FileNotFoundError(f"Snapshot sem a tabela {tabela}: {arquivo_tabela(diretorio, tabela)}")
+
+        if self.conn is None or self.conn.closed:
+            self.connect()
+
+        linhas = {}
+        with self._sessao_carga(carga_massiva):
+            try:
+                with self.conn.cursor() as cursor:
+                    # Ordem das FKs (origem -> fluxo -> analises), como em inserir_dados_no_banco
+                    for tabela in COLUNAS_TABELAS:
+                        linhas[tabela] = 0
+                        for lote in iterar_lotes(diretorio, tabela, tamanho_lote):
+                            self._copiar_dataframe(cursor, tabela, lote, tamanho_lote)
+                            linhas[tabela] += len(lote)
+                self.conn.commit()
+            except Exception as e:
+                self.conn.rollback()
+                raise Exception(f"Erro ao inserir snapshot: {e}")
+
+        self._sincronizar_sequencias()
+        self._notificar_escrita(COLUNAS_TABELAS)
+        return linhas
+
+    """Divide total em num_lotes partes com arredondamento para cima, antecipando as linhas nos primeiros lotes"""
+
+    @staticmethod
+    def _planejar_lotes(total: int, num_lotes: int) -> List[int]:
+        acumulado = [min(total, math.ceil(total * (i + 1) / num_lotes)) for i in range(num_lotes)]
+        return [fim - inicio for inicio, fim in zip([0] + acumulado[:-1], acumulado)]
+
+    """Cadeia de geração em lotes: cada lote produz origem -> fluxo -> analises referenciando apenas pais já gerados"""
+
+    def _gerar_lotes(
+        self,
+        num_origem: int,
+        num_fluxo: int,
+        num_analises: int,
+        tamanho_lote: int
+    ) -> Iterator[Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]]:
+        if num_fluxo > 0 and num_origem < 1:
+            raise ValueError("Fluxos exigem ao menos um registro de origem")
+        if num_analises > 0 and num_fluxo < 1:
+            raise ValueError("Análises exigem ao menos um registro de fluxo")
+
+        primeiro_origem = self._base_ids('dados_origem', 'id_origem', num_origem) + 1
+        proximo_fluxo = self._base_ids('fluxo_dados', 'id_fluxo', num_fluxo) + 1
+        proximo_analise = self._base_ids('analises', 'id_analise', num_analises) + 1
+
+        num_lotes = max(1, math.ceil(max(num_origem, num_fluxo, num_analises) / tamanho_lote))
+        lotes = zip(
+            self._planejar_lotes(num_origem, num_lotes),
+            self._planejar_lotes(num_fluxo, num_lotes),
+            self._planejar_lotes(num_analises, num_lotes)
+        )
+
+        proximo_origem = primeiro_origem
+        # Pais das análises: apenas o último lote de fluxos não vazio fica em memória
+        ids_fluxo = np.empty(0, dtype=np.int64)
+        datas_criacao = np.empty(0, dtype='datetime64[ns]')
+
+        for n_origem, n_fluxo, n_analises in lotes:
+            df_origem = self._gerar_origem_vetorizado(proximo_origem, n_origem)
+            proximo_origem += n_origem
+
+            # Origens identificadas por um range contíguo: memória constante
+            df_fluxo = self._gerar_fluxo_vetorizado(
+                proximo_fluxo, n_fluxo, range(primeiro_origem, proximo_origem)
+            )
+            proximo_fluxo += n_fluxo
+            if n_fluxo > 0:
+                ids_fluxo = df_fluxo['id_fluxo'].to_numpy()
+                datas_criacao = df_fluxo['data_criacao'].to_numpy(dtype='datetime64[ns]')
+
+            df_analises = self._gerar_analises_vetorizado(
+                proximo_analise, n_analises, ids_fluxo, datas_criacao
+            )
+            proximo_analise += n_analises
+
+            yield df_origem, df_fluxo, df_analises
+
+    """Gera e insere os dados em lotes de tamanho fixo com memória limitada, produzindo o progresso de cada lote"""
+
+    def gerar_e_inserir_em_lotes(
+        self,
+        num_origem: int = 100,
+        num_fluxo: int = 200,
+        num_analises: int = 300,
+        tamanho_lote: int = 50000
+    ) -> Iterator[Dict]:
+        if tamanho_lote < 1:
+            raise ValueError("tamanho_lote deve ser positivo")
+
+        if self.conn is None or self.conn.closed:
+            self.connect()
+
+        inicio_total = time.perf_counter()
+        linhas_total = 0
+        lotes = self._gerar_lotes(num_origem, num_fluxo, num_analises, tamanho_lote)
+        numero = 0
+
+        while True:
+            inicio_lote = time.perf_counter()
+            try:
+                df_origem, df_fluxo, df_analises = next(lotes)
+            except StopIteration:
+                break
+            fim_geracao = time.perf_counter()
+
+            try:
+                with self.conn.cursor() as cursor:
+                    self._copiar_dataframe(cursor, 'dados_origem', df_origem)
+                    self._copiar_dataframe(cursor, 'fluxo_dados', df_fluxo)
+                    self._copiar_dataframe(cursor, 'analises', df_analises)
+                self.conn.commit()
+            except Exception as e:
+                self.conn.rollback()
+                raise Exception(f"Erro ao inserir lote {numero + 1}: {e}")
+            fim_insercao = time.perf_counter()
+            self._notificar_escrita(COLUNAS_TABELAS)
+
+            numero += 1
+            linhas = len(df_origem) + len(df_fluxo) + len(df_analises)
+            # Geração e COPY medidas separadamente: mostra qual das duas limita o lote
+            for etapa, segundos in (('lote_geracao', fim_geracao - inicio_lote), ('lote_insercao', fim_insercao - fim_geracao)):
+                self.metricas.observar('generator_stage_seconds', segundos, stage=etapa, status='ok')
+                self.metricas.contar('generator_rows_total', linhas, stage=etapa)
+            linhas_total += linhas
+            duracao = time.perf_counter() - inicio_lote
+
+            yield {
+                'lote': numero,
+                'origem': len(df_origem),
+                'fluxo': len(df_fluxo),
+                'analises': len(df_analises),
+                'segundos': duracao,
+                'linhas_por_segundo': linhas / duracao if duracao > 0 else float('inf'),
+                'linhas_acumuladas': linhas_total,
+                'segundos_acumulados': time.perf_counter() - inicio_total
+            }
+
+        self._sincronizar_sequencias()
+
+    """Gera (e opcionalmente insere) os dados em paralelo, dividindo os intervalos de IDs em shards de tamanho fixo.
+
+    Cada shard usa uma seed derivada de (seed, shard, tabela), então o resultado
+    é idêntico para qualquer num_workers. Com inserir=True cada worker grava
+    seus shards pela própria conexão: primeiro todas as origens, depois fluxos e
+    análises, para que as FKs entre shards já estejam persistidas. carga_massiva
+    remove índices secundários e FKs durante as fases e os refaz no fim.
+    """
+
+    @etapa_medida('gerar_paralelo', linhas=_linhas_paralelo)
+    def gerar_paralelo(
+        self,
+        num_origem: int = 100,
+        num_fluxo: int = 200,
+        num_analises: int = 300,
+        num_workers: Optional[int] = None,
+        tamanho_shard: int = 50000,
+        inserir: bool = False,
+        carga_massiva: bool = False
+    ) -> Union[Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame], Dict]:
+        if tamanho_shard < 1:
+            raise ValueError("tamanho_shard deve ser positivo")
+        if num_fluxo > 0 and num_origem < 1:
+            raise ValueError("Fluxos exigem ao menos um registro de origem")
+        if num_analises > 0 and num_fluxo < 1:
+            raise ValueError("Análises exigem ao menos um registro de fluxo")
+
+        if self.conn is None or self.conn.closed:
+            self.connect()
+
+        shards = self._planejar_shards(num_origem, num_fluxo, num_analises, tamanho_shard)
+        num_workers = num_workers or os.cpu_count() or 1
+        contexto = (self.db_config, self.seed, self.pool_textos, self.esquema_compacto)
+        inicio = time.perf_counter()
+
+        if inserir:
+            fases = [('dados_origem',), ('fluxo_dados', 'analises')]
+        else:
+            fases = [('dados_origem', 'fluxo_dados', 'analises')]
+
+        resultados = []
+        with self._sessao_carga(inserir and carga_massiva):
+            for tabelas in fases:
+                tarefas = [(contexto, shard, tabelas, inserir) for shard in shards]
+                if num_workers == 1:
+                    resultados.extend(_executar_shard(*tarefa) for tarefa in tarefas)
+                else:
+                    # forkserver/spawn, nunca fork: um fork com threads ativas (log assíncrono, pool) herdaria locks travados
+                    with ProcessPoolExecutor(max_workers=num_workers, mp_context=_decoder_context()) as executor:
+                        # map preserva a ordem dos shards, independente de qual worker terminar antes
+                        resultados.extend(executor.map(_executar_shard, *zip(*tarefas)))
+
+        if inserir:
+            self._sincronizar_sequencias()
+            self._notificar_escrita(COLUNAS_TABELAS)
+            linhas = sum(resultados)
+            duracao = time.perf_counter() - inicio
+            return {
+                'shards': len(shards),
+                'linhas': linhas,
+                'segundos': duracao,
+                'linhas_por_segundo': linhas / duracao if duracao > 0 else float('inf')
+            }
+
+        self.df_origem, self.df_fluxo, self.df_analises = (
+            pd.concat([r[i] for r in resultados], ignore_index=True) for i in range(3)
+        )
+        return self.df_origem, self.df_fluxo, self.df_analises
+
+    """Define os shards a partir do último ID (ou do bloco reservado); a divisão depende apenas dos totais e de tamanho_shard"""
+
+    def _planejar_shards(
+        self,
+        num_origem: int,
+        num_fluxo: int,
+        num_analises: int,
+        tamanho_shard: int
+    ) -> List[Dict]:
+        num_shards = max(1, math.ceil(max(num_origem, num_fluxo, num_analises) / tamanho_shard))
+        # As análises de um shard referenciam os fluxos do próprio shard: nenhum shard fica sem fluxo
+        if num_analises > 0:
+            num_shards = min(num_shards, num_fluxo)
+
+        primeiro_origem = self._base_ids('dados_origem', 'id_origem', num_origem) + 1
+        proximo = {
+            'origem': primeiro_origem,
+            'fluxo': self._base_ids('fluxo_dados', 'id_fluxo', num_fluxo) + 1,
+            'analises': self._base_ids('analises', 'id_analise', num_analises) + 1
+        }
+
+        shards = []
+        planos = zip(
+            self._planejar_lotes(num_origem, num_shards),
+            self._planejar_lotes(num_fluxo, num_shards),
+            self._planejar_lotes(num_analises, num_shards)
+        )
+        for indice, (n_origem, n_fluxo, n_analises) in enumerate(planos):
+            shard = {'indice': indice}
+            for chave, n in (('origem', n_origem), ('fluxo', n_fluxo), ('analises', n_analises)):
+                shard[chave] = (proximo[chave], n)
+                proximo[chave] += n
+            # Fluxos sorteiam entre todas as origens dos shards até este
+            shard['ids_origem'] = range(primeiro_origem, proximo['origem'])
+            shards.append(shard)
+        return shards
+
     """ Fechando a conexão com o banco de dados """     
     def close(self) -> None:
         if self.conn is not None:
@@ -316,4 +1048,50 @@ class DataGenerator:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Fecha conexão ao sair do context manager"""
-        self.close()
\ No newline at end of file
+        self.close()
+
+
+"""Executa um shard em um processo worker: gera as tabelas pedidas e devolve os DataFrames ou insere pela própria conexão"""
+
+def _executar_shard(contexto: Tuple, shard: Dict, tabelas: Tuple[str, ...], inserir: bool):
+    db_config, seed, pool_textos, esquema_compacto = contexto
+    generator = DataGenerator(db_config, seed=seed, esquema_compacto=esquema_compacto)
+    generator.pool_textos = pool_textos
+
+    def preparar(tabela_indice: int) -> None:
+        # Seed derivada de (seed, shard, tabela): independe do número de workers
+        sequencia = np.random.SeedSequence([seed, shard['indice'], tabela_indice])
+        generator.rng = np.random.default_rng(sequencia)
+        generator.fake.seed_instance(int(sequencia.generate_state(1)[0]))
+
+    dfs = {}
+    if 'dados_origem' in tabelas:
+        preparar(0)
+        dfs['dados_origem'] = generator._gerar_origem_vetorizado(*shard['origem'])
+    if 'fluxo_dados' in tabelas:
+        preparar(1)
+        dfs['fluxo_dados'] = generator._gerar_fluxo_vetorizado(*shard['fluxo'], shard['ids_origem'])
+    if 'analises' in tabelas:
+        preparar(2)
+        df_fluxo = dfs['fluxo_dados']
+        dfs['analises'] = generator._gerar_analises_vetorizado(
+            *shard['analises'],
+            df_fluxo['id_fluxo'].to_numpy(),
+            df_fluxo['data_criacao'].to_numpy(dtype='datetime64[ns]')
+        )
+
+    if not inserir:
+        return dfs['dados_origem'], dfs['fluxo_dados'], dfs['analises']
+
+    generator.connect()
+    try:
+        with generator.conn.cursor() as cursor:
+            for tabela in tabelas:
+                generator._copiar_dataframe(cursor, tabela, dfs[tabela])
+        generator.conn.commit()
+    except Exception as e:
+        generator.conn.rollback()
+        raise Exception(f"Erro ao inserir shard {shard['indice']}: {e}")
+    finally:
+        generator.close()
+    return sum(len(df) for df in dfs.values())
@@ -0,0 +1,87 @@
+from typing import Dict, Tuple
+
+
+class AlocadorIds:
+    """Reserva blocos contíguos de IDs nas sequences SERIAL das tabelas.
+
+    Cada reserva roda em transação própria sob um advisory lock por sequence,
+    então vários processos geradores podem reservar blocos no mesmo banco sem
+    colisão. Inserções que usam o DEFAULT nextval() diretamente não passam pelo
+    lock e não devem concorrer com cargas que usam blocos reservados.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._sequences: Dict[Tuple[str, str], str] = {}
+        self._sincronizadas = set()
+
+    """Nome qualificado da sequence SERIAL de tabela.coluna"""
+
+    def _sequence(self, cursor, tabela: str, coluna: str) -> str:
+        chave = (tabela, coluna)
+        if chave not in self._sequences:
+            cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", (tabela, coluna))
+            sequence = cursor.fetchone()[0]
+            if sequence is None:
+                raise ValueError(f"{tabela}.{coluna} não possui sequence associada")
+            self._sequences[chave] = sequence
+        return self._sequences[chave]
+
+    """Último ID já entregue pela sequence (0 se nunca usada)"""
+
+    def _ultimo_entregue(self, cursor, sequence: str) -> int:
+        cursor.execute(f"SELECT last_value, is_called FROM {sequence}")
+        last_value, is_called = cursor.fetchone()
+        return last_value if is_called else last_value - 1
+
+    """Avança a sequence até MAX(coluna) sem nunca recuá-la; supõe o advisory lock já obtido"""
+
+    def _sincronizar(self, cursor, tabela: str, coluna: str, sequence: str) -> int:
+        cursor.execute(f"SELECT COALESCE(MAX({coluna}), 0) FROM {tabela}")
+        alvo = max(cursor.fetchone()[0], self._ultimo_entregue(cursor, sequence))
+        if alvo >= 1:
+            cursor.execute("SELECT setval(%s, %s, true)", (sequence, alvo))
+        self._sincronizadas.add((tabela, coluna))
+        return alvo
+
+    def _bloquear(self, cursor, sequence: str) -> None:
+        cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (sequence,))
+
+    """Reserva quantidade IDs contíguos e retorna o primeiro deles"""
+
+    def reservar(self, tabela: str, coluna: str, quantidade: int) -> int:
+        if quantidade < 0:
+            raise ValueError("A quantidade de IDs reservados não pode ser negativa")
+        try:
+            with self.conn.cursor() as cursor:
+                sequence = self._sequence(cursor, tabela, coluna)
+                self._bloquear(cursor, sequence)
+
+                # Na primeira reserva, pula IDs gravados explicitamente por cargas antigas
+                if (tabela, coluna) not in self._sincronizadas:
+                    self._sincronizar(cursor, tabela, coluna, sequence)
+
+                primeiro = self._ultimo_entregue(cursor, sequence) + 1
+                if quantidade > 0:
+                    cursor.execute(
+                        "SELECT setval(%s, %s, true)", (sequence, primeiro + quantidade - 1)
+                    )
+            self.conn.commit()
+            return primeiro
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    """Ressincroniza a sequence com MAX(coluna) após uma carga com IDs explícitos; retorna o último ID"""
+
+    def sincronizar(self, tabela: str, coluna: str) -> int:
+        try:
+            with self.conn.cursor() as cursor:
+                sequence = self._sequence(cursor, tabela, coluna)
+                self._bloquear(cursor, sequence)
+                ultimo = self._sincronizar(cursor, tabela, coluna, sequence)
+            self.conn.commit()
+            return ultimo
+        except Exception:
+            self.conn.rollback()
+            raise
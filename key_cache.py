@@ -0,0 +1,65 @@
+import io
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class CacheChaves:
+    """Chaves já gravadas de uma tabela em arrays NumPy compactos, atualizados pelo maior ID lido.
+
+    ids fica em int32 (as colunas SERIAL são INTEGER) e cada coluna de data
+    pedida em datetime64, alinhada a ids. atualizar() lê só as linhas com ID
+    acima da marca d'água, então sortear pais entre milhões de linhas não
+    relê a tabela. Linhas removidas, ou confirmadas com ID abaixo da marca
+    depois da leitura, só aparecem em recarregar().
+    """
+
+    def __init__(self, conn, tabela: str, coluna_id: str, colunas_datas: Tuple[str, ...] = ()):
+        self.conn = conn
+        self.tabela = tabela
+        self.coluna_id = coluna_id
+        self.colunas_datas = tuple(colunas_datas)
+        self.marca = 0
+        self.ids = np.empty(0, dtype=np.int32)
+        self.datas: Dict[str, np.ndarray] = {
+            coluna: np.empty(0, dtype='datetime64[us]') for coluna in self.colunas_datas
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    """Acrescenta as linhas com ID acima da marca d'água (via COPY, sem uma tupla Python por linha); retorna quantas"""
+
+    def atualizar(self) -> int:
+        colunas = [self.coluna_id, *self.colunas_datas]
+        with self.conn.cursor() as cursor:
+            sql = cursor.mogrify(
+                f"COPY (SELECT {', '.join(colunas)} FROM {self.tabela} "
+                f"WHERE {self.coluna_id} > %s ORDER BY {self.coluna_id}) TO STDOUT WITH (FORMAT csv)",
+                (self.marca,)
+            ).decode()
+            buffer = io.StringIO()
+            cursor.copy_expert(sql, buffer)
+
+        if buffer.tell() == 0:
+            return 0
+        buffer.seek(0)
+        novas = pd.read_csv(
+            buffer, header=None, names=colunas,
+            dtype={self.coluna_id: np.int32}, parse_dates=list(self.colunas_datas)
+        )
+
+        self.ids = np.concatenate([self.ids, novas[self.coluna_id].to_numpy()])
+        for coluna in self.colunas_datas:
+            self.datas[coluna] = np.concatenate([self.datas[coluna], novas[coluna].to_numpy(dtype='datetime64[us]')])
+        self.marca = int(self.ids[-1])
+        return len(novas)
+
+    """Descarta o cache e lê a tabela inteira de novo"""
+
+    def recarregar(self) -> int:
+        self.marca = 0
+        self.ids = np.empty(0, dtype=np.int32)
+        self.datas = {coluna: np.empty(0, dtype='datetime64[us]') for coluna in self.colunas_datas}
+        return self.atualizar()
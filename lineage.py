@@ -0,0 +1,307 @@
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from copy_decoder import copy_to_dataframe
+from postgres_setup import PostgresConnector
+from query_cache import ALL_TABLES
+
+
+"""Leitura incremental de cada tabela da cadeia, das filhas para as pais: toda FK lida já tem o pai confirmado
+quando a tabela pai é lida em seguida"""
+
+CONSULTAS_LINHAGEM = {
+    'analises': "SELECT id_analise, id_fluxo FROM analises WHERE id_analise > %s ORDER BY id_analise",
+    'fluxo_dados': "SELECT id_fluxo, id_origem, destino FROM fluxo_dados WHERE id_fluxo > %s ORDER BY id_fluxo",
+    'dados_origem': "SELECT id_origem FROM dados_origem WHERE id_origem > %s ORDER BY id_origem"
+}
+
+""" Adjacência CSR: os filhos do pai p são filhos[offsets[p]:offsets[p + 1]], na ordem de inserção """
+
+def _csr(pais: np.ndarray, num_pais: int) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(num_pais + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pais, minlength=num_pais), out=offsets[1:])
+    return offsets, np.argsort(pais, kind='stable').astype(np.int32)
+
+""" Filhos de vários pais de uma vez, sem laço Python: concatena as fatias CSR de cada posição """
+
+def _expandir(offsets: np.ndarray, filhos: np.ndarray, posicoes: np.ndarray) -> np.ndarray:
+    inicios = offsets[posicoes]
+    tamanhos = offsets[posicoes + 1] - inicios
+    total = int(tamanhos.sum())
+    if total == 0:
+        return filhos[:0]
+    deslocamentos = np.repeat(inicios - (np.cumsum(tamanhos) - tamanhos), tamanhos)
+    return filhos[deslocamentos + np.arange(total)]
+
+""" Posições dos IDs procurados no array ordenado ids; KeyError se algum não estiver indexado """
+
+def _posicoes(ids: np.ndarray, procurados: np.ndarray, tabela: str) -> np.ndarray:
+    posicoes = np.searchsorted(ids, procurados)
+    ausentes = posicoes >= len(ids)
+    ausentes[~ausentes] = ids[posicoes[~ausentes]] != procurados[~ausentes]
+    if ausentes.any():
+        raise KeyError(f"IDs ausentes de {tabela} no índice de linhagem: {procurados[ausentes][:5].tolist()}")
+    return posicoes.astype(np.int32)
+
+""" Posição de um único ID; o escalar vai no dtype de ids, senão searchsorted converte o array inteiro """
+
+def _posicao(ids: np.ndarray, procurado: int, tabela: str) -> int:
+    posicao = int(np.searchsorted(ids, ids.dtype.type(procurado)))
+    if posicao >= len(ids) or ids[posicao] != procurado:
+        raise KeyError(f"ID {procurado} ausente de {tabela} no índice de linhagem")
+    return posicao
+
+
+class IndiceLinhagem:
+    """Linhagem dados_origem → fluxo_dados → analises em memória, em arrays NumPy compactos.
+
+    Cada tabela é guardada como arrays int32 ordenados por ID (posição = índice
+    do ID) mais a posição do pai de cada linha; destino vira um código int32 de
+    um vocabulário. As adjacências pai → filhos ficam em formato CSR (offsets +
+    posições dos filhos), montadas na primeira consulta após uma atualização,
+    então cada consulta é uma busca binária mais uma fatia de array.
+
+    atualizar() lê só as linhas com ID acima da marca d'água de cada tabela.
+    Como ResumosAnaliticos, o índice acompanha inserções: linhas alteradas
+    (ex.: destino) ou removidas, e cargas concorrentes que confirmam IDs
+    menores depois da leitura, exigem reconstruir().
+
+    Ouvintes de escrita disparam de qualquer thread: atualizações, cargas e a
+    montagem das adjacências são serializadas por um lock.
+    """
+
+    def __init__(self, connector: Optional[PostgresConnector] = None):
+        self.connector = connector
+        # Reentrante: atualizar() chama reconstruir(), que chama atualizar()
+        self._lock = threading.RLock()
+        self._limpar()
+
+    def _limpar(self) -> None:
+        self.marcas = {tabela: 0 for tabela in CONSULTAS_LINHAGEM}
+        self.ids_origem = np.empty(0, dtype=np.int32)
+        self.ids_fluxo = np.empty(0, dtype=np.int32)
+        self.ids_analise = np.empty(0, dtype=np.int32)
+        # Posição (não ID) do pai de cada linha
+        self.pai_do_fluxo = np.empty(0, dtype=np.int32)
+        self.pai_da_analise = np.empty(0, dtype=np.int32)
+        self.destino_do_fluxo = np.empty(0, dtype=np.int32)
+        self.destinos: List[str] = []
+        self._codigos_destino: Dict[str, int] = {}
+        self._csr: Optional[Dict[str, Tuple[np.ndarray, np.ndarray]]] = None
+
+    """Acrescenta linhas novas ao índice; os IDs de cada tabela devem vir em ordem crescente e acima dos já indexados"""
+
+    def acrescentar(
+        self,
+        origens: Sequence[int] = (),
+        fluxos: Optional[pd.DataFrame] = None,
+        analises: Optional[pd.DataFrame] = None
+        ) -> None:
+        with self._lock:
+            self._acrescentar(origens, fluxos, analises)
+
+    def _acrescentar(
+        self,
+        origens: Sequence[int],
+        fluxos: Optional[pd.DataFrame],
+        analises: Optional[pd.DataFrame]
+        ) -> None:
+        # Tudo é validado antes de qualquer atribuição: uma carga inválida não deixa o índice pela metade
+        ids_origem = self._anexar(self.ids_origem, np.asarray(origens, dtype=np.int32), 'dados_origem')
+        ids_fluxo, pai_do_fluxo = self.ids_fluxo, self.pai_do_fluxo
+        destinos = None
+        if fluxos is not None and len(fluxos):
+            ids_fluxo = self._anexar(ids_fluxo, fluxos['id_fluxo'].to_numpy(dtype=np.int32), 'fluxo_dados')
+            pai_do_fluxo = np.concatenate([
+                pai_do_fluxo, _posicoes(ids_origem, fluxos['id_origem'].to_numpy(dtype=np.int32), 'dados_origem')
+            ])
+            destinos = fluxos['destino']
+        ids_analise, pai_da_analise = self.ids_analise, self.pai_da_analise
+        if analises is not None and len(analises):
+            ids_analise = self._anexar(ids_analise, analises['id_analise'].to_numpy(dtype=np.int32), 'analises')
+            pai_da_analise = np.concatenate([
+                pai_da_analise, _posicoes(ids_fluxo, analises['id_fluxo'].to_numpy(dtype=np.int32), 'fluxo_dados')
+            ])
+
+        if destinos is not None:
+            self.destino_do_fluxo = np.concatenate([self.destino_do_fluxo, self._codificar(destinos)])
+        self.ids_origem, self.ids_fluxo, self.ids_analise = ids_origem, ids_fluxo, ids_analise
+        self.pai_do_fluxo, self.pai_da_analise = pai_do_fluxo, pai_da_analise
+        for tabela, ids in (('dados_origem', ids_origem), ('fluxo_dados', ids_fluxo), ('analises', ids_analise)):
+            if len(ids):
+                self.marcas[tabela] = int(ids[-1])
+        self._csr = None
+
+    @staticmethod
+    def _anexar(atuais: np.ndarray, novos: np.ndarray, tabela: str) -> np.ndarray:
+        if not len(novos):
+            return atuais
+        if (np.diff(novos) <= 0).any() or (len(atuais) and novos[0] <= atuais[-1]):
+            raise ValueError(f"IDs de {tabela} devem ser crescentes e maiores que os já indexados")
+        return np.concatenate([atuais, novos])
+
+    def _codificar(self, destinos: pd.Series) -> np.ndarray:
+        for destino in pd.unique(destinos):
+            if destino not in self._codigos_destino:
+                self._codigos_destino[destino] = len(self.destinos)
+                self.destinos.append(destino)
+        return destinos.map(self._codigos_destino).to_numpy(dtype=np.int32)
+
+    """Lê as linhas com ID acima das marcas d'água (via COPY) e as acrescenta; retorna quantas linhas por tabela"""
+
+    def atualizar(self) -> Dict[str, int]:
+        if self.connector is None:
+            raise ValueError("IndiceLinhagem sem conector: use acrescentar()")
+        # As marcas são lidas sob o lock: duas escritas concorrentes não leem o mesmo delta
+        with self._lock:
+            novas = {}
+            with self.connector.connection() as conn:
+                with conn.cursor() as cur:
+                    for tabela, consulta in CONSULTAS_LINHAGEM.items():
+                        novas[tabela] = copy_to_dataframe(cur, consulta, (self.marcas[tabela],))
+
+            try:
+                self._acrescentar(novas['dados_origem']['id_origem'].to_numpy(), novas['fluxo_dados'], novas['analises'])
+            except KeyError as e:
+                # Pai com ID abaixo da marca, confirmado depois da última leitura (cargas concorrentes)
+                if not any(self.marcas.values()):
+                    raise
+                logging.warning("Lineage index out of order (%s); rebuilding", e)
+                return self.reconstruir()
+        linhas = {tabela: len(df) for tabela, df in novas.items() if len(df)}
+        if linhas:
+            logging.info("Lineage index refreshed: %s", linhas)
+        return linhas
+
+    """Descarta o índice e lê as três tabelas de novo"""
+
+    def reconstruir(self) -> Dict[str, int]:
+        with self._lock:
+            self._limpar()
+            return self.atualizar()
+
+    """Ouvinte de escrita: atualiza o índice quando uma tabela da cadeia é gravada"""
+
+    def ao_escrever(self, tabelas: Iterable[str]) -> None:
+        tabelas = set(tabelas)
+        if ALL_TABLES in tabelas or tabelas & set(CONSULTAS_LINHAGEM):
+            self.atualizar()
+
+    """Atualiza o índice automaticamente após insert_data/execute_query do conector e cargas do gerador"""
+
+    def registrar(self, generator: Optional[object] = None) -> None:
+        self.connector.add_write_listener(self.ao_escrever)
+        # Um gerador criado com conector=self.connector já repassa suas cargas aos ouvintes do conector
+        if generator is not None and getattr(generator, 'conector', None) is not self.connector:
+            generator.ouvintes_escrita.append(self.ao_escrever)
+
+    def _adjacencias(self) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        csr = self._csr
+        if csr is None:
+            with self._lock:
+                if self._csr is None:
+                    self._csr = {
+                        'fluxos_por_origem': _csr(self.pai_do_fluxo, len(self.ids_origem)),
+                        'analises_por_fluxo': _csr(self.pai_da_analise, len(self.ids_fluxo)),
+                        'fluxos_por_destino': _csr(self.destino_do_fluxo, len(self.destinos))
+                    }
+                csr = self._csr
+        return csr
+
+    """IDs dos fluxos que leem da origem"""
+
+    def fluxos_da_origem(self, id_origem: int) -> np.ndarray:
+        offsets, filhos = self._adjacencias()['fluxos_por_origem']
+        posicao = _posicao(self.ids_origem, id_origem, 'dados_origem')
+        return self.ids_fluxo[filhos[offsets[posicao]:offsets[posicao + 1]]]
+
+    """IDs das análises feitas sobre o fluxo"""
+
+    def analises_do_fluxo(self, id_fluxo: int) -> np.ndarray:
+        offsets, filhos = self._adjacencias()['analises_por_fluxo']
+        posicao = _posicao(self.ids_fluxo, id_fluxo, 'fluxo_dados')
+        return self.ids_analise[filhos[offsets[posicao]:offsets[posicao + 1]]]
+
+    """IDs de todas as análises a jusante da origem (análises de todos os seus fluxos)"""
+
+    def analises_da_origem(self, id_origem: int) -> np.ndarray:
+        adjacencias = self._adjacencias()
+        offsets, filhos = adjacencias['fluxos_por_origem']
+        posicao = _posicao(self.ids_origem, id_origem, 'dados_origem')
+        fluxos = filhos[offsets[posicao]:offsets[posicao + 1]]
+        return self.ids_analise[_expandir(*adjacencias['analises_por_fluxo'], fluxos)]
+
+    """IDs das análises a jusante de várias origens de uma vez (análise de impacto em lote)"""
+
+    def analises_das_origens(self, ids_origem: Sequence[int]) -> np.ndarray:
+        adjacencias = self._adjacencias()
+        origens = _posicoes(self.ids_origem, np.asarray(ids_origem, dtype=np.int32), 'dados_origem')
+        fluxos = _expandir(*adjacencias['fluxos_por_origem'], origens)
+        return self.ids_analise[_expandir(*adjacencias['analises_por_fluxo'], fluxos)]
+
+    """ID da origem que alimenta o fluxo"""
+
+    def origem_do_fluxo(self, id_fluxo: int) -> int:
+        posicao = _posicao(self.ids_fluxo, id_fluxo, 'fluxo_dados')
+        return int(self.ids_origem[self.pai_do_fluxo[posicao]])
+
+    """ID da origem a montante da análise"""
+
+    def origem_da_analise(self, id_analise: int) -> int:
+        posicao = _posicao(self.ids_analise, id_analise, 'analises')
+        return int(self.ids_origem[self.pai_do_fluxo[self.pai_da_analise[posicao]]])
+
+    """IDs distintos das origens que alimentam um destino (vazio para destino desconhecido)"""
+
+    def origens_do_destino(self, destino: str) -> np.ndarray:
+        codigo = self._codigos_destino.get(destino)
+        if codigo is None:
+            return self.ids_origem[:0]
+        offsets, filhos = self._adjacencias()['fluxos_por_destino']
+        # Marca as origens num array de bool: O(origens) em vez da ordenação de np.unique
+        alimentam = np.zeros(len(self.ids_origem), dtype=bool)
+        alimentam[self.pai_do_fluxo[filhos[offsets[codigo]:offsets[codigo + 1]]]] = True
+        return self.ids_origem[alimentam]
+
+    """ Estatísticas de fan-out: fluxos por origem, análises por fluxo e análises por origem.
+
+    Uma linha por relação, com as colunas de Series.describe (count, mean, std,
+    min, percentis, max) mais sem_filhos, a quantidade de pais sem nenhum filho.
+    """
+
+    def fan_out(self) -> pd.DataFrame:
+        adjacencias = self._adjacencias()
+        fluxos_por_origem = np.diff(adjacencias['fluxos_por_origem'][0])
+        analises_por_fluxo = np.diff(adjacencias['analises_por_fluxo'][0])
+        analises_por_origem = np.bincount(
+            self.pai_do_fluxo, weights=analises_por_fluxo, minlength=len(self.ids_origem)
+        ).astype(np.int64)
+
+        estatisticas = {}
+        for nome, contagens in (
+            ('fluxos_por_origem', fluxos_por_origem),
+            ('analises_por_fluxo', analises_por_fluxo),
+            ('analises_por_origem', analises_por_origem)
+        ):
+            resumo = pd.Series(contagens, dtype=np.float64).describe(percentiles=[0.5, 0.9, 0.99])
+            resumo['sem_filhos'] = int((contagens == 0).sum())
+            estatisticas[nome] = resumo
+        return pd.DataFrame(estatisticas).T
+
+    """Bytes ocupados pelos arrays do índice (sem o vocabulário de destinos)"""
+
+    def memoria(self) -> int:
+        arrays = [
+            self.ids_origem, self.ids_fluxo, self.ids_analise,
+            self.pai_do_fluxo, self.pai_da_analise, self.destino_do_fluxo
+        ]
+        for offsets, filhos in self._adjacencias().values():
+            arrays += [offsets, filhos]
+        return sum(array.nbytes for array in arrays)
+
+    def __len__(self) -> int:
+        return len(self.ids_origem) + len(self.ids_fluxo) + len(self.ids_analise)
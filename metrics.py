@@ -0,0 +1,235 @@
+import bisect
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+
+"""Limites superiores (segundos) dos buckets dos histogramas em memória"""
+
+BUCKETS_PADRAO = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, float('inf')
+)
+
+
+class Metricas:
+    """Ponto único de instrumentação: repassa observações e contadores aos sinks.
+
+    Sem sinks, temporizar/observar/contar não fazem nada, então o conector e o
+    gerador podem medir sempre sem custo quando as métricas estão desligadas.
+    Cada sink implementa observar(nome, valor, rotulos) e contar(nome, valor, rotulos).
+    """
+
+    def __init__(self, sinks: Optional[Iterable] = None):
+        self.sinks = list(sinks or [])
+
+    def observar(self, nome: str, valor: float, **rotulos) -> None:
+        for sink in self.sinks:
+            sink.observar(nome, valor, rotulos)
+
+    def contar(self, nome: str, valor: float = 1, **rotulos) -> None:
+        for sink in self.sinks:
+            sink.contar(nome, valor, rotulos)
+
+    """Mede o bloco em segundos; o rótulo status distingue execuções com e sem erro"""
+
+    @contextmanager
+    def temporizar(self, nome: str, **rotulos):
+        if not self.sinks:
+            yield
+            return
+        inicio = time.perf_counter()
+        status = 'erro'
+        try:
+            yield
+            status = 'ok'
+        finally:
+            self.observar(nome, time.perf_counter() - inicio, status=status, **rotulos)
+
+class SinkMemoria:
+    """Histogramas por bucket e contadores mantidos em memória, por (métrica, rótulos)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS_PADRAO):
+        self.buckets = tuple(sorted(buckets))
+        if self.buckets[-1] != float('inf'):
+            self.buckets += (float('inf'),)
+        self._lock = threading.Lock()
+        self._histogramas: Dict[Tuple, Dict] = {}
+        self._contadores: Dict[Tuple, float] = {}
+
+    @staticmethod
+    def _chave(nome: str, rotulos: Dict) -> Tuple:
+        return nome, tuple(sorted(rotulos.items()))
+
+    def observar(self, nome: str, valor: float, rotulos: Dict) -> None:
+        chave = self._chave(nome, rotulos)
+        with self._lock:
+            histograma = self._histogramas.get(chave)
+            if histograma is None:
+                histograma = self._histogramas[chave] = {
+                    'contagens': [0] * len(self.buckets),
+                    'n': 0, 'soma': 0.0, 'min': valor, 'max': valor
+                }
+            histograma['contagens'][bisect.bisect_left(self.buckets, valor)] += 1
+            histograma['n'] += 1
+            histograma['soma'] += valor
+            histograma['min'] = min(histograma['min'], valor)
+            histograma['max'] = max(histograma['max'], valor)
+
+    def contar(self, nome: str, valor: float, rotulos: Dict) -> None:
+        chave = self._chave(nome, rotulos)
+        with self._lock:
+            self._contadores[chave] = self._contadores.get(chave, 0) + valor
+
+    """Quantil estimado por interpolação linear dentro do bucket, limitado ao mínimo/máximo observados"""
+
+    def _quantil(self, histograma: Dict, q: float) -> float:
+        alvo = q * histograma['n']
+        acumulado = 0
+        for indice, contagem in enumerate(histograma['contagens']):
+            if contagem and acumulado + contagem >= alvo:
+                inferior = self.buckets[indice - 1] if indice else 0.0
+                superior = min(self.buckets[indice], histograma['max'])
+                inferior = max(inferior, histograma['min'])
+                return inferior + (superior - inferior) * (alvo - acumulado) / contagem
+            acumulado += contagem
+        return histograma['max']
+
+    def histograma(self, nome: str, **rotulos) -> Optional[Dict]:
+        with self._lock:
+            histograma = self._histogramas.get(self._chave(nome, rotulos))
+            if histograma is None:
+                return None
+            histograma = dict(histograma, contagens=list(histograma['contagens']))
+        return {
+            'n': histograma['n'],
+            'soma': histograma['soma'],
+            'media': histograma['soma'] / histograma['n'],
+            'min': histograma['min'],
+            'max': histograma['max'],
+            'p50': self._quantil(histograma, 0.5),
+            'p90': self._quantil(histograma, 0.9),
+            'p99': self._quantil(histograma, 0.99)
+        }
+
+    def contador(self, nome: str, **rotulos) -> float:
+        with self._lock:
+            return self._contadores.get(self._chave(nome, rotulos), 0)
+
+    """Uma linha por série: histogramas com n/soma/quantis e contadores com o total"""
+
+    def resumo(self) -> pd.DataFrame:
+        with self._lock:
+            chaves_histogramas = list(self._histogramas)
+            contadores = dict(self._contadores)
+        linhas = []
+        for nome, rotulos in chaves_histogramas:
+            linhas.append(dict(
+                metrica=nome, rotulos=dict(rotulos), tipo='histograma',
+                **self.histograma(nome, **dict(rotulos))
+            ))
+        for (nome, rotulos), total in contadores.items():
+            linhas.append({'metrica': nome, 'rotulos': dict(rotulos), 'tipo': 'contador', 'soma': total})
+        return pd.DataFrame(linhas)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._histogramas.clear()
+            self._contadores.clear()
+
+class SinkPrometheus:
+    """Exporta as métricas no formato texto do Prometheus (requer prometheus_client).
+
+    Usa um CollectorRegistry próprio, salvo se registry for informado; as
+    séries ficam disponíveis em exportar() ou via iniciar_servidor(porta).
+    """
+
+    def __init__(self, registry=None, buckets: Tuple[float, ...] = BUCKETS_PADRAO):
+        try:
+            import prometheus_client
+        except ImportError as e:
+            raise ImportError("SinkPrometheus requer prometheus_client: pip install prometheus_client") from e
+
+        self._prometheus = prometheus_client
+        self.registry = registry if registry is not None else prometheus_client.CollectorRegistry()
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._metricas: Dict[str, object] = {}
+
+    def _metrica(self, tipo: str, nome: str, rotulos: Dict):
+        with self._lock:
+            metrica = self._metricas.get(nome)
+            if metrica is None:
+                if tipo == 'histograma':
+                    metrica = self._prometheus.Histogram(
+                        nome, nome, labelnames=sorted(rotulos), buckets=self.buckets, registry=self.registry
+                    )
+                else:
+                    metrica = self._prometheus.Counter(
+                        nome, nome, labelnames=sorted(rotulos), registry=self.registry
+                    )
+                self._metricas[nome] = metrica
+        return metrica.labels(**rotulos) if rotulos else metrica
+
+    def observar(self, nome: str, valor: float, rotulos: Dict) -> None:
+        self._metrica('histograma', nome, rotulos).observe(valor)
+
+    def contar(self, nome: str, valor: float, rotulos: Dict) -> None:
+        self._metrica('contador', nome, rotulos).inc(valor)
+
+    def exportar(self) -> bytes:
+        return self._prometheus.generate_latest(self.registry)
+
+    def iniciar_servidor(self, porta: int = 8000, endereco: str = '0.0.0.0') -> None:
+        self._prometheus.start_http_server(porta, addr=endereco, registry=self.registry)
+
+class SinkJsonLog:
+    """Registra cada medição como uma linha JSON no logger informado"""
+
+    def __init__(self, logger: Optional[logging.Logger] = None, nivel: int = logging.INFO):
+        self.logger = logger or logging.getLogger('metricas')
+        self.nivel = nivel
+
+    def _registrar(self, tipo: str, nome: str, valor: float, rotulos: Dict) -> None:
+        if self.logger.isEnabledFor(self.nivel):
+            self.logger.log(self.nivel, json.dumps({
+                'ts': time.time(), 'tipo': tipo, 'metrica': nome, 'valor': valor, 'rotulos': rotulos
+            }, ensure_ascii=False, default=str))
+
+    def observar(self, nome: str, valor: float, rotulos: Dict) -> None:
+        self._registrar('observacao', nome, valor, rotulos)
+
+    def contar(self, nome: str, valor: float, rotulos: Dict) -> None:
+        self._registrar('contador', nome, valor, rotulos)
+
+""" Decorador de método: mede a etapa em generator_stage_seconds e soma as linhas em generator_rows_total.
+
+linhas recebe (self, resultado) e retorna as linhas produzidas; por padrão,
+len() de um DataFrame retornado. As métricas vêm do atributo self.metricas.
+"""
+
+def etapa_medida(etapa: str, linhas: Optional[Callable] = None):
+    def decorador(metodo):
+        @functools.wraps(metodo)
+        def envoltorio(self, *args, **kwargs):
+            metricas = getattr(self, 'metricas', None)
+            if metricas is None or not metricas.sinks:
+                return metodo(self, *args, **kwargs)
+
+            with metricas.temporizar('generator_stage_seconds', stage=etapa):
+                resultado = metodo(self, *args, **kwargs)
+            if linhas is not None:
+                total = linhas(self, resultado)
+            else:
+                total = len(resultado) if isinstance(resultado, pd.DataFrame) else None
+            if total:
+                metricas.contar('generator_rows_total', total, stage=etapa)
+            return resultado
+        return envoltorio
+    return decorador
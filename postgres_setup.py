@@ -1,12 +1,93 @@
 import psycopg2
 from psycopg2 import Error
+from psycopg2.extras import execute_values
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 import pandas as pd
-from typing import Optional, Dict, List, Union
+from typing import Callable, Optional, Dict, Iterable, Iterator, List, Tuple, Union
+from itertools import islice
+import io
+import uuid
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 import os
+import time
 
+from async_logging import configurar_log_assincrono
+from connection_pool import ConnectionPool
+from copy_decoder import choose_format, copy_sql, copy_to_dataframe, decode_copy, describe_query
+from metrics import Metricas
+from query_cache import QueryCache, is_read_only, referenced_tables
+from statement_cache import StatementCache, insert_sql
+
+
+"""Índices de apoio às consultas analíticas: FKs usadas nos JOINs, BRIN nos timestamps (que crescem com a inserção) e índices parciais/cobrindo para os filtros do notebook"""
+
+PERFORMANCE_INDEXES_SQL = {
+    'idx_fluxo_dados_id_origem': """
+    CREATE INDEX IF NOT EXISTS idx_fluxo_dados_id_origem ON fluxo_dados (id_origem);
+    """,
+
+    'idx_analises_id_fluxo': """
+    CREATE INDEX IF NOT EXISTS idx_analises_id_fluxo ON analises (id_fluxo);
+    """,
+
+    'idx_fluxo_dados_data_atualizacao_brin': """
+    CREATE INDEX IF NOT EXISTS idx_fluxo_dados_data_atualizacao_brin
+    ON fluxo_dados USING BRIN (data_atualizacao);
+    """,
+
+    'idx_analises_data_analise_brin': """
+    CREATE INDEX IF NOT EXISTS idx_analises_data_analise_brin
+    ON analises USING BRIN (data_analise);
+    """,
+
+    'idx_fluxo_dados_ativos': """
+    CREATE INDEX IF NOT EXISTS idx_fluxo_dados_ativos
+    ON fluxo_dados (data_atualizacao) WHERE status = 'ativo';
+    """,
+
+    'idx_analises_responsavel': """
+    CREATE INDEX IF NOT EXISTS idx_analises_responsavel
+    ON analises (responsavel, id_fluxo) INCLUDE (data_analise);
+    """,
+
+    'idx_dados_origem_tipo_latencia': """
+    CREATE INDEX IF NOT EXISTS idx_dados_origem_tipo_latencia
+    ON dados_origem (tipo_dado, latencia) INCLUDE (volume);
+    """
+}
+
+""" Divide [low, high] em até partitions faixas de mesma largura: (início, fim, fim_inclusivo).
+
+Serve para inteiros (PKs) e datas; faixas inteiras nunca ficam vazias por
+arredondamento, então intervalos menores que partitions geram menos faixas.
+"""
+
+def split_range(low, high, partitions: int) -> List[Tuple]:
+    if partitions < 1:
+        raise ValueError("partitions deve ser positivo")
+    if isinstance(low, int):
+        limites = sorted({low + (high - low + 1) * i // partitions for i in range(partitions)})
+        limites.append(high + 1)
+        return [(inicio, fim, False) for inicio, fim in zip(limites, limites[1:])]
+
+    largura = (high - low) / partitions
+    limites = [low + largura * i for i in range(partitions)] + [high]
+    faixas = [(inicio, fim, False) for inicio, fim in zip(limites, limites[1:]) if inicio < fim]
+    if not faixas:
+        return [(low, high, True)]
+    inicio, fim, _ = faixas[-1]
+    faixas[-1] = (inicio, fim, True)
+    return faixas
+
+"""Contexto dos processos de decodificação: forkserver (ou spawn, fora do Unix) em vez de fork de um processo com threads"""
+
+def _decoder_context():
+    metodos = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in metodos else 'spawn')
 
 class PostgresConnector:
 
@@ -16,7 +97,17 @@ class PostgresConnector:
         user: str,
         password: str,
         host: str = 'localhost',
-        port: str = '5432'
+        port: str = '5432',
+        use_pool: bool = False,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_idle_timeout: float = 300.0,
+        pool_health_check: bool = True,
+        query_cache: Optional[QueryCache] = None,
+        statement_cache: Optional[StatementCache] = None,
+        metrics: Optional[Metricas] = None,
+        async_logging: bool = False,
+        async_options: Optional[Dict] = None
     ):
 
         # Validação de None
@@ -37,11 +128,40 @@ class PostgresConnector:
             'port': port
         }
 
-        self.setup_logging()
+        self.setup_logging(async_logging=async_logging, **(async_options or {}))
+
+        # Métricas opcionais (tempo de conexão, espera no pool, latência e linhas por query)
+        self.metrics = metrics if metrics is not None else Metricas()
+
+        # Pool opcional: sem ele cada query abre uma conexão nova
+        self.pool = None
+        if use_pool:
+            self.pool = ConnectionPool(
+                self.create_connection,
+                min_size=pool_min_size,
+                max_size=pool_max_size,
+                idle_timeout=pool_idle_timeout,
+                health_check=pool_health_check
+            )
+
+        # Cache opcional de resultados; escritas notificam os ouvintes com as tabelas afetadas
+        self.cache = query_cache
+        self.write_listeners: List[Callable[[Iterable[str]], None]] = []
+        if query_cache is not None:
+            self.add_write_listener(query_cache.invalidate_tables)
+
+        # Cache opcional de statements: PREPARE/EXECUTE para queries frequentes em conexões do pool
+        self.statements = statement_cache
 
-    """Configura o logging para registro de operações no diretório log_dir (criado)"""
 
-    def setup_logging(self):
+    """ Configura o logging para registro de operações no diretório log_dir (criado).
+
+    async_logging=True troca a escrita síncrona do basicConfig por uma fila não
+    bloqueante com escrita em lote, rotação por tamanho e mensagens truncadas;
+    async_options são repassadas a configurar_log_assincrono.
+    """
+
+    def setup_logging(self, async_logging: bool = False, **async_options):
         log_dir = 'logs'
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
@@ -50,6 +170,10 @@ class PostgresConnector:
             log_dir, 
             f'postgres_operations_{datetime.now().strftime("%Y%m%d")}.log'
         )
+
+        if async_logging:
+            configurar_log_assincrono(log_file, **async_options)
+            return
         
         logging.basicConfig(
             filename=log_file,
@@ -61,43 +185,302 @@ class PostgresConnector:
 
     def create_connection(self):
         try:
-            conn = psycopg2.connect(**self.credentials)
+            with self.metrics.temporizar('postgres_connect_seconds'):
+                conn = psycopg2.connect(**self.credentials)
             return conn
         except Error as e:
-            logging.error(f"Erro ao conectar ao PostgreSQL: {str(e)}")
+            logging.error("Erro ao conectar ao PostgreSQL: %s", e)
             raise
 
-    """ Executa uma query e retorna os dados como DataFrame """
+    """Fornece uma conexão do pool (ou uma nova, sem pool) com commit/rollback automáticos"""
+
+    @contextmanager
+    def connection(self):
+        if self.pool is None:
+            conn = self.create_connection()
+            try:
+                with conn as ctx:
+                    yield ctx
+            finally:
+                conn.close()
+            return
+
+        with self.metrics.temporizar('postgres_pool_acquire_seconds'):
+            conn = self.pool.getconn()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self.pool.putconn(conn)
+
+    """Fecha as conexões do pool, se houver"""
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.closeall()
+            self.pool = None
+
+    """ Executa uma query e retorna os dados como DataFrame.
+
+    copy_format ('auto', 'binary' ou 'csv') lê o resultado com COPY TO STDOUT
+    e o decodifica direto em colunas tipadas (copy_decoder), sem passar por uma
+    tupla Python por linha; nesse modo a query não usa o cache de statements.
+    """
 
     def execute_query(
         self, 
         query: str, 
         params: tuple = None,
-        return_data: bool = True
+        return_data: bool = True,
+        copy_format: Optional[str] = None
         ) -> Optional[pd.DataFrame]:
-        try:
-            with self.create_connection() as conn:
-                if return_data:
-                    if params:
-                        return pd.read_sql_query(query, conn, params=params)
-                    return pd.read_sql_query(query, conn)
-                else:
-                    cur = conn.cursor()
-                    if params:
-                        cur.execute(query, params)
+        cacheable = return_data and self.cache is not None and is_read_only(query)
+        if cacheable:
+            inicio = time.perf_counter()
+            cached = self.cache.get(query, params)
+            if cached is not None:
+                # Acertos entram na mesma latência (operation='cache_hit') para não enviesar os painéis
+                if self.metrics.sinks:
+                    self.metrics.observar(
+                        'postgres_query_seconds', time.perf_counter() - inicio, operation='cache_hit', status='ok'
+                    )
+                    self.metrics.contar('postgres_query_rows_total', len(cached), operation='cache_hit')
+                    self.metrics.contar('postgres_query_cache_hits_total')
+                return cached
+            # Capturada antes da leitura: uma escrita concorrente impede o put do resultado anterior a ela
+            generation = self.cache.generation(query)
+
+        result = None
+        rows = 0
+        operation = 'read' if return_data else 'write'
+        with self.metrics.temporizar('postgres_query_seconds', operation=operation):
+            try:
+                with self.connection() as conn:
+                    # Parâmetros vazios rodam sem interpolação, como None (veja to_server_placeholders)
+                    run_query, run_params = query, params or None
+                    if self.statements is not None and not (return_data and copy_format):
+                        # Conexões sem pool são descartadas após a query: não compensa preparar
+                        run_query, run_params = self.statements.resolve(
+                            conn, query, params, prepare=self.pool is not None
+                        )
+                    if return_data and copy_format:
+                        with conn.cursor() as cur:
+                            result = copy_to_dataframe(cur, query, params, copy_format=copy_format)
+                        rows = len(result)
+                    elif return_data:
+                        if run_params:
+                            result = pd.read_sql_query(run_query, conn, params=run_params)
+                        else:
+                            result = pd.read_sql_query(run_query, conn)
+                        rows = len(result)
                     else:
-                        cur.execute(query)
-                    conn.commit()
-                    logging.info(f"Query executed successfully: {query[:100]}...")
-                    return None
+                        cur = conn.cursor()
+                        if run_params:
+                            cur.execute(run_query, run_params)
+                        else:
+                            cur.execute(run_query)
+                        conn.commit()
+                        rows = cur.rowcount
+                        logging.info("Query executed successfully: %.100s...", query)
+            except Error as e:
+                logging.error("Erro ao executar a Query: %s\nQuery: %s", e, query)
+                raise
+        if self.metrics.sinks:
+            self.metrics.contar('postgres_query_rows_total', max(rows, 0), operation=operation)
+
+        if cacheable:
+            self.cache.put(query, params, result, generation=generation)
+        elif self.write_listeners and not is_read_only(query):
+            self.notify_write(referenced_tables(query))
+        return result
+
+    """Registra uma função chamada com as tabelas alteradas após cada escrita confirmada"""
+
+    def add_write_listener(self, listener: Callable[[Iterable[str]], None]) -> None:
+        self.write_listeners.append(listener)
+
+    """ Avisa os ouvintes de escrita; usado também por quem grava fora de execute_query.
+
+    A escrita já foi confirmada: a falha de um ouvinte é registrada no log, não
+    chega a quem escreveu (que poderia repetir a escrita) nem pula os demais.
+    """
+
+    def notify_write(self, tables: Iterable[str]) -> None:
+        tables = set(tables)
+        for listener in self.write_listeners:
+            try:
+                listener(tables)
+            except Exception:
+                logging.exception("Falha no ouvinte de escrita %r para %s", listener, sorted(tables))
+
+    """ Executa uma query com cursor nomeado (server-side), produzindo lotes de itersize linhas sob demanda.
+
+    Os lotes são DataFrames (ou listas de tuplas com as_dataframe=False), então
+    extrações grandes usam memória constante e as primeiras linhas chegam antes.
+    A conexão fica reservada até o gerador ser consumido ou fechado.
+    """
+
+    def stream_query(
+        self,
+        query: str,
+        params: tuple = None,
+        itersize: int = 2000,
+        as_dataframe: bool = True
+        ) -> Iterator[Union[pd.DataFrame, List[tuple]]]:
+        if itersize < 1:
+            raise ValueError("itersize deve ser positivo")
+        try:
+            with self.connection() as conn:
+                with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+                    cur.itersize = itersize
+                    cur.execute(query, params)
+                    columns = None
+                    while True:
+                        rows = cur.fetchmany(itersize)
+                        if not rows:
+                            break
+                        if not as_dataframe:
+                            yield rows
+                            continue
+                        if columns is None:
+                            columns = [desc[0] for desc in cur.description]
+                        yield pd.DataFrame.from_records(rows, columns=columns)
         except Error as e:
-            logging.error(f"Erro ao executar a Query: {str(e)}\nQuery: {query}")
+            logging.error("Erro ao executar a Query em streaming: %s\nQuery: %s", e, query)
             raise
 
+    """Coluna da chave primária de table (a primeira, em chaves compostas como as das tabelas particionadas)"""
+
+    @staticmethod
+    def _primary_key(cursor, table: str) -> str:
+        cursor.execute("""
+            SELECT a.attname
+            FROM pg_index i
+            JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+            WHERE i.indrelid = %s::regclass AND i.indisprimary
+        """, (table,))
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Tabela {table} não possui chave primária; informe partition_column")
+        return row[0]
+
+    """Lê uma faixa com COPY TO STDOUT em uma conexão do pool, sob o snapshot exportado pela extração"""
+
+    def _copy_out(self, sql: str, snapshot: str) -> bytes:
+        buffer = io.BytesIO()
+        with self.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+                cur.execute("SET TRANSACTION SNAPSHOT %s", (snapshot,))
+                cur.copy_expert(sql, buffer)
+        return buffer.getvalue()
+
+    """ Extrai uma tabela em paralelo e retorna um único DataFrame.
+
+    A tabela é dividida em partitions faixas de mesma largura da chave primária
+    (padrão) ou de partition_column (ex.: data_criacao). Cada faixa é lida com
+    COPY TO STDOUT em uma conexão do pool (até workers simultâneas) e
+    decodificada na thread principal; decode_processes=True decodifica em
+    processos worker (forkserver/spawn), o que só compensa com núcleos livres
+    e faixas grandes. copy_format='auto' usa COPY binário quando todas as
+    colunas têm largura fixa e CSV caso contrário (veja copy_decoder). Todas as
+    faixas usam o snapshot exportado por uma transação coordenadora, então o resultado equivale a uma única leitura consistente.
+    Linhas com partition_column nula ganham uma faixa própria. O DataFrame
+    segue a ordem das faixas; dentro de cada faixa a ordem não é garantida.
+    """
+
+    def parallel_extract(
+        self,
+        table: str,
+        columns: Optional[List[str]] = None,
+        partition_column: Optional[str] = None,
+        partitions: Optional[int] = None,
+        workers: Optional[int] = None,
+        where: Optional[str] = None,
+        params: tuple = None,
+        decode_processes: bool = False,
+        copy_format: str = 'auto'
+        ) -> pd.DataFrame:
+        workers = workers or os.cpu_count() or 1
+        if self.pool is not None:
+            # A coordenadora não vem do pool: workers além de max_size só esperariam conexão
+            workers = min(workers, self.pool.max_size)
+        partitions = partitions or workers
+        if workers < 1 or partitions < 1:
+            raise ValueError("workers e partitions devem ser positivos")
+
+        select_list = ', '.join(columns) if columns else '*'
+        extra_filter = f" AND ({where})" if where else ""
+        params = tuple(params or ())
+
+        with self.metrics.temporizar('postgres_extract_seconds', table=table):
+            coordinator = self.create_connection()
+            try:
+                coordinator.set_session(isolation_level='REPEATABLE READ', readonly=True)
+                with coordinator.cursor() as cur:
+                    cur.execute("SELECT pg_export_snapshot()")
+                    snapshot = cur.fetchone()[0]
+                    primary_key = self._primary_key(cur, table)
+                    partition_column = partition_column or primary_key
+                    description = describe_query(cur, f"SELECT {select_list} FROM {table}")
+                    cur.execute(
+                        f"SELECT MIN({partition_column}), MAX({partition_column}) FROM {table} WHERE TRUE{extra_filter}",
+                        params
+                    )
+                    low, high = cur.fetchone()
+
+                    names = [name for name, _ in description]
+                    type_oids = [oid for _, oid in description]
+                    if copy_format == 'auto':
+                        copy_format = choose_format(type_oids)
+                    # Concatenação, não str.format: o filtro do usuário pode ter chaves ('{a,b}', JSON)
+                    def range_sql(condition: str) -> str:
+                        return copy_sql(f"SELECT {select_list} FROM {table} WHERE " + condition + extra_filter, copy_format)
+
+                    queries = []
+                    if low is not None:
+                        for start, end, inclusive in split_range(low, high, partitions):
+                            condition = f"{partition_column} >= %s AND {partition_column} {'<=' if inclusive else '<'} %s"
+                            queries.append(cur.mogrify(range_sql(condition), (start, end) + params).decode())
+                    if partition_column != primary_key:
+                        queries.append(cur.mogrify(range_sql(f"{partition_column} IS NULL"), params).decode())
+
+                # Os processos de decodificação partem de um forkserver/spawn, nunca de um fork deste processo:
+                # um fork com as threads de COPY (ou de log assíncrono) ativas herdaria locks travados
+                decoders = ProcessPoolExecutor(
+                    max_workers=min(workers, len(queries)), mp_context=_decoder_context()
+                ) if decode_processes and len(queries) > 1 else None
+                try:
+                    with ThreadPoolExecutor(max_workers=min(workers, max(len(queries), 1))) as fetchers:
+                        fetches = [fetchers.submit(self._copy_out, sql, snapshot) for sql in queries]
+                        if decoders is not None:
+                            # Cada faixa é decodificada assim que chega, enquanto as seguintes ainda são lidas
+                            decodes = [
+                                decoders.submit(decode_copy, f.result(), names, type_oids, copy_format) for f in fetches
+                            ]
+                            frames = [d.result() for d in decodes]
+                        else:
+                            frames = [decode_copy(f.result(), names, type_oids, copy_format) for f in fetches]
+                finally:
+                    if decoders is not None:
+                        decoders.shutdown()
+            except Error as e:
+                logging.error("Erro na extração paralela de %s: %s", table, e)
+                raise
+            finally:
+                coordinator.rollback()
+                coordinator.close()
+
+        frames = [frame for frame in frames if len(frame)]
+        result = pd.concat(frames, ignore_index=True) if frames else decode_copy(b'', names, type_oids, copy_format)
+        if self.metrics.sinks:
+            self.metrics.contar('postgres_query_rows_total', len(result), operation='extract')
+        logging.info("Extração paralela de %s: %d linhas em %d faixas", table, len(result), len(queries))
+        return result
 
-    """Cria as tabelas necessárias do banco de dados para o projeto """
+    """Cria as tabelas necessárias do banco de dados para o projeto; performance_schema=True cria também os índices de desempenho"""
 
-    def create_database_tables(self):
+    def create_database_tables(self, performance_schema: bool = False):
         create_tables_sql = {
             'dados_origem': """
             CREATE TABLE IF NOT EXISTS dados_origem (
@@ -136,20 +519,133 @@ class PostgresConnector:
         }
 
         for table_name, sql in create_tables_sql.items():
-            logging.info(f"Creating table: {table_name}")
+            logging.info("Creating table: %s", table_name)
             self.execute_query(sql, return_data=False)
 
+        if performance_schema:
+            self.create_performance_indexes()
+
+    """Cria os índices de PERFORMANCE_INDEXES_SQL e atualiza as estatísticas do planejador"""
+
+    def create_performance_indexes(self):
+        for index_name, sql in PERFORMANCE_INDEXES_SQL.items():
+            logging.info("Creating index: %s", index_name)
+            self.execute_query(sql, return_data=False)
+        self.execute_query("ANALYZE dados_origem, fluxo_dados, analises;", return_data=False)
+
     """ Insere dados em uma tabela """            
     
     def insert_data(self, table: str, data: Dict):
-        columns = ', '.join(data.keys())
-        values = ', '.join(['%s'] * len(data))
-        query = f"""
-        INSERT INTO {table} ({columns})
-        VALUES ({values})
-        RETURNING *;
-        """
-        return self.execute_query(query, tuple(data.values()))       
+        # SQL memoizado por (tabela, colunas): não é remontado a cada chamada
+        query = insert_sql(table, tuple(data.keys()))
+        with self.metrics.temporizar('postgres_insert_seconds', table=table):
+            result = self.execute_query(query, tuple(data.values()))
+        self.metrics.contar('postgres_insert_rows_total', 1, table=table)
+        return result
+
+    """ Insere várias linhas em uma única transação, em páginas de page_size linhas.
+
+    rows pode ser uma lista de dicts, um DataFrame ou um iterador de dicts
+    (consumido página a página). method='values' usa INSERT multi-linha no
+    estilo execute_values e permite returning=True; method='copy' usa COPY
+    FROM STDIN. Retorna as linhas do RETURNING como um único DataFrame ou,
+    sem returning, a quantidade de linhas inseridas.
+    """
+
+    def insert_many(
+        self,
+        table: str,
+        rows: Union[List[Dict], pd.DataFrame, Iterable[Dict]],
+        page_size: int = 1000,
+        returning: bool = False,
+        method: str = 'values'
+        ) -> Union[int, pd.DataFrame]:
+        if page_size < 1:
+            raise ValueError("page_size deve ser positivo")
+        if method not in ('values', 'copy'):
+            raise ValueError(f"Método de inserção inválido: {method}")
+        if returning and method == 'copy':
+            raise ValueError("COPY não suporta RETURNING; use method='values'")
+
+        columns, pages = self._insert_pages(rows, page_size)
+        if columns is None:
+            return pd.DataFrame() if returning else 0
+
+        column_list = ', '.join(columns)
+        if method == 'copy':
+            query = f"COPY {table} ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+        else:
+            query = f"INSERT INTO {table} ({column_list}) VALUES %s"
+            if returning:
+                query += " RETURNING *"
+
+        total = 0
+        returned = []
+        description = None
+        with self.metrics.temporizar('postgres_insert_seconds', table=table):
+            try:
+                with self.connection() as conn:
+                    with conn.cursor() as cur:
+                        for page in pages:
+                            if method == 'copy':
+                                buffer = io.StringIO()
+                                pd.DataFrame(page, columns=columns, dtype=object).to_csv(
+                                    buffer, index=False, header=False, na_rep='\\N'
+                                )
+                                buffer.seek(0)
+                                cur.copy_expert(query, buffer)
+                            else:
+                                result = execute_values(
+                                    cur, query, page, page_size=page_size, fetch=returning
+                                )
+                                if returning:
+                                    returned.extend(result)
+                                    description = cur.description
+                            total += len(page)
+                logging.info("%d rows inserted into %s (%s)", total, table, method)
+            except Error as e:
+                logging.error("Erro ao inserir lote em %s: %s", table, e)
+                raise
+        self.metrics.contar('postgres_insert_rows_total', total, table=table)
+
+        self.notify_write({table})
+        if returning:
+            return pd.DataFrame.from_records(
+                returned, columns=[desc[0] for desc in description] if description else None
+            )
+        return total
+
+    """Normaliza rows em (colunas, gerador de páginas de tuplas)"""
+
+    def _insert_pages(self, rows, page_size: int):
+        if isinstance(rows, pd.DataFrame):
+            if rows.empty:
+                return None, iter(())
+            # Inteiros com NaN voltam a ser inteiros; NaN/NaT viram None para que o banco receba NULL
+            values = rows.convert_dtypes(convert_string=False, convert_boolean=False)
+            values = values.astype(object).where(values.notna(), None)
+            pages = (
+                list(values.iloc[start:start + page_size].itertuples(index=False, name=None))
+                for start in range(0, len(values), page_size)
+            )
+            return list(rows.columns), pages
+
+        iterator = iter(rows)
+        first = next(iterator, None)
+        if first is None:
+            return None, iter(())
+        columns = list(first.keys())
+
+        def pages():
+            page = [tuple(first[c] for c in columns)]
+            while True:
+                page.extend(tuple(row[c] for c in columns) for row in islice(iterator, page_size - len(page)))
+                if not page:
+                    return
+                yield page
+                page = []
+
+        return columns, pages()
 
     """ Retorna informações sobre a estrutura de uma tabela  aproveitando o método execute_query"""
 
@@ -0,0 +1,227 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import pandas as pd
+
+
+_STRINGS_E_COMENTARIOS = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.DOTALL)
+# Identificadores (com schema e aspas), números e símbolos isolados, depois de removidos literais e comentários
+_IDENTIFICADOR = r'(?:"(?:[^"]|"")*"|[A-Za-z_][\w$]*)'
+_TOKENS = re.compile(rf'{_IDENTIFICADOR}(?:\s*\.\s*{_IDENTIFICADOR})*|\d+(?:\.\d+)?|\S')
+_E_IDENTIFICADOR = re.compile(_IDENTIFICADOR)
+# Palavras que podem vir entre a palavra-chave e o nome da tabela
+_MODIFICADORES = {'ONLY', 'LATERAL', 'IF', 'NOT', 'EXISTS', 'TABLE'}
+# Encerram a lista de tabelas do FROM/USING/TRUNCATE no mesmo nível de parênteses
+_FIM_LISTA = {
+    'WHERE', 'GROUP', 'HAVING', 'ORDER', 'LIMIT', 'OFFSET', 'WINDOW', 'UNION', 'INTERSECT', 'EXCEPT',
+    'RETURNING', 'FETCH', 'FOR', 'SET', 'SELECT', 'VALUES', 'RESTART', 'CONTINUE', 'CASCADE', 'RESTRICT'
+}
+
+"""Tabela "desconhecida": referenced_tables a inclui quando não consegue listar todas as tabelas da query.
+Entradas do cache que a leem são invalidadas por qualquer escrita, e uma escrita que a inclui invalida tudo."""
+
+ALL_TABLES = '*'
+
+_ESCRITA = re.compile(
+    r"\b(?:INSERT|UPDATE|DELETE|MERGE|CREATE|ALTER|DROP|TRUNCATE|COPY|GRANT|REVOKE|"
+    r"VACUUM|ANALYZE|REFRESH|CALL|LOCK|COMMENT|REINDEX|CLUSTER|SETVAL|NEXTVAL)\b",
+    re.IGNORECASE
+)
+
+
+"""Remove literais, comentários e espaços redundantes para que queries equivalentes gerem a mesma chave"""
+
+def normalize_query(query: str) -> str:
+    partes = []
+    posicao = 0
+    for literal in _STRINGS_E_COMENTARIOS.finditer(query):
+        partes.append(' '.join(query[posicao:literal.start()].split()))
+        # Literais de string fazem parte da semântica; comentários não
+        if literal.group().startswith("'"):
+            partes.append(literal.group())
+        posicao = literal.end()
+    partes.append(' '.join(query[posicao:].split()))
+    return ' '.join(p for p in partes if p).rstrip(';').strip()
+
+""" Tabelas referenciadas pela query (sem schema, em minúsculas).
+
+Percorre os tokens acompanhando os parênteses: listas do FROM/USING (com
+vírgulas e JOINs), alvos de INTO/UPDATE/TABLE/COPY e TRUNCATE a, b. Subqueries
+são percorridas também; parênteses de expressão (EXTRACT(x FROM y),
+SUBSTRING(x FROM n)) não. Funções no FROM ou fontes que não são um nome
+acrescentam ALL_TABLES, pois as tabelas lidas não podem ser conhecidas.
+"""
+
+def referenced_tables(query: str) -> Set[str]:
+    tokens = _TOKENS.findall(_STRINGS_E_COMENTARIOS.sub(' ', query))
+    tabelas = set()
+    # Cada nível de parênteses: é uma (sub)consulta?, está numa lista de tabelas?, espera um nome ('fonte'/'alvo')?
+    niveis = [{'consulta': True, 'lista': False, 'espera': None}]
+    anterior = ''
+    for i, token in enumerate(tokens):
+        nivel = niveis[-1]
+        palavra = token.upper()
+        seguinte = tokens[i + 1].upper() if i + 1 < len(tokens) else ''
+
+        if token == '(':
+            consulta = nivel['espera'] == 'fonte' or seguinte in ('SELECT', 'WITH', 'VALUES')
+            if nivel['espera'] == 'alvo':
+                tabelas.add(ALL_TABLES)
+            nivel['espera'] = None
+            niveis.append({'consulta': consulta, 'lista': False, 'espera': None})
+        elif token == ')':
+            if len(niveis) > 1:
+                niveis.pop()
+        elif not nivel['consulta']:
+            pass
+        elif nivel['espera']:
+            if palavra in _MODIFICADORES:
+                pass
+            elif palavra in ('STDIN', 'STDOUT'):
+                nivel['espera'] = None
+            elif _E_IDENTIFICADOR.match(token):
+                # Função no FROM (generate_series(...), funções do usuário): não se sabe o que ela lê
+                if nivel['espera'] == 'fonte' and seguinte == '(':
+                    tabelas.add(ALL_TABLES)
+                else:
+                    tabelas.add(re.split(r'\s*\.\s*', token)[-1].strip('"').lower())
+                nivel['espera'] = None
+            else:
+                tabelas.add(ALL_TABLES)
+                nivel['espera'] = None
+        elif palavra == 'FROM' and anterior != 'DISTINCT':
+            nivel['lista'], nivel['espera'] = True, 'fonte'
+        elif palavra == 'JOIN' or (palavra == 'USING' and nivel['lista'] and seguinte != '('):
+            nivel['espera'] = 'fonte'
+        elif palavra == ',' and nivel['lista']:
+            nivel['espera'] = 'fonte'
+        elif palavra == 'TRUNCATE' or (palavra == 'TABLE' and anterior == 'DROP'):
+            nivel['lista'], nivel['espera'] = True, 'alvo'
+        elif palavra in ('INTO', 'TABLE') or (palavra == 'UPDATE' and anterior not in ('FOR', 'DO')) or \
+                (palavra == 'COPY' and seguinte != '('):
+            nivel['lista'], nivel['espera'] = False, 'alvo'
+        elif palavra in _FIM_LISTA:
+            nivel['lista'] = False
+        anterior = palavra
+    return tabelas
+
+"""Indica se a query apenas lê dados e, portanto, pode ter o resultado reutilizado"""
+
+def is_read_only(query: str) -> bool:
+    return _ESCRITA.search(_STRINGS_E_COMENTARIOS.sub(' ', query)) is None
+
+class QueryCache:
+    """Cache LRU de resultados de queries com TTL e invalidação por tabela.
+
+    A chave é o texto normalizado da query mais os parâmetros; cada entrada
+    guarda as tabelas que lê, para que escritas invalidem só o que foi afetado.
+    Cada tabela tem um contador de geração incrementado a cada invalidação: uma
+    leitura captura generation() antes de executar e o put() é descartado se uma
+    escrita concorrente invalidou alguma das tabelas nesse meio tempo.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: Optional[float] = 300.0):
+        if max_entries < 1:
+            raise ValueError("max_entries deve ser positivo")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[pd.DataFrame, float, Set[str]]]' = OrderedDict()
+        self._stats = {
+            'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0, 'invalidations': 0, 'stale_puts': 0
+        }
+        # Gerações por tabela; _epoch conta todas as invalidações e _full_epoch as de ALL_TABLES
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self._full_epoch = 0
+
+    @staticmethod
+    def _key(query: str, params) -> Tuple[str, str]:
+        return normalize_query(query), repr(params)
+
+    """Retorna uma cópia do resultado em cache ou None"""
+
+    def get(self, query: str, params=None) -> Optional[pd.DataFrame]:
+        key = self._key(query, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+
+            result, stored_at, _ = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+        # Cópia: o chamador pode alterar o DataFrame sem corromper o cache
+        return result.copy()
+
+    def _generation(self, read: Set[str]) -> Tuple:
+        if ALL_TABLES in read:
+            # Tabelas incertas: qualquer invalidação torna o resultado suspeito
+            return (self._epoch,)
+        return (self._full_epoch,) + tuple(self._generations.get(table, 0) for table in sorted(read))
+
+    """Geração atual das tabelas lidas pela query; capture antes de executá-la e passe ao put()"""
+
+    def generation(self, query: str) -> Tuple:
+        read = referenced_tables(query)
+        with self._lock:
+            return self._generation(read)
+
+    """Guarda o resultado; com generation, só se nenhuma tabela lida foi invalidada desde a captura"""
+
+    def put(self, query: str, params, result: pd.DataFrame, generation: Optional[Tuple] = None) -> None:
+        key = self._key(query, params)
+        read = referenced_tables(query)
+        entry = (result.copy(), time.monotonic(), read)
+        with self._lock:
+            if generation is not None and self._generation(read) != generation:
+                # Uma escrita confirmou durante a leitura: o resultado pode ser anterior a ela
+                self._stats['stale_puts'] += 1
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    """Remove as entradas que leem qualquer uma das tabelas informadas (todas, se incluir ALL_TABLES)"""
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        tables = {table.split('.')[-1].strip('"').lower() for table in tables}
+        with self._lock:
+            self._epoch += 1
+            if ALL_TABLES in tables:
+                self._full_epoch += 1
+            for table in tables - {ALL_TABLES}:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            stale = [
+                key for key, (_, _, read) in self._entries.items()
+                if ALL_TABLES in tables or ALL_TABLES in read or read & tables
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._stats['invalidations'] += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self._stats, size=len(self._entries))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
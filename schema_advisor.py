@@ -0,0 +1,217 @@
+import logging
+import statistics
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from analytical_views import CONSULTAS_NOTEBOOK
+from postgres_setup import PostgresConnector, PERFORMANCE_INDEXES_SQL
+
+
+"""DDL particionada por faixa de tempo. A PK passa a incluir a coluna de partição, então
+analises não pode manter a FK para fluxo_dados(id_fluxo): a integridade fica a cargo da carga"""
+
+CREATE_PARTICIONADAS_SQL = {
+    'fluxo_dados': """
+    CREATE TABLE IF NOT EXISTS fluxo_dados (
+        id_fluxo SERIAL,
+        id_origem INTEGER NOT NULL,
+        destino VARCHAR(255) NOT NULL,
+        status VARCHAR(50) DEFAULT 'ativo',
+        data_criacao TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        data_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id_fluxo, data_criacao)
+    ) PARTITION BY RANGE (data_criacao);
+    """,
+
+    'analises': """
+    CREATE TABLE IF NOT EXISTS analises (
+        id_analise SERIAL,
+        id_fluxo INTEGER NOT NULL,
+        hipoteses TEXT,
+        resultado TEXT,
+        data_analise TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        responsavel VARCHAR(255),
+        PRIMARY KEY (id_analise, data_analise)
+    ) PARTITION BY RANGE (data_analise);
+    """
+}
+
+COLUNAS_PARTICAO = {'fluxo_dados': 'data_criacao', 'analises': 'data_analise'}
+
+
+def _somar_meses(dia: date, meses: int) -> date:
+    total = dia.year * 12 + dia.month - 1 + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+"""Tipo da tabela no catálogo: 'r' (comum), 'p' (particionada) ou None se não existir"""
+
+def tipo_tabela(connector: PostgresConnector, tabela: str) -> Optional[str]:
+    with connector.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (tabela,))
+            linha = cur.fetchone()
+    return linha[0] if linha else None
+
+""" Cria partições de meses_por_particao meses cobrindo [inicio, fim) e a partição DEFAULT.
+
+Linhas fora das faixas caem na DEFAULT; uma faixa nova que sobreponha linhas
+já gravadas na DEFAULT é recusada pelo PostgreSQL.
+"""
+
+def adicionar_particoes(
+    connector: PostgresConnector,
+    tabela: str,
+    inicio: date,
+    fim: date,
+    meses_por_particao: int = 1
+    ) -> List[str]:
+    if tabela not in COLUNAS_PARTICAO:
+        raise ValueError(f"Tabela sem particionamento definido: {tabela}")
+    if meses_por_particao < 1:
+        raise ValueError("meses_por_particao deve ser positivo")
+
+    particoes = []
+    de = date(inicio.year, inicio.month, 1)
+    while de < fim:
+        ate = _somar_meses(de, meses_por_particao)
+        nome = f"{tabela}_p{de:%Y_%m}"
+        logging.info("Creating partition: %s", nome)
+        connector.execute_query(
+            f"CREATE TABLE IF NOT EXISTS {nome} PARTITION OF {tabela} "
+            f"FOR VALUES FROM ('{de.isoformat()}') TO ('{ate.isoformat()}');",
+            return_data=False
+        )
+        particoes.append(nome)
+        de = ate
+
+    connector.execute_query(
+        f"CREATE TABLE IF NOT EXISTS {tabela}_default PARTITION OF {tabela} DEFAULT;",
+        return_data=False
+    )
+    return particoes
+
+""" Cria o schema com fluxo_dados e analises particionadas por mês em [inicio, fim).
+
+Deve ser usado em um banco vazio: tabelas comuns já existentes não são
+convertidas. dados_origem continua sendo criada por create_database_tables.
+"""
+
+def criar_tabelas_particionadas(
+    connector: PostgresConnector,
+    inicio: date,
+    fim: date,
+    meses_por_particao: int = 1,
+    performance_schema: bool = True
+    ) -> Dict[str, List[str]]:
+    for tabela in CREATE_PARTICIONADAS_SQL:
+        if tipo_tabela(connector, tabela) == 'r':
+            raise ValueError(f"{tabela} já existe sem particionamento; recrie o banco para particionar")
+
+    for tabela, sql in CREATE_PARTICIONADAS_SQL.items():
+        logging.info("Creating partitioned table: %s", tabela)
+        connector.execute_query(sql, return_data=False)
+
+    # As tabelas particionadas já existem: aqui só dados_origem é criada
+    connector.create_database_tables()
+    connector.execute_query("""
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'fluxo_dados_id_origem_fkey') THEN
+            ALTER TABLE fluxo_dados ADD CONSTRAINT fluxo_dados_id_origem_fkey
+                FOREIGN KEY (id_origem) REFERENCES dados_origem(id_origem);
+        END IF;
+    END $$;
+    """, return_data=False)
+
+    particoes = {
+        tabela: adicionar_particoes(connector, tabela, inicio, fim, meses_por_particao)
+        for tabela in CREATE_PARTICIONADAS_SQL
+    }
+    if performance_schema:
+        connector.create_performance_indexes()
+    return particoes
+
+"""Remove os índices de desempenho (para medir o cenário sem eles)"""
+
+def remover_indices(connector: PostgresConnector) -> None:
+    for index_name in PERFORMANCE_INDEXES_SQL:
+        connector.execute_query(f"DROP INDEX IF EXISTS {index_name};", return_data=False)
+    connector.execute_query("ANALYZE dados_origem, fluxo_dados, analises;", return_data=False)
+
+def _nos_do_plano(plano: Dict) -> List[str]:
+    no = plano['Node Type']
+    if 'Index Name' in plano:
+        no += f" ({plano['Index Name']})"
+    nos = [no]
+    for filho in plano.get('Plans', []):
+        nos.extend(_nos_do_plano(filho))
+    return nos
+
+""" Executa EXPLAIN (ANALYZE, BUFFERS) da consulta e resume tempos e nós do plano.
+
+Roda por um cursor próprio, fora de execute_query: o resultado não entra no
+cache e não dispara ouvintes de escrita (ANALYZE aqui só executa a consulta).
+"""
+
+def explicar(connector: PostgresConnector, consulta: str, params: tuple = None) -> Dict:
+    with connector.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {consulta}", params)
+            resultado = cur.fetchone()[0][0]
+        conn.rollback()
+    plano = resultado['Plan']
+    return {
+        'tempo_execucao_ms': resultado['Execution Time'],
+        'tempo_planejamento_ms': resultado['Planning Time'],
+        'blocos_lidos': plano.get('Shared Read Blocks', 0) + plano.get('Shared Hit Blocks', 0),
+        'nos': _nos_do_plano(plano),
+        'plano': resultado
+    }
+
+def _medir(connector: PostgresConnector, consultas: Dict[str, str], repeticoes: int) -> Dict[str, Dict]:
+    medicoes = {}
+    for nome, consulta in consultas.items():
+        execucoes = [explicar(connector, consulta) for _ in range(repeticoes)]
+        medicoes[nome] = {
+            'tempo_ms': statistics.median(e['tempo_execucao_ms'] for e in execucoes),
+            'blocos': execucoes[-1]['blocos_lidos'],
+            'nos': execucoes[-1]['nos']
+        }
+    return medicoes
+
+""" Mede as consultas (mediana de repeticoes EXPLAIN ANALYZE), aplica a mudança de schema e mede de novo.
+
+aplicar padrão: connector.create_performance_indexes. Retorna um DataFrame
+por consulta com tempos antes/depois, speedup, blocos lidos e nós do plano.
+"""
+
+def comparar_planos(
+    connector: PostgresConnector,
+    consultas: Optional[Dict[str, str]] = None,
+    aplicar: Optional[Callable[[], None]] = None,
+    repeticoes: int = 3
+    ) -> pd.DataFrame:
+    if repeticoes < 1:
+        raise ValueError("repeticoes deve ser positivo")
+    consultas = consultas or CONSULTAS_NOTEBOOK
+    aplicar = aplicar or connector.create_performance_indexes
+
+    antes = _medir(connector, consultas, repeticoes)
+    aplicar()
+    depois = _medir(connector, consultas, repeticoes)
+
+    return pd.DataFrame([
+        {
+            'consulta': nome,
+            'antes_ms': antes[nome]['tempo_ms'],
+            'depois_ms': depois[nome]['tempo_ms'],
+            'speedup': antes[nome]['tempo_ms'] / depois[nome]['tempo_ms'] if depois[nome]['tempo_ms'] else float('inf'),
+            'blocos_antes': antes[nome]['blocos'],
+            'blocos_depois': depois[nome]['blocos'],
+            'nos_antes': ' > '.join(antes[nome]['nos']),
+            'nos_depois': ' > '.join(depois[nome]['nos'])
+        }
+        for nome in consultas
+    ])
@@ -0,0 +1,132 @@
+import os
+from typing import Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+
+
+"""Arquivo Parquet de cada tabela dentro do diretório do snapshot"""
+
+def arquivo_tabela(diretorio: str, tabela: str) -> str:
+    return os.path.join(diretorio, f'{tabela}.parquet')
+
+"""Cópia Arrow IPC sem compressão de cada tabela, aberta com memory-map na leitura"""
+
+def arquivo_mapeavel(diretorio: str, tabela: str) -> str:
+    return os.path.join(diretorio, f'{tabela}.arrow')
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Snapshots Parquet requerem pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+""" Converte para category as colunas de texto com poucos valores distintos (tipo_dado, status, destino...).
+
+No Parquet elas viram colunas com dicionário; o tipo category volta na leitura
+pelos metadados pandas gravados no arquivo.
+"""
+
+def categorizar(df: pd.DataFrame, limite_categorias: float = 0.5) -> pd.DataFrame:
+    colunas = {}
+    for coluna in df.columns:
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_string_dtype(serie.dtype) or serie.dtype == object:
+            if len(serie) and serie.nunique() <= limite_categorias * len(serie):
+                colunas[coluna] = serie.astype('category')
+    return df.assign(**colunas) if colunas else df
+
+""" Grava cada DataFrame em <diretorio>/<tabela>.parquet com compressão e colunas categóricas por dicionário.
+
+Com copia_mapeavel=True grava também <tabela>.arrow (Arrow IPC sem
+compressão), que carregar_snapshot mapeia em memória em vez de descomprimir.
+Cada arquivo é escrito em um temporário e renomeado, então um snapshot
+interrompido não deixa uma tabela truncada. Retorna o caminho de cada tabela.
+"""
+
+def salvar_snapshot(
+    dataframes: Dict[str, pd.DataFrame],
+    diretorio: str,
+    compressao: str = 'zstd',
+    limite_categorias: float = 0.5,
+    tamanho_grupo: int = 100000,
+    copia_mapeavel: bool = True
+    ) -> Dict[str, str]:
+    pa = _pyarrow()
+    os.makedirs(diretorio, exist_ok=True)
+
+    arquivos = {}
+    for tabela, df in dataframes.items():
+        arquivo = arquivo_tabela(diretorio, tabela)
+        temporario = f"{arquivo}.tmp"
+        dados = pa.Table.from_pandas(categorizar(df, limite_categorias), preserve_index=False)
+        pa.parquet.write_table(dados, temporario, compression=compressao, row_group_size=tamanho_grupo)
+        os.replace(temporario, arquivo)
+        if copia_mapeavel:
+            mapeavel = arquivo_mapeavel(diretorio, tabela)
+            with pa.OSFile(f"{mapeavel}.tmp", 'wb') as saida, pa.ipc.new_file(saida, dados.schema) as escritor:
+                escritor.write_table(dados, max_chunksize=tamanho_grupo)
+            os.replace(f"{mapeavel}.tmp", mapeavel)
+        arquivos[tabela] = arquivo
+    return arquivos
+
+""" Abre as cópias Arrow IPC do snapshot com memory-map e devolve tabelas Arrow.
+
+Os buffers das colunas apontam para o arquivo mapeado: nada é lido nem copiado
+até que a coluna seja usada, e o SO pagina o arquivo sob demanda.
+"""
+
+def mapear_snapshot(
+    diretorio: str,
+    tabelas: Iterable[str],
+    colunas: Optional[Dict[str, list]] = None
+    ) -> Dict:
+    pa = _pyarrow()
+    mapeadas = {}
+    for tabela in tabelas:
+        arquivo = arquivo_mapeavel(diretorio, tabela)
+        if not os.path.exists(arquivo):
+            raise FileNotFoundError(f"Snapshot sem a cópia mapeável de {tabela}: {arquivo}")
+        dados = pa.ipc.open_file(pa.memory_map(arquivo, 'r')).read_all()
+        selecao = (colunas or {}).get(tabela)
+        mapeadas[tabela] = dados.select(selecao) if selecao is not None else dados
+    return mapeadas
+
+""" Lê as tabelas do snapshot como DataFrames.
+
+Com a cópia Arrow IPC (ver salvar_snapshot) a tabela é mapeada em memória e
+convertida coluna a coluna: números e datas sem nulos viram views somente
+leitura do arquivo mapeado, sem cópia; texto e categorias são materializados.
+Sem ela, o Parquet é lido e descomprimido por inteiro.
+"""
+
+def carregar_snapshot(
+    diretorio: str,
+    tabelas: Iterable[str],
+    colunas: Optional[Dict[str, list]] = None
+    ) -> Dict[str, pd.DataFrame]:
+    pa = _pyarrow()
+    dataframes = {}
+    for tabela in tabelas:
+        arquivo = arquivo_tabela(diretorio, tabela)
+        if os.path.exists(arquivo_mapeavel(diretorio, tabela)):
+            dados = mapear_snapshot(diretorio, [tabela], colunas)[tabela]
+        elif os.path.exists(arquivo):
+            dados = pa.parquet.read_table(arquivo, columns=(colunas or {}).get(tabela))
+        else:
+            raise FileNotFoundError(f"Snapshot sem a tabela {tabela}: {arquivo}")
+        # split_blocks evita consolidar as colunas em um bloco novo (que copiaria tudo)
+        dataframes[tabela] = dados.to_pandas(split_blocks=True)
+    return dataframes
+
+""" Percorre uma tabela do snapshot em lotes de até tamanho_lote linhas, sem materializar a tabela inteira """
+
+def iterar_lotes(diretorio: str, tabela: str, tamanho_lote: int = 50000) -> Iterator[pd.DataFrame]:
+    pa = _pyarrow()
+    arquivo = pa.parquet.ParquetFile(arquivo_tabela(diretorio, tabela), memory_map=True)
+    for lote in arquivo.iter_batches(batch_size=tamanho_lote):
+        yield lote.to_pandas()
@@ -0,0 +1,212 @@
+import hashlib
+import logging
+import re
+import threading
+import weakref
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+from psycopg2 import Error
+
+from query_cache import normalize_query
+
+
+_LITERAIS_E_PLACEHOLDERS = re.compile(r"'(?:[^']|'')*'|%%|%s|%\(")
+
+# Tipos que o servidor pode inferir para $n sem mudar o resultado do literal que o psycopg2 geraria
+_TIPOS_NUMERICOS = {'smallint', 'integer', 'bigint', 'numeric', 'real', 'double precision'}
+_TIPOS_COMPATIVEIS = {
+    bool: {'boolean'},
+    int: _TIPOS_NUMERICOS,
+    float: {'numeric', 'real', 'double precision'},
+    Decimal: {'numeric', 'real', 'double precision'}
+}
+_TIPOS_SEM_CONTEXTO = {'text', 'unknown'}
+
+
+"""SQL de INSERT memoizado por (tabela, conjunto de colunas)"""
+
+@lru_cache(maxsize=256)
+def insert_sql(table: str, columns: Tuple[str, ...], returning: bool = True) -> str:
+    query = f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        """
+    if returning:
+        query += "RETURNING *;"
+    return query
+
+""" Converte placeholders %s do psycopg2 em $1..$n; retorna None se a query usar parâmetros nomeados.
+
+interpolated indica se o psycopg2 interpolaria a query (params não é None):
+só nesse caso %% vira %; sem parâmetros o texto vai ao servidor como está.
+"""
+
+def to_server_placeholders(query: str, interpolated: bool = True) -> Optional[Tuple[str, int]]:
+    partes = []
+    total = 0
+    posicao = 0
+    for token in _LITERAIS_E_PLACEHOLDERS.finditer(query):
+        partes.append(query[posicao:token.start()])
+        texto = token.group()
+        if not interpolated:
+            partes.append(texto)
+        elif texto == '%(':
+            return None
+        elif texto == '%s':
+            total += 1
+            partes.append(f'${total}')
+        else:
+            # Com parâmetros o psycopg2 troca %% por %; fora dos literais também
+            partes.append(texto.replace('%%', '%'))
+        posicao = token.end()
+    partes.append(query[posicao:])
+    return ''.join(partes).strip().rstrip(';'), total
+
+""" Indica se os tipos inferidos no PREPARE dão o mesmo resultado que a interpolação do psycopg2.
+
+Um $n sem contexto vira text, enquanto o literal interpolado (5, 1.5, true)
+seria tipado: o EXECUTE devolveria '5' onde a query original devolve 5.
+Strings e None viram literais sem tipo no psycopg2, então aceitam qualquer tipo.
+"""
+
+def parameter_types_match(types: Sequence[str], params: Optional[Sequence]) -> bool:
+    for tipo, valor in zip(types, params or ()):
+        if valor is None or isinstance(valor, str):
+            continue
+        compativeis = _TIPOS_COMPATIVEIS.get(type(valor))
+        if compativeis is not None and tipo not in compativeis:
+            return False
+        if tipo in _TIPOS_SEM_CONTEXTO:
+            return False
+    return True
+
+class StatementCache:
+    """Conta execuções por statement e usa PREPARE/EXECUTE nos mais frequentes.
+
+    Depois de prepare_threshold execuções, o statement é preparado uma vez em
+    cada conexão (as conexões do pool vivem o bastante para amortizar o custo)
+    e passa a rodar como EXECUTE, sem novo parse e planejamento no servidor.
+    """
+
+    def __init__(self, prepare_threshold: int = 5, max_prepared: int = 100, max_tracked: int = 10000):
+        if prepare_threshold < 1:
+            raise ValueError("prepare_threshold deve ser positivo")
+
+        self.prepare_threshold = prepare_threshold
+        self.max_prepared = max_prepared
+        self.max_tracked = max_tracked
+        self._lock = threading.Lock()
+        self._executions: Dict[str, int] = {}
+        self._num_prepared = 0
+        # Por (query normalizada, interpolada): com e sem parâmetros o mesmo texto chega diferente ao servidor
+        self._statements: Dict[Tuple[str, bool], Optional[Tuple[str, str, int]]] = {}
+        # Statements já preparados em cada conexão; somem junto com a conexão
+        self._prepared = weakref.WeakKeyDictionary()
+        # Tipos dos parâmetros inferidos pelo servidor, por nome do statement
+        self._parameter_types: Dict[str, Tuple[str, ...]] = {}
+
+    @staticmethod
+    def _name(key: str) -> str:
+        return 'stmt_' + hashlib.md5(key.encode('utf-8')).hexdigest()[:16]
+
+    """Registra a execução e devolve a query/params a usar: EXECUTE para statements quentes, senão os originais"""
+
+    def resolve(self, conn, query: str, params=None, prepare: bool = True) -> Tuple[str, Optional[tuple]]:
+        key = normalize_query(query)
+        with self._lock:
+            if key not in self._executions and len(self._executions) >= self.max_tracked:
+                # Queries com valores embutidos geram textos únicos: não crescem sem limite
+                return query, params
+            executions = self._executions.get(key, 0) + 1
+            self._executions[key] = executions
+
+            if not prepare or executions < self.prepare_threshold or isinstance(params, dict):
+                return query, params
+
+            statement_key = (key, params is not None)
+            if statement_key not in self._statements:
+                if self._num_prepared >= self.max_prepared:
+                    return query, params
+                converted = to_server_placeholders(query, interpolated=params is not None)
+                name = self._name(key if params is not None else f'{key} -- literal')
+                self._statements[statement_key] = None if converted is None else (name,) + converted
+                self._num_prepared += converted is not None
+            statement = self._statements[statement_key]
+            if statement is None:
+                return query, params
+            prepared = self._prepared.setdefault(conn, set())
+
+        name, server_query, num_params = statement
+        if num_params != len(params or ()):
+            return query, params
+
+        if name not in prepared:
+            if not self._prepare(conn, statement_key, name, server_query, params):
+                return query, params
+            prepared.add(name)
+
+        # Os tipos foram fixados no PREPARE; params de outro tipo rodam sem EXECUTE
+        if not parameter_types_match(self._parameter_types.get(name, ()), params):
+            return query, params
+
+        if num_params == 0:
+            return f"EXECUTE {name}", None
+        return f"EXECUTE {name} ({', '.join(['%s'] * num_params)})", params
+
+    """Marca o statement como não preparável: as próximas execuções usam a query original"""
+
+    def _discard(self, statement_key: Tuple[str, bool]) -> None:
+        with self._lock:
+            if self._statements.get(statement_key) is not None:
+                self._statements[statement_key] = None
+                self._num_prepared -= 1
+
+    """ Prepara o statement sob um savepoint: uma falha não aborta a transação em curso.
+
+    Depois do PREPARE lê os tipos inferidos em pg_prepared_statements; se algum
+    parâmetro ficou sem tipo (text/unknown) para um valor que o psycopg2
+    interpolaria tipado, o statement é desalocado e não volta a ser preparado.
+    """
+
+    def _prepare(self, conn, statement_key: Tuple[str, bool], name: str, server_query: str, params=None) -> bool:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SAVEPOINT statement_cache")
+                try:
+                    cur.execute(f"PREPARE {name} AS {server_query}")
+                except Error as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT statement_cache")
+                    logging.warning("Statement não preparável, mantido sem PREPARE: %s", e)
+                    self._discard(statement_key)
+                    return False
+                cur.execute(
+                    "SELECT parameter_types::text[] FROM pg_prepared_statements WHERE name = %s", (name,)
+                )
+                row = cur.fetchone()
+                types = tuple(row[0]) if row and row[0] else ()
+                if not parameter_types_match(types, params):
+                    cur.execute(f"DEALLOCATE {name}")
+                    cur.execute("RELEASE SAVEPOINT statement_cache")
+                    logging.warning("Statement com parâmetros sem tipo (%s), mantido sem PREPARE", ', '.join(types))
+                    self._discard(statement_key)
+                    return False
+                cur.execute("RELEASE SAVEPOINT statement_cache")
+            with self._lock:
+                self._parameter_types[name] = types
+            return True
+        except Error as e:
+            logging.warning("Falha ao preparar statement: %s", e)
+            return False
+
+    @property
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {
+                key: {
+                    'executions': executions,
+                    'prepared': bool(self._statements.get((key, True)) or self._statements.get((key, False)))
+                }
+                for key, executions in self._executions.items()
+            }
@@ -0,0 +1,144 @@
+import os
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pandas as pd
+import pytest
+
+from analytical_views import ResumosAnaliticos, CONSULTAS_NOTEBOOK
+from postgres_setup import PostgresConnector
+from query_cache import ALL_TABLES, QueryCache, referenced_tables
+
+
+@pytest.fixture
+def connector():
+    connector = PostgresConnector(
+        dbname='smart_data_db',
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        host='localhost',
+        port='5432',
+        query_cache=QueryCache()
+    )
+    connector.create_database_tables()
+    return connector
+
+@pytest.fixture
+def resumos(connector):
+    resumos = ResumosAnaliticos(connector)
+    resumos.criar()
+    resumos.reconstruir()
+    return resumos
+
+def normalizar(df, chaves):
+    df = df.copy()
+    for coluna in df.columns:
+        if df[coluna].map(lambda v: isinstance(v, Decimal)).any():
+            df[coluna] = df[coluna].astype(float)
+    return df.sort_values(chaves, na_position='first').reset_index(drop=True)
+
+def comparar_com_notebook(resumos):
+    connector = resumos.connector
+    pd.testing.assert_frame_equal(
+        normalizar(resumos.volume_por_tipo(), ['tipo_dado', 'latencia']),
+        normalizar(connector.execute_query(CONSULTAS_NOTEBOOK['volume_por_tipo']), ['tipo_dado', 'latencia']),
+        check_dtype=False
+    )
+    pd.testing.assert_frame_equal(
+        resumos.fluxos_mensais().map(lambda v: float(v) if isinstance(v, Decimal) else v),
+        connector.execute_query(CONSULTAS_NOTEBOOK['fluxos_mensais']).map(
+            lambda v: float(v) if isinstance(v, Decimal) else v
+        ),
+        check_dtype=False
+    )
+    pd.testing.assert_frame_equal(
+        normalizar(resumos.desempenho_analistas(), ['responsavel']),
+        normalizar(connector.execute_query(CONSULTAS_NOTEBOOK['desempenho_analistas']), ['responsavel']),
+        check_dtype=False
+    )
+
+# Testes contra o banco: os resumos devem reproduzir as consultas do notebook
+class TestResumosNoBanco:
+    def test_reconstruir_reproduz_consultas(self, resumos):
+        comparar_com_notebook(resumos)
+
+    def test_atualizacao_incremental_via_ouvinte(self, resumos, connector):
+        resumos.registrar()
+        origem = connector.insert_data('dados_origem', {
+            'nome_origem': 'Resumo', 'tipo_dado': 'tipo_resumo_teste', 'volume': 10, 'latencia': None
+        })
+        id_origem = int(origem['id_origem'].iloc[0])
+        fluxo = connector.insert_data('fluxo_dados', {
+            'id_origem': id_origem, 'destino': 'DW', 'status': 'ativo',
+            'data_criacao': '2024-01-05', 'data_atualizacao': '2024-01-06'
+        })
+        id_fluxo = int(fluxo['id_fluxo'].iloc[0])
+        try:
+            connector.insert_data('analises', {
+                'id_fluxo': id_fluxo, 'resultado': 'ok',
+                'data_analise': '2024-01-07', 'responsavel': 'Analista Resumo Teste'
+            })
+            comparar_com_notebook(resumos)
+            assert resumos.atualizar() == {}
+            # Par (responsavel, fluxo) repetido não incrementa fluxos_distintos
+            connector.insert_data('analises', {
+                'id_fluxo': id_fluxo, 'resultado': 'ok',
+                'data_analise': '2024-01-08', 'responsavel': 'Analista Resumo Teste'
+            })
+            analista = resumos.desempenho_analistas().set_index('responsavel').loc['Analista Resumo Teste']
+            assert (analista['total_analises'], analista['fluxos_distintos'], analista['tipos_dados_analisados']) == (2, 1, 1)
+        finally:
+            connector.write_listeners.remove(resumos.ao_escrever)
+            connector.execute_query("DELETE FROM analises WHERE id_fluxo = %s", (id_fluxo,), return_data=False)
+            connector.execute_query("DELETE FROM fluxo_dados WHERE id_fluxo = %s", (id_fluxo,), return_data=False)
+            connector.execute_query("DELETE FROM dados_origem WHERE id_origem = %s", (id_origem,), return_data=False)
+            resumos.reconstruir()
+
+    def test_leituras_em_cache_invalidadas_pela_atualizacao(self, resumos, connector):
+        antes = resumos.volume_por_tipo()
+        resumos.volume_por_tipo()
+        assert connector.cache.stats['hits'] >= 1
+        invalidacoes = connector.cache.stats['invalidations']
+        resumos.reconstruir()
+        assert connector.cache.stats['invalidations'] > invalidacoes
+        pd.testing.assert_frame_equal(resumos.volume_por_tipo(), antes)
+
+    def test_truncate_invalida_leituras_em_cache(self, resumos, connector):
+        antes = resumos.volume_por_tipo()
+        connector.execute_query("TRUNCATE resumo_volume_tipo, resumo_fluxo_mensal;", return_data=False)
+        try:
+            assert resumos.volume_por_tipo().empty
+        finally:
+            resumos.reconstruir()
+        pd.testing.assert_frame_equal(resumos.volume_por_tipo(), antes)
+
+# Testes dos ouvintes
+class TestOuvintes:
+    def test_ignora_tabelas_que_nao_sao_base(self):
+        resumos = ResumosAnaliticos(MagicMock())
+        resumos.atualizar = MagicMock()
+        resumos.ao_escrever({'resumo_volume_tipo'})
+        resumos.atualizar.assert_not_called()
+        resumos.ao_escrever({'analises'})
+        resumos.atualizar.assert_called_once()
+        resumos.ao_escrever({ALL_TABLES})
+        assert resumos.atualizar.call_count == 2
+
+    def test_desempenho_le_uma_linha_por_analista(self):
+        connector = MagicMock()
+        ResumosAnaliticos(connector).desempenho_analistas()
+        assert referenced_tables(connector.execute_query.call_args[0][0]) == {'resumo_analista'}
+
+    def test_registrar_no_gerador(self):
+        connector = MagicMock()
+        generator = MagicMock(ouvintes_escrita=[])
+        resumos = ResumosAnaliticos(connector)
+        resumos.registrar(generator)
+        connector.add_write_listener.assert_called_once_with(resumos.ao_escrever)
+        assert generator.ouvintes_escrita == [resumos.ao_escrever]
+
+    def test_gerador_com_o_mesmo_conector_nao_duplica(self):
+        connector = MagicMock()
+        generator = MagicMock(ouvintes_escrita=[], conector=connector)
+        ResumosAnaliticos(connector).registrar(generator)
+        assert generator.ouvintes_escrita == []
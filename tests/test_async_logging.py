@@ -0,0 +1,148 @@
+import logging
+import os
+import queue
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from async_logging import (
+    ArquivoRotativoEmLote, EscritorLogAssincrono, FilaNaoBloqueante, TruncarMensagens,
+    configurar_log_assincrono, parar_log_assincrono
+)
+from postgres_setup import PostgresConnector
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger('teste_async_logging')
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    yield logger
+    logger.handlers.clear()
+
+@pytest.fixture(autouse=True)
+def parar_escritor():
+    yield
+    parar_log_assincrono()
+
+def registro(mensagem):
+    return logging.LogRecord('x', logging.INFO, __file__, 1, mensagem, None, None)
+
+# Testes dos componentes
+class TestComponentes:
+    def test_truncar_mensagens(self):
+        filtro = TruncarMensagens(max_caracteres=10)
+        longo = registro("SELECT " + "x" * 100)
+        filtro.filter(longo)
+        assert longo.getMessage() == "SELECT xxx... [97 caracteres omitidos]"
+        curto = registro("SELECT 1")
+        filtro.filter(curto)
+        assert curto.getMessage() == "SELECT 1"
+
+    def test_fila_cheia_descarta_sem_bloquear(self):
+        handler = FilaNaoBloqueante(queue.Queue(maxsize=2))
+        for i in range(5):
+            handler.emit(registro(f"linha {i}"))
+        assert handler.queue.qsize() == 2
+        assert handler.descartados == 3
+
+    def test_escritor_em_lote(self, logger, tmp_path):
+        arquivo = tmp_path / 'ops.log'
+        handler = ArquivoRotativoEmLote(str(arquivo), maxBytes=0)
+        escritor = EscritorLogAssincrono(handler, tamanho_lote=50, intervalo_flush=0.05).iniciar()
+        logger.addHandler(escritor.queue_handler)
+
+        with patch.object(handler, 'flush_lote', wraps=handler.flush_lote) as flush:
+            for i in range(500):
+                logger.info(f"linha {i}")
+            escritor.parar()
+
+        linhas = arquivo.read_text().splitlines()
+        assert linhas == [f"linha {i}" for i in range(500)]
+        # Um flush por lote, não por registro
+        assert flush.call_count <= 500 // 50 + 2
+
+    def test_flush_periodico_sem_trafego(self, logger, tmp_path):
+        arquivo = tmp_path / 'ops.log'
+        escritor = EscritorLogAssincrono(ArquivoRotativoEmLote(str(arquivo)), intervalo_flush=0.01).iniciar()
+        logger.addHandler(escritor.queue_handler)
+        logger.info("única")
+        time.sleep(0.2)
+        assert arquivo.read_text() == "única\n"
+        escritor.parar()
+
+    def test_rotacao_por_tamanho(self, logger, tmp_path):
+        arquivo = tmp_path / 'ops.log'
+        escritor = EscritorLogAssincrono(
+            ArquivoRotativoEmLote(str(arquivo), maxBytes=200, backupCount=2)
+        ).iniciar()
+        logger.addHandler(escritor.queue_handler)
+        for i in range(100):
+            logger.info(f"registro número {i}")
+        escritor.parar()
+
+        assert os.path.exists(f"{arquivo}.1")
+        assert os.path.exists(f"{arquivo}.2")
+        assert not os.path.exists(f"{arquivo}.3")
+
+# Testes da configuração no logger raiz
+class TestConfiguracao:
+    def test_configuracao_idempotente(self, tmp_path):
+        arquivo = str(tmp_path / 'ops.log')
+        primeiro = configurar_log_assincrono(arquivo)
+        assert configurar_log_assincrono(arquivo) is primeiro
+        assert logging.getLogger().handlers.count(primeiro.queue_handler) == 1
+
+        outro = configurar_log_assincrono(arquivo, max_caracteres=50)
+        assert outro is not primeiro
+        assert primeiro.queue_handler not in logging.getLogger().handlers
+
+    def test_conector_com_log_assincrono(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        with patch('logging.basicConfig') as mock_basic_config:
+            PostgresConnector('db', 'user', 'senha', async_logging=True)
+        mock_basic_config.assert_not_called()
+
+        logging.info("Query executed successfully: " + "y" * 5000)
+        parar_log_assincrono()
+
+        log_file = next((tmp_path / 'logs').iterdir())
+        conteudo = log_file.read_text(encoding='utf-8')
+        assert 'Query executed successfully' in conteudo
+        assert 'caracteres omitidos' in conteudo
+        assert len(conteudo) < 3000
+
+    def test_truncamento_na_thread_do_escritor(self, tmp_path):
+        escritor = configurar_log_assincrono(str(tmp_path / 'ops.log'), max_caracteres=20)
+        assert not escritor.queue_handler.filters
+        threads = []
+        enfileirados = []
+        original = TruncarMensagens.filter
+        put_nowait = escritor.fila.put_nowait
+
+        def filtrar(filtro, record):
+            threads.append(threading.current_thread().name)
+            return original(filtro, record)
+
+        def enfileirar(record):
+            enfileirados.append((record.msg, record.args))
+            put_nowait(record)
+
+        with patch.object(TruncarMensagens, 'filter', filtrar), \
+                patch.object(escritor.fila, 'put_nowait', enfileirar):
+            logging.info("Query executed successfully: %s", "z" * 500)
+            parar_log_assincrono()
+
+        # O registro entra na fila sem ser formatado; a formatação e o corte ficam com o escritor
+        assert enfileirados == [("Query executed successfully: %s", ("z" * 500,))]
+        assert threads == ['async_logging']
+        assert 'caracteres omitidos' in (tmp_path / 'ops.log').read_text(encoding='utf-8')
+
+    def test_opcoes_pelo_construtor(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        with patch('postgres_setup.configurar_log_assincrono') as configurar:
+            PostgresConnector('db', 'user', 'senha', async_logging=True,
+                              async_options={'max_caracteres': 50, 'tamanho_lote': 10})
+        assert configurar.call_args.kwargs == {'max_caracteres': 50, 'tamanho_lote': 10}
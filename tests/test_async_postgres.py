@@ -0,0 +1,75 @@
+import pytest
+import asyncio
+import threading
+import time
+import pandas as pd
+from unittest.mock import patch
+from async_postgres import AsyncPostgresConnector
+
+
+@pytest.fixture
+def mock_connector():
+    with patch('async_postgres.PostgresConnector') as mock_cls:
+        yield mock_cls
+
+@pytest.fixture
+def connector(mock_connector):
+    return AsyncPostgresConnector('smart_data_db', 'postgres', 'postgres', pool_max_size=4)
+
+# Testes de inicialização
+class TestAsyncInitialization:
+    def test_usa_conector_com_pool(self, mock_connector, connector):
+        kwargs = mock_connector.call_args[1]
+        assert kwargs['use_pool'] is True
+        assert kwargs['pool_max_size'] == 4
+
+    def test_close(self, mock_connector, connector):
+        asyncio.run(connector.close())
+        mock_connector.return_value.close.assert_called_once()
+
+# Testes das operações assíncronas
+class TestAsyncOperations:
+    def test_execute_query(self, mock_connector, connector):
+        esperado = pd.DataFrame({'a': [1]})
+        mock_connector.return_value.execute_query.return_value = esperado
+
+        resultado = asyncio.run(connector.execute_query("SELECT 1 AS a"))
+
+        pd.testing.assert_frame_equal(resultado, esperado)
+        mock_connector.return_value.execute_query.assert_called_once_with("SELECT 1 AS a", None, True)
+
+    def test_demais_metodos_delegados(self, mock_connector, connector):
+        async def executar():
+            await connector.create_database_tables()
+            await connector.insert_data('dados_origem', {'nome_origem': 'x'})
+            await connector.get_table_info('dados_origem')
+
+        asyncio.run(executar())
+
+        mock_connector.return_value.create_database_tables.assert_called_once()
+        mock_connector.return_value.insert_data.assert_called_once_with('dados_origem', {'nome_origem': 'x'})
+        mock_connector.return_value.get_table_info.assert_called_once_with('dados_origem')
+
+    def test_gather_concorrente_e_ordenado(self, mock_connector, connector):
+        threads = set()
+
+        def consulta_lenta(query, params, return_data):
+            threads.add(threading.get_ident())
+            time.sleep(0.2)
+            return pd.DataFrame({'query': [query], 'params': [params]})
+
+        mock_connector.return_value.execute_query.side_effect = consulta_lenta
+
+        inicio = time.perf_counter()
+        resultados = asyncio.run(connector.gather(['q1', ('q2', (1,)), 'q3']))
+        duracao = time.perf_counter() - inicio
+
+        assert [df['query'][0] for df in resultados] == ['q1', 'q2', 'q3']
+        assert resultados[1]['params'][0] == (1,)
+        assert len(threads) == 3
+        assert duracao < 0.5
+
+    def test_gather_propaga_erro(self, mock_connector, connector):
+        mock_connector.return_value.execute_query.side_effect = ValueError("Erro de teste")
+        with pytest.raises(ValueError):
+            asyncio.run(connector.gather(['q1']))
@@ -0,0 +1,46 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from bench_suite import regressoes
+
+
+LINHAS = {'dados_origem': 100, 'fluxo_dados': 200, 'analises': 300}
+
+def resultado(etapa='consulta_volume_por_tipo', linhas_tabelas=LINHAS, **metricas):
+    return dict({'tamanho': 600, 'etapa': etapa, 'linhas_tabelas': linhas_tabelas}, **metricas)
+
+# Testes da comparação com a baseline
+class TestRegressoes:
+    def test_dentro_da_tolerancia(self):
+        baseline = [resultado(linhas_por_segundo=1000, p99_ms=10, rss_pico_mb=100)]
+        atuais = [resultado(linhas_por_segundo=850, p99_ms=11.5, rss_pico_mb=119)]
+        assert regressoes(atuais, baseline, 0.2) == []
+
+    def test_direcao_de_cada_metrica(self):
+        baseline = [resultado(linhas_por_segundo=1000, p99_ms=10, rss_pico_mb=100)]
+        # Mais vazão, menos latência e memória: melhora, não regressão
+        assert regressoes([resultado(linhas_por_segundo=2000, p99_ms=5, rss_pico_mb=50)], baseline, 0.2) == []
+
+        encontradas = regressoes([resultado(linhas_por_segundo=700, p99_ms=13, rss_pico_mb=130)], baseline, 0.2)
+        assert {r['metrica'] for r in encontradas} == {'linhas_por_segundo', 'p99_ms', 'rss_pico_mb'}
+        vazao = next(r for r in encontradas if r['metrica'] == 'linhas_por_segundo')
+        assert vazao['baseline'] == 1000 and vazao['atual'] == 700
+        assert abs(vazao['variacao'] + 0.3) < 1e-9
+
+    def test_ignora_metricas_ausentes_e_etapas_novas(self):
+        baseline = [resultado(linhas_por_segundo=1000, p99_ms=None)]
+        atuais = [resultado(linhas_por_segundo=1000, p99_ms=50), resultado(etapa='nova', linhas_por_segundo=1)]
+        assert regressoes(atuais, baseline, 0.2) == []
+
+    def test_so_compara_o_mesmo_volume_de_dados(self):
+        baseline = [resultado(linhas_por_segundo=1000)]
+        maior = dict(LINHAS, analises=3000)
+        assert regressoes([resultado(linhas_tabelas=maior, linhas_por_segundo=100)], baseline, 0.2) == []
+        # Baselines antigas, sem contagem, também não são comparáveis com etapas de banco
+        antiga = [resultado(linhas_tabelas=None, linhas_por_segundo=1000)]
+        assert regressoes([resultado(linhas_por_segundo=100)], antiga, 0.2) == []
+        # Etapas de geração não têm contagem em nenhum dos lados e continuam comparadas
+        geracao = [resultado('gerar_analises', linhas_tabelas=None, linhas_por_segundo=1000)]
+        assert len(regressoes([resultado('gerar_analises', linhas_tabelas=None, linhas_por_segundo=100)], geracao, 0.2)) == 1
@@ -0,0 +1,98 @@
+import os
+
+import psycopg2
+import pytest
+
+from bulk_load import SessaoCargaMassiva
+from postgres_setup import PostgresConnector, PERFORMANCE_INDEXES_SQL
+
+
+def conectar():
+    return psycopg2.connect(
+        dbname='smart_data_db',
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        host='localhost',
+        port='5432'
+    )
+
+@pytest.fixture
+def connector():
+    connector = PostgresConnector(
+        dbname='smart_data_db',
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        host='localhost',
+        port='5432'
+    )
+    connector.create_database_tables(performance_schema=True)
+    return connector
+
+def indices(connector):
+    return set(connector.execute_query(
+        "SELECT indexname FROM pg_indexes WHERE tablename IN ('dados_origem', 'fluxo_dados', 'analises')"
+    )['indexname'])
+
+def fks(connector):
+    resultado = connector.execute_query(
+        "SELECT conname, convalidated FROM pg_constraint "
+        "WHERE contype = 'f' AND conrelid IN ('fluxo_dados'::regclass, 'analises'::regclass)"
+    )
+    return dict(zip(resultado['conname'], resultado['convalidated']))
+
+# Testes da sessão de carga em massa
+class TestSessaoCargaMassiva:
+    def test_remove_e_restaura(self, connector):
+        fks_antes = fks(connector)
+        with SessaoCargaMassiva(conectar, num_workers=3) as sessao:
+            assert not set(PERFORMANCE_INDEXES_SQL) & indices(connector)
+            assert fks(connector) == {}
+            # PKs continuam ativas durante a carga
+            assert 'analises_pkey' in indices(connector)
+
+        assert set(PERFORMANCE_INDEXES_SQL) <= indices(connector)
+        assert fks(connector) == fks_antes
+        assert all(fks(connector).values())
+        assert sessao.estatisticas['indices'] == len(PERFORMANCE_INDEXES_SQL)
+        assert sessao.estatisticas['fks'] == 2
+
+    def test_fk_violada_fica_not_valid(self, connector):
+        with pytest.raises(Exception, match="FKs não validadas"):
+            with SessaoCargaMassiva(conectar):
+                connector.execute_query(
+                    "INSERT INTO analises (id_fluxo, responsavel) VALUES (-1, 'orfao_carga_massiva')",
+                    return_data=False
+                )
+        try:
+            assert not fks(connector)['analises_id_fluxo_fkey']
+            assert fks(connector)['fluxo_dados_id_origem_fkey']
+            assert set(PERFORMANCE_INDEXES_SQL) <= indices(connector)
+        finally:
+            connector.execute_query(
+                "DELETE FROM analises WHERE responsavel = 'orfao_carga_massiva'", return_data=False
+            )
+            connector.execute_query(
+                "ALTER TABLE analises VALIDATE CONSTRAINT analises_id_fluxo_fkey", return_data=False
+            )
+
+    def test_restaura_apos_interrupcao(self, connector):
+        SessaoCargaMassiva(conectar).desativar()
+        try:
+            with pytest.raises(RuntimeError):
+                SessaoCargaMassiva(conectar).desativar()
+            assert fks(connector) == {}
+        finally:
+            SessaoCargaMassiva(conectar).restaurar()
+        assert set(PERFORMANCE_INDEXES_SQL) <= indices(connector)
+        assert len(fks(connector)) == 2
+
+    def test_erro_na_carga_nao_e_mascarado(self, connector):
+        with pytest.raises(ValueError):
+            with SessaoCargaMassiva(conectar):
+                raise ValueError("falha na carga")
+        assert set(PERFORMANCE_INDEXES_SQL) <= indices(connector)
+        assert len(fks(connector)) == 2
+
+    def test_num_workers_invalido(self):
+        with pytest.raises(ValueError):
+            SessaoCargaMassiva(conectar, num_workers=0)
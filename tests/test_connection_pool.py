@@ -0,0 +1,92 @@
+import pytest
+import threading
+from unittest.mock import MagicMock
+from psycopg2 import Error
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INTRANS
+from psycopg2.pool import PoolError
+from connection_pool import ConnectionPool
+
+
+def nova_conexao():
+    conn = MagicMock()
+    conn.closed = 0
+    conn.get_transaction_status.return_value = TRANSACTION_STATUS_IDLE
+    return conn
+
+@pytest.fixture
+def connect():
+    return MagicMock(side_effect=lambda: nova_conexao())
+
+# Testes de dimensionamento
+class TestPoolSizing:
+    def test_cria_conexoes_minimas(self, connect):
+        pool = ConnectionPool(connect, min_size=2, max_size=4)
+        assert connect.call_count == 2
+        assert pool.size == 2
+
+    def test_tamanhos_invalidos(self, connect):
+        with pytest.raises(ValueError):
+            ConnectionPool(connect, min_size=5, max_size=2)
+
+    def test_reutiliza_conexao_devolvida(self, connect):
+        pool = ConnectionPool(connect, min_size=0, max_size=2)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        assert pool.getconn() is conn
+        assert connect.call_count == 1
+
+    def test_esgotamento_do_pool(self, connect):
+        pool = ConnectionPool(connect, min_size=0, max_size=1, acquire_timeout=0.05)
+        pool.getconn()
+        with pytest.raises(PoolError):
+            pool.getconn()
+
+    def test_espera_conexao_liberada(self, connect):
+        pool = ConnectionPool(connect, min_size=0, max_size=1, acquire_timeout=5)
+        conn = pool.getconn()
+        threading.Timer(0.05, pool.putconn, args=(conn,)).start()
+        assert pool.getconn() is conn
+
+# Testes de saúde das conexões
+class TestPoolHealth:
+    def test_descarta_conexao_fechada(self, connect):
+        pool = ConnectionPool(connect, min_size=0, max_size=2)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        conn.closed = 1
+        assert pool.getconn() is not conn
+
+    def test_descarta_conexao_no_health_check(self, connect):
+        pool = ConnectionPool(connect, min_size=0, max_size=2)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        conn.cursor.return_value.__enter__.return_value.execute.side_effect = Error("caiu")
+        novo = pool.getconn()
+        assert novo is not conn
+        conn.close.assert_called_once()
+
+    def test_descarta_conexao_ociosa_expirada(self, connect):
+        pool = ConnectionPool(connect, min_size=0, max_size=2, idle_timeout=0)
+        conn = pool.getconn()
+        pool.putconn(conn)
+        assert pool.getconn() is not conn
+        conn.close.assert_called_once()
+
+    def test_rollback_de_transacao_aberta(self, connect):
+        pool = ConnectionPool(connect, min_size=0, max_size=1)
+        conn = pool.getconn()
+        conn.get_transaction_status.return_value = TRANSACTION_STATUS_INTRANS
+        pool.putconn(conn)
+        conn.rollback.assert_called_once()
+
+    def test_conexao_estranha_ao_pool(self, connect):
+        pool = ConnectionPool(connect, min_size=0, max_size=1)
+        with pytest.raises(PoolError):
+            pool.putconn(nova_conexao())
+
+    def test_closeall(self, connect):
+        pool = ConnectionPool(connect, min_size=2, max_size=2)
+        pool.closeall()
+        assert pool.size == 0
+        with pytest.raises(PoolError):
+            pool.getconn()
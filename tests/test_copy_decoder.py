@@ -0,0 +1,102 @@
+import struct
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from copy_decoder import choose_format, copy_sql, decode_binary, decode_csv
+
+
+# Saída de COPY ... TO STDOUT WITH (FORMAT csv, NULL '\N')
+DADOS = (
+    b'1,10,"texto, com v\xc3\xadrgula",2023-01-01 10:00:00,t,1.5,2023-01-01 10:00:00+00\n'
+    b'2,\\N,"",2023-01-02 11:30:00.25,f,\\N,2023-01-02 08:00:00-03\n'
+    b'3,30,"duas\nlinhas",\\N,\\N,2,\\N\n'
+)
+COLUNAS = ['id', 'ref', 'texto', 'criado', 'ativo', 'valor', 'criado_tz']
+OIDS = [23, 20, 25, 1114, 16, 1700, 1184]
+
+# Testes da decodificação CSV
+class TestDecodeCsv:
+    def test_tipos_e_nulos(self):
+        df = decode_csv(DADOS, COLUNAS, OIDS)
+        assert df['id'].dtype == np.int64
+        assert df['ref'].dtype == 'Int64' and df['ref'].isna().tolist() == [False, True, False]
+        assert df['texto'].tolist() == ['texto, com vírgula', '', 'duas\nlinhas']
+        assert df['criado'].tolist()[:2] == [pd.Timestamp('2023-01-01 10:00:00'), pd.Timestamp('2023-01-02 11:30:00.25')]
+        assert pd.isna(df['criado'].iloc[2])
+        assert df['ativo'].tolist()[:2] == [True, False]
+        assert df['valor'].dtype == np.float64
+        assert df['criado_tz'].iloc[1] == pd.Timestamp('2023-01-02 11:00:00', tz='UTC')
+
+    def test_vazio_mantem_tipos(self):
+        df = decode_csv(b'', COLUNAS, OIDS)
+        assert df.empty and list(df.columns) == COLUNAS
+        assert df['id'].dtype == np.int64
+        assert df['criado'].dtype.kind == 'M'
+
+
+def copy_binario(linhas, formatos):
+    """Monta a saída de COPY ... TO STDOUT WITH (FORMAT binary): cabeçalho, tuplas e trailer -1"""
+    dados = b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0)
+    for linha in linhas:
+        dados += struct.pack('>h', len(linha))
+        for valor, formato in zip(linha, formatos):
+            if valor is None:
+                dados += struct.pack('>i', -1)
+            else:
+                campo = valor.encode() if formato == 'texto' else struct.pack(formato, valor)
+                dados += struct.pack('>i', len(campo)) + campo
+    return dados + struct.pack('>h', -1)
+
+# 2023-01-01 10:00:00 em microssegundos desde 2000-01-01
+MICROS = int((pd.Timestamp('2023-01-01 10:00:00') - pd.Timestamp('2000-01-01')) / pd.Timedelta(microseconds=1))
+DIAS = (pd.Timestamp('2023-01-01') - pd.Timestamp('2000-01-01')).days
+COLUNAS_FIXAS = ['id', 'ref', 'valor', 'ativo', 'criado', 'dia', 'criado_tz']
+OIDS_FIXOS = [23, 20, 701, 16, 1114, 1082, 1184]
+FORMATOS_FIXOS = ['>i', '>q', '>d', '>?', '>q', '>i', '>q']
+
+# Testes da decodificação binária
+class TestDecodeBinary:
+    def test_escolha_do_formato(self):
+        assert choose_format(OIDS_FIXOS) == 'binary'
+        assert choose_format([23, 25]) == 'csv'
+        assert choose_format([23, 1700]) == 'csv'
+        assert copy_sql('SELECT 1;', 'binary') == 'COPY (SELECT 1) TO STDOUT WITH (FORMAT binary)'
+        with pytest.raises(ValueError):
+            copy_sql('SELECT 1', 'json')
+
+    def test_largura_fixa_sem_nulos(self):
+        linhas = [(i, i * 10, i / 2, i % 2 == 0, MICROS + i, DIAS + i, MICROS) for i in range(1, 6)]
+        df = decode_binary(copy_binario(linhas, FORMATOS_FIXOS), COLUNAS_FIXAS, OIDS_FIXOS)
+        assert df['id'].tolist() == [1, 2, 3, 4, 5] and df['id'].dtype == np.int64
+        assert df['ref'].tolist() == [10, 20, 30, 40, 50]
+        assert df['valor'].tolist() == [0.5, 1.0, 1.5, 2.0, 2.5]
+        assert df['ativo'].dtype == bool and df['ativo'].tolist() == [False, True, False, True, False]
+        assert df['criado'].iloc[0] == pd.Timestamp('2023-01-01 10:00:00.000001')
+        assert df['dia'].iloc[0] == pd.Timestamp('2023-01-02')
+        assert df['criado_tz'].iloc[0] == pd.Timestamp('2023-01-01 10:00:00', tz='UTC')
+
+    def test_nulos_e_texto(self):
+        linhas = [
+            (1, None, 1.5, True, MICROS, DIAS, None),
+            (2, 20, None, None, None, None, MICROS)
+        ]
+        df = decode_binary(copy_binario(linhas, FORMATOS_FIXOS), COLUNAS_FIXAS, OIDS_FIXOS)
+        assert df['id'].dtype == np.int64
+        assert df['ref'].dtype == 'Int64' and df['ref'].isna().tolist() == [True, False]
+        assert np.isnan(df['valor'].iloc[1])
+        assert df['criado'].iloc[0] == pd.Timestamp('2023-01-01 10:00:00') and pd.isna(df['criado'].iloc[1])
+        assert df['dia'].iloc[0] == pd.Timestamp('2023-01-01') and pd.isna(df['dia'].iloc[1])
+        assert df['criado_tz'].iloc[1] == pd.Timestamp('2023-01-01 10:00:00', tz='UTC')
+
+        texto = decode_binary(copy_binario([(1, 'vírgula, "aspas"'), (2, None)], ['>i', 'texto']), ['id', 'nome'], [23, 25])
+        assert texto['nome'].tolist() == ['vírgula, "aspas"', None]
+
+    def test_vazio_e_invalido(self):
+        df = decode_binary(copy_binario([], FORMATOS_FIXOS), COLUNAS_FIXAS, OIDS_FIXOS)
+        assert df.empty and list(df.columns) == COLUNAS_FIXAS
+        with pytest.raises(ValueError):
+            decode_binary(copy_binario([], ['>i']), ['valor'], [1700])
+        with pytest.raises(ValueError):
+            decode_binary(b'1,2\n', ['a'], [23])
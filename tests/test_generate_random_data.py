@@ -1,8 +1,14 @@
 import pytest
 from unittest.mock import MagicMock, patch
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import numpy as np
 import pandas as pd
+from dataclasses import asdict
 from generate_random_data import DbConfig, DataGenerator
+from postgres_setup import PostgresConnector
+from query_cache import QueryCache
+from metrics import Metricas, SinkMemoria
 from dotenv import load_dotenv
 import os
 
@@ -102,6 +108,35 @@ class TestDataGeneration:
         assert all(isinstance(dt, datetime) for dt in fluxo_df['data_criacao'])
         assert all(isinstance(dt, datetime) for dt in fluxo_df['data_atualizacao'])
 
+    def test_gerar_fluxo_dados_vetorizado(self, data_generator):
+        num_registros = 200
+        data_generator.gerar_dados_origem(100)
+        fluxo_df = data_generator.gerar_fluxo_dados(num_registros, vetorizado=True)
+        
+        assert len(fluxo_df) == num_registros
+        assert list(fluxo_df.columns) == [
+            'id_fluxo', 'id_origem', 'destino', 'status', 
+            'data_criacao', 'data_atualizacao'
+        ]
+        assert fluxo_df['id_fluxo'].is_unique
+        assert fluxo_df['id_origem'].isin(data_generator.df_origem['id_origem']).all()
+        assert fluxo_df['destino'].isin(data_generator.DESTINOS).all()
+        assert fluxo_df['status'].isin(data_generator.STATUS).all()
+        assert (fluxo_df['data_atualizacao'] >= fluxo_df['data_criacao']).all()
+        assert all(isinstance(dt, datetime) for dt in fluxo_df['data_criacao'])
+
+    def test_gerar_fluxo_dados_vetorizado_reprodutivel(self, db_config):
+        fluxos = []
+        for _ in range(2):
+            generator = DataGenerator(db_config, seed=7)
+            with patch.object(generator, 'connect'), \
+                 patch.object(generator, 'get_ultimo_id', return_value=0):
+                generator.conn = MagicMock(closed=0)
+                generator.df_origem = pd.DataFrame({'id_origem': range(1, 51)})
+                fluxos.append(generator.gerar_fluxo_dados(500, vetorizado=True))
+        
+        pd.testing.assert_frame_equal(fluxos[0], fluxos[1])
+
     def test_gerar_analises(self, data_generator):
         num_registros = 300
         data_generator.gerar_dados_origem(100)  # Pré-requisitos
@@ -117,6 +152,53 @@ class TestDataGeneration:
         ])
         assert analise_df['id_fluxo'].isin(data_generator.df_fluxo['id_fluxo']).all()
 
+    def test_gerar_analises_vetorizado(self, data_generator):
+        num_registros = 300
+        data_generator.gerar_dados_origem(100)
+        data_generator.gerar_fluxo_dados(200, vetorizado=True)
+        
+        analise_df = data_generator.gerar_analises(num_registros, vetorizado=True)
+        
+        assert len(analise_df) == num_registros
+        assert list(analise_df.columns) == [
+            'id_analise', 'id_fluxo', 'hipoteses', 
+            'resultado', 'data_analise', 'responsavel'
+        ]
+        assert analise_df['id_fluxo'].isin(data_generator.df_fluxo['id_fluxo']).all()
+        assert analise_df['hipoteses'].str.startswith('Hipótese: ').all()
+        
+        # data_analise fica entre 1 e 60 dias após a criação do fluxo pai
+        criacao = analise_df['id_fluxo'].map(
+            data_generator.df_fluxo.set_index('id_fluxo')['data_criacao']
+        )
+        dias = (analise_df['data_analise'] - criacao).dt.days
+        assert dias.between(1, 60).all()
+
+    def test_gerar_dados_origem_vetorizado(self, data_generator):
+        origem_df = data_generator.gerar_dados_origem(100, vetorizado=True)
+        
+        assert len(origem_df) == 100
+        assert list(origem_df.columns) == [
+            'id_origem', 'nome_origem', 'tipo_dado', 
+            'volume', 'latencia', 'descricao'
+        ]
+        assert origem_df['nome_origem'].str.startswith('Sistema ').all()
+        assert origem_df['tipo_dado'].isin(data_generator.TIPOS_DADOS).all()
+        assert origem_df['volume'].between(10000, 10000000).all()
+
+    def test_gerar_com_pool_textos(self, data_generator, tmp_path):
+        pool = data_generator.configurar_pool_textos(tamanho=10, diretorio_cache=str(tmp_path))
+        data_generator.gerar_dados_origem(100, vetorizado=True)
+        data_generator.gerar_fluxo_dados(200, vetorizado=True)
+        
+        with patch.object(data_generator.fake, 'name') as mock_name:
+            analise_df = data_generator.gerar_analises(300, vetorizado=True)
+            mock_name.assert_not_called()
+        
+        assert analise_df['responsavel'].isin(pool.textos['nome']).all()
+        assert analise_df['resultado'].isin(pool.textos['texto']).all()
+        assert data_generator.df_origem['descricao'].isin(pool.textos['texto']).all()
+
 # Testes de inserção no banco
 class TestDatabaseOperations:
     def test_inserir_dados_sem_dataframes(self, data_generator):
@@ -156,6 +238,87 @@ class TestDatabaseOperations:
         assert "Erro ao inserir dados" in str(exc_info.value)
         mock_connect.return_value.rollback.assert_called_once()
 
+    @patch('psycopg2.connect')
+    def test_inserir_dados_copy(self, mock_connect, data_generator, mock_dataframes):
+        df_origem, df_fluxo, df_analises = mock_dataframes
+        data_generator.df_origem = df_origem
+        data_generator.df_fluxo = df_fluxo
+        data_generator.df_analises = df_analises
+
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+        
+        data_generator.inserir_dados_no_banco(metodo='copy')
+        
+        assert mock_cursor.executemany.call_count == 0
+        assert mock_cursor.copy_expert.call_count == 3
+        tabelas = [c[0][0].split()[1] for c in mock_cursor.copy_expert.call_args_list]
+        assert tabelas == ['dados_origem', 'fluxo_dados', 'analises']
+        mock_connect.return_value.commit.assert_called_once()
+
+    @patch('psycopg2.connect')
+    def test_inserir_dados_notifica_ouvintes(self, mock_connect, db_config, mock_dataframes):
+        ouvinte = MagicMock()
+        generator = DataGenerator(db_config, ouvintes_escrita=[ouvinte])
+        generator.df_origem, generator.df_fluxo, generator.df_analises = mock_dataframes
+        
+        generator.inserir_dados_no_banco(metodo='copy')
+        
+        ouvinte.assert_called_once_with({'dados_origem', 'fluxo_dados', 'analises'})
+
+    @patch('psycopg2.connect')
+    def test_ouvinte_com_erro_nao_falha_a_carga(self, mock_connect, db_config, mock_dataframes):
+        ouvinte = MagicMock()
+        generator = DataGenerator(db_config, ouvintes_escrita=[MagicMock(side_effect=ValueError("ouvinte")), ouvinte])
+        generator.df_origem, generator.df_fluxo, generator.df_analises = mock_dataframes
+
+        generator.inserir_dados_no_banco(metodo='copy')
+
+        ouvinte.assert_called_once_with({'dados_origem', 'fluxo_dados', 'analises'})
+
+    @patch('psycopg2.connect')
+    def test_inserir_dados_invalida_cache_do_conector(self, mock_connect, db_config, mock_dataframes):
+        cache = QueryCache()
+        conector = PostgresConnector(**asdict(db_config), query_cache=cache)
+        cache.put("SELECT * FROM analises a, fluxo_dados f", None, pd.DataFrame({'a': [1]}))
+        generator = DataGenerator(db_config, conector=conector)
+        generator.df_origem, generator.df_fluxo, generator.df_analises = mock_dataframes
+
+        generator.inserir_dados_no_banco(metodo='copy')
+
+        assert cache.stats['size'] == 0
+
+    @patch('psycopg2.connect')
+    def test_inserir_dados_copy_em_lotes(self, mock_connect, data_generator, mock_dataframes):
+        _, df_fluxo, df_analises = mock_dataframes
+        data_generator.df_origem = pd.DataFrame({
+            'id_origem': [1, 2, 3],
+            'nome_origem': ['A', 'B', 'C'],
+            'tipo_dado': ['log', 'log', 'log'],
+            'volume': [1, 2, None],
+            'latencia': ['batch', 'batch', 'batch'],
+            'descricao': ['x', 'y', 'z']
+        })
+        data_generator.df_fluxo = df_fluxo
+        data_generator.df_analises = df_analises
+
+        buffers = []
+        mock_cursor = MagicMock()
+        mock_cursor.copy_expert.side_effect = lambda sql, buf: buffers.append(buf.getvalue())
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+        
+        data_generator.inserir_dados_no_banco(metodo='copy', tamanho_lote=2)
+        
+        # 2 lotes para dados_origem + 1 para cada tabela restante
+        assert mock_cursor.copy_expert.call_count == 4
+        assert buffers[0].splitlines() == ['1,A,log,1,batch,x', '2,B,log,2,batch,y']
+        assert buffers[1].splitlines() == ['3,C,log,\\N,batch,z']
+
+    def test_inserir_dados_metodo_invalido(self, data_generator, mock_dataframes):
+        data_generator.df_origem, data_generator.df_fluxo, data_generator.df_analises = mock_dataframes
+        with pytest.raises(ValueError):
+            data_generator.inserir_dados_no_banco(metodo='insert')
+
 # Testes de geração e inserção integrados
 class TestIntegration:
     def test_gerar_e_inserir_dados_padrao(self, data_generator):
@@ -183,6 +346,354 @@ class TestIntegration:
             assert len(df_analises) == 30
             mock_insert.assert_called_once()
 
+# Testes do pipeline em lotes
+class TestStreamingPipeline:
+    def test_planejar_lotes(self):
+        assert DataGenerator._planejar_lotes(10, 3) == [4, 3, 3]
+        assert DataGenerator._planejar_lotes(1, 4) == [1, 0, 0, 0]
+        assert sum(DataGenerator._planejar_lotes(1001, 7)) == 1001
+
+    def test_lotes_com_fks_validas(self, data_generator):
+        with patch.object(data_generator, 'get_ultimo_id', return_value=10):
+            lotes = list(data_generator._gerar_lotes(30, 100, 250, tamanho_lote=40))
+        
+        assert len(lotes) == 7
+        origem = pd.concat([l[0] for l in lotes])
+        fluxo = pd.concat([l[1] for l in lotes])
+        analises = pd.concat([l[2] for l in lotes])
+        assert (len(origem), len(fluxo), len(analises)) == (30, 100, 250)
+        assert origem['id_origem'].tolist() == list(range(11, 41))
+        assert fluxo['id_fluxo'].tolist() == list(range(11, 111))
+        
+        # Cada lote só referencia pais gerados até ele
+        vistos_origem, vistos_fluxo = set(), set()
+        for df_origem, df_fluxo, df_analises in lotes:
+            vistos_origem.update(df_origem['id_origem'])
+            vistos_fluxo.update(df_fluxo['id_fluxo'])
+            assert set(df_fluxo['id_origem']) <= vistos_origem
+            assert set(df_analises['id_fluxo']) <= vistos_fluxo
+
+    def test_lotes_sem_origem(self, data_generator):
+        with patch.object(data_generator, 'get_ultimo_id', return_value=0):
+            with pytest.raises(ValueError):
+                list(data_generator._gerar_lotes(0, 10, 0, tamanho_lote=5))
+
+    @patch('psycopg2.connect')
+    def test_gerar_e_inserir_em_lotes(self, mock_connect, data_generator):
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+        data_generator.configurar_pool_textos(tamanho=5)
+        
+        with patch.object(data_generator, 'get_ultimo_id', return_value=0):
+            progresso = list(data_generator.gerar_e_inserir_em_lotes(10, 20, 30, tamanho_lote=10))
+        
+        assert [p['lote'] for p in progresso] == [1, 2, 3]
+        assert progresso[-1]['linhas_acumuladas'] == 60
+        assert all(p['linhas_por_segundo'] > 0 for p in progresso)
+        assert mock_connect.return_value.commit.call_count == 3
+        assert mock_cursor.executemany.call_count == 0
+
+    @patch('psycopg2.connect')
+    def test_gerar_e_inserir_em_lotes_erro(self, mock_connect, data_generator):
+        mock_cursor = MagicMock()
+        mock_cursor.copy_expert.side_effect = Exception("Erro de teste")
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+        
+        with patch.object(data_generator, 'get_ultimo_id', return_value=0):
+            with pytest.raises(Exception) as exc_info:
+                list(data_generator.gerar_e_inserir_em_lotes(5, 5, 5, tamanho_lote=5))
+        
+        assert "Erro ao inserir lote 1" in str(exc_info.value)
+        mock_connect.return_value.rollback.assert_called_once()
+
+# Testes da geração paralela
+class TestParallelGeneration:
+    def test_resultado_independe_de_workers(self, data_generator):
+        with patch.object(data_generator, 'get_ultimo_id', return_value=0):
+            serial = data_generator.gerar_paralelo(20, 40, 60, num_workers=1, tamanho_shard=15)
+            paralelo = data_generator.gerar_paralelo(20, 40, 60, num_workers=2, tamanho_shard=15)
+        
+        for df_serial, df_paralelo in zip(serial, paralelo):
+            pd.testing.assert_frame_equal(df_serial, df_paralelo)
+
+    def test_workers_nao_usam_fork(self, data_generator):
+        with patch.object(data_generator, 'get_ultimo_id', return_value=0), \
+                patch('generate_random_data.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as executor:
+            data_generator.gerar_paralelo(10, 20, 30, num_workers=2, tamanho_shard=10)
+        assert executor.call_args.kwargs['mp_context'].get_start_method() in ('forkserver', 'spawn')
+
+    def test_fks_e_ids_validos(self, data_generator):
+        with patch.object(data_generator, 'get_ultimo_id', return_value=5):
+            df_origem, df_fluxo, df_analises = data_generator.gerar_paralelo(
+                20, 40, 60, num_workers=1, tamanho_shard=15
+            )
+        
+        assert df_origem['id_origem'].tolist() == list(range(6, 26))
+        assert df_fluxo['id_fluxo'].tolist() == list(range(6, 46))
+        assert df_analises['id_analise'].tolist() == list(range(6, 66))
+        assert df_fluxo['id_origem'].isin(df_origem['id_origem']).all()
+        assert df_analises['id_fluxo'].isin(df_fluxo['id_fluxo']).all()
+        assert data_generator.df_analises is df_analises
+
+    def test_shards_nunca_ficam_sem_fluxo(self, data_generator):
+        with patch.object(data_generator, 'get_ultimo_id', return_value=0):
+            shards = data_generator._planejar_shards(10, 2, 1000, tamanho_shard=100)
+        
+        assert len(shards) == 2
+        assert all(shard['fluxo'][1] > 0 for shard in shards)
+
+    @patch('psycopg2.connect')
+    def test_inserir_por_shard(self, mock_connect, data_generator):
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+        data_generator.configurar_pool_textos(tamanho=5)
+        
+        with patch.object(data_generator, 'get_ultimo_id', return_value=0):
+            resumo = data_generator.gerar_paralelo(10, 20, 30, num_workers=1, tamanho_shard=10, inserir=True)
+        
+        assert resumo['shards'] == 3
+        assert resumo['linhas'] == 60
+        # Origens de todos os shards primeiro, depois fluxos e análises
+        tabelas = [c[0][0].split()[1] for c in mock_cursor.copy_expert.call_args_list]
+        assert tabelas[:3] == ['dados_origem'] * 3
+        assert tabelas[3:] == ['fluxo_dados', 'analises'] * 3
+
+# Testes de reserva de IDs por sequence
+class TestSequenceAllocation:
+    def test_reserva_bloco_em_vez_de_max(self, db_config):
+        generator = DataGenerator(db_config, usar_sequencias=True)
+        generator.conn = MagicMock(closed=0)
+        with patch('generate_random_data.AlocadorIds') as mock_alocador, \
+             patch.object(generator, 'get_ultimo_id') as mock_ultimo_id:
+            mock_alocador.return_value.conn = generator.conn
+            mock_alocador.return_value.reservar.return_value = 101
+            origem_df = generator.gerar_dados_origem(10, vetorizado=True)
+        
+        mock_ultimo_id.assert_not_called()
+        mock_alocador.return_value.reservar.assert_called_once_with('dados_origem', 'id_origem', 10)
+        assert origem_df['id_origem'].tolist() == list(range(101, 111))
+
+    @patch('psycopg2.connect')
+    def test_sincroniza_apos_carga(self, mock_connect, db_config, mock_dataframes):
+        generator = DataGenerator(db_config, usar_sequencias=True)
+        generator.df_origem, generator.df_fluxo, generator.df_analises = mock_dataframes
+        with patch('generate_random_data.AlocadorIds') as mock_alocador:
+            mock_alocador.return_value.conn = mock_connect.return_value
+            generator.inserir_dados_no_banco(metodo='copy')
+        
+        sincronizadas = [c[0] for c in mock_alocador.return_value.sincronizar.call_args_list]
+        assert sincronizadas == [
+            ('dados_origem', 'id_origem'), ('fluxo_dados', 'id_fluxo'), ('analises', 'id_analise')
+        ]
+
+    @patch('psycopg2.connect')
+    def test_sem_sequencias_nao_sincroniza(self, mock_connect, data_generator, mock_dataframes):
+        data_generator.df_origem, data_generator.df_fluxo, data_generator.df_analises = mock_dataframes
+        with patch('generate_random_data.AlocadorIds') as mock_alocador:
+            data_generator.inserir_dados_no_banco()
+        mock_alocador.assert_not_called()
+
+# Testes da carga com índices e FKs adiados
+class TestCargaMassiva:
+    @patch('psycopg2.connect')
+    def test_carga_dentro_da_sessao(self, mock_connect, data_generator, mock_dataframes):
+        data_generator.df_origem, data_generator.df_fluxo, data_generator.df_analises = mock_dataframes
+        mock_connect.return_value.closed = 0
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+        eventos = []
+        mock_cursor.copy_expert.side_effect = lambda *args: eventos.append('copy')
+        
+        with patch('generate_random_data.SessaoCargaMassiva') as mock_sessao:
+            mock_sessao.return_value.__enter__.side_effect = lambda: eventos.append('desativar')
+            mock_sessao.return_value.__exit__.side_effect = lambda *args: eventos.append('restaurar')
+            data_generator.inserir_dados_no_banco(metodo='copy', carga_massiva=True)
+        
+        assert eventos == ['desativar', 'copy', 'copy', 'copy', 'restaurar']
+        # A transação de leitura da conexão do gerador é encerrada antes de remover índices
+        assert mock_connect.return_value.commit.call_count == 2
+
+    @patch('psycopg2.connect')
+    def test_sem_carga_massiva_nao_abre_sessao(self, mock_connect, data_generator, mock_dataframes):
+        data_generator.df_origem, data_generator.df_fluxo, data_generator.df_analises = mock_dataframes
+        with patch('generate_random_data.SessaoCargaMassiva') as mock_sessao:
+            data_generator.inserir_dados_no_banco(metodo='copy')
+        mock_sessao.assert_not_called()
+
+# Testes de snapshot Parquet
+class TestSnapshot:
+    def test_salvar_sem_dataframes(self, data_generator, tmp_path):
+        with pytest.raises(ValueError):
+            data_generator.salvar_snapshot(str(tmp_path))
+
+    def test_salvar_e_carregar(self, data_generator, mock_dataframes, tmp_path):
+        data_generator.df_origem, data_generator.df_fluxo, data_generator.df_analises = mock_dataframes
+        data_generator.salvar_snapshot(str(tmp_path))
+
+        outro = DataGenerator(data_generator.db_config)
+        df_origem, df_fluxo, df_analises = outro.carregar_snapshot(str(tmp_path))
+        assert df_origem['id_origem'].tolist() == [1]
+        assert df_fluxo['status'].tolist() == ['Ativo']
+        assert outro.df_analises is df_analises
+
+    @patch('psycopg2.connect')
+    def test_inserir_snapshot_via_copy(self, mock_connect, data_generator, mock_dataframes, tmp_path):
+        data_generator.df_origem, data_generator.df_fluxo, data_generator.df_analises = mock_dataframes
+        data_generator.salvar_snapshot(str(tmp_path))
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value.__enter__.return_value = mock_cursor
+
+        linhas = DataGenerator(data_generator.db_config).inserir_snapshot(str(tmp_path))
+
+        assert linhas == {'dados_origem': 1, 'fluxo_dados': 1, 'analises': 1}
+        tabelas = [c[0][0].split()[1] for c in mock_cursor.copy_expert.call_args_list]
+        assert tabelas == ['dados_origem', 'fluxo_dados', 'analises']
+        mock_connect.return_value.commit.assert_called_once()
+
+    @patch('psycopg2.connect')
+    def test_inserir_snapshot_incompleto(self, mock_connect, data_generator, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            data_generator.inserir_snapshot(str(tmp_path))
+        mock_connect.assert_not_called()
+
+# Testes do modo incremental
+class TestModoIncremental:
+    @pytest.fixture
+    def generator(self, db_config):
+        generator = DataGenerator(db_config)
+        generator.conn = MagicMock(closed=0)
+        return generator
+
+    def chaves(self, ids, datas=None):
+        cache = MagicMock(ids=np.asarray(ids, dtype=np.int32))
+        cache.datas = {'data_criacao': np.asarray(datas or [], dtype='datetime64[us]')}
+        return cache
+
+    def test_fluxos_sobre_origens_do_banco(self, generator):
+        with patch.object(generator, '_chaves_existentes', return_value=self.chaves([3, 7, 9])) as mock_chaves, \
+             patch.object(generator, 'get_ultimo_id', return_value=100):
+            fluxo_df = generator.gerar_fluxo_dados(50, incremental=True)
+        
+        mock_chaves.assert_called_once_with('dados_origem')
+        assert generator.df_origem is None
+        assert set(fluxo_df['id_origem']) <= {3, 7, 9}
+        assert fluxo_df['id_fluxo'].tolist() == list(range(101, 151))
+
+    def test_analises_sobre_fluxos_do_banco(self, generator):
+        fluxos = self.chaves([4, 8], ['2023-01-01T00:00', '2023-03-01T00:00'])
+        with patch.object(generator, '_chaves_existentes', return_value=fluxos), \
+             patch.object(generator, 'get_ultimo_id', return_value=0):
+            analises_df = generator.gerar_analises(40, incremental=True)
+        
+        assert set(analises_df['id_fluxo']) <= {4, 8}
+        criacao = analises_df['id_fluxo'].map({4: pd.Timestamp('2023-01-01'), 8: pd.Timestamp('2023-03-01')})
+        assert (analises_df['data_analise'] > criacao).all()
+
+    def test_sem_pais_no_banco(self, generator):
+        with patch('generate_random_data.CacheChaves') as mock_cache:
+            mock_cache.return_value.conn = generator.conn
+            mock_cache.return_value.__len__.return_value = 0
+            with pytest.raises(ValueError) as exc_info:
+                generator.gerar_fluxo_dados(5, incremental=True)
+        assert "Não há registros em dados_origem" in str(exc_info.value)
+
+    def test_cache_reaproveitado_entre_chamadas(self, generator):
+        with patch('generate_random_data.CacheChaves') as mock_cache:
+            mock_cache.return_value.conn = generator.conn
+            mock_cache.return_value.__len__.return_value = 1
+            generator._chaves_existentes('fluxo_dados')
+            generator._chaves_existentes('fluxo_dados')
+        
+        mock_cache.assert_called_once_with(generator.conn, 'fluxo_dados', 'id_fluxo', ('data_criacao',))
+        assert mock_cache.return_value.atualizar.call_count == 2
+
+    def test_gerar_incremental_insere_fluxos_antes_das_analises(self, generator):
+        eventos = []
+        generator.conn.cursor.return_value.__enter__.return_value.copy_expert.side_effect = (
+            lambda sql, buffer: eventos.append(sql.split()[1])
+        )
+        with patch.object(generator, '_chaves_existentes') as mock_chaves, \
+             patch.object(generator, 'get_ultimo_id', return_value=0):
+            mock_chaves.side_effect = lambda tabela: (
+                self.chaves([1]) if tabela == 'dados_origem' else self.chaves([1], ['2023-01-01T00:00'])
+            )
+            linhas = generator.gerar_incremental(num_fluxo=10, num_analises=20)
+        
+        assert linhas == {'fluxo_dados': 10, 'analises': 20}
+        assert eventos == ['fluxo_dados', 'analises']
+        assert [c[0][0] for c in mock_chaves.call_args_list] == ['dados_origem', 'fluxo_dados']
+        assert generator.conn.commit.call_count == 2
+
+    def test_inserir_tabelas_sem_dataframe(self, generator):
+        with pytest.raises(ValueError):
+            generator.inserir_tabelas(['analises'])
+
+# Testes do esquema compacto
+class TestEsquemaCompacto:
+    def gerar(self, db_config, vetorizado, **kwargs):
+        generator = DataGenerator(db_config, **kwargs)
+        generator.conn = MagicMock(closed=0)
+        with patch.object(generator, 'get_ultimo_id', return_value=0):
+            generator.gerar_dados_origem(50, vetorizado=vetorizado)
+            generator.gerar_fluxo_dados(100, vetorizado=vetorizado)
+            generator.gerar_analises(150, vetorizado=vetorizado)
+        return generator
+
+    @pytest.mark.parametrize('vetorizado', [False, True])
+    def test_tipos_compactos(self, db_config, vetorizado):
+        generator = self.gerar(db_config, vetorizado, esquema_compacto=True)
+        origem, fluxo, analises = generator.df_origem, generator.df_fluxo, generator.df_analises
+        
+        assert list(origem['tipo_dado'].cat.categories) == generator.TIPOS_DADOS
+        assert list(fluxo['status'].cat.categories) == generator.STATUS
+        assert isinstance(fluxo['destino'].dtype, pd.CategoricalDtype)
+        assert isinstance(origem['latencia'].dtype, pd.CategoricalDtype)
+        assert origem['id_origem'].dtype == 'int32' and origem['volume'].dtype == 'int32'
+        assert fluxo['id_origem'].dtype == 'int32' and analises['id_fluxo'].dtype == 'int32'
+        assert pd.api.types.is_datetime64_dtype(analises['data_analise'])
+
+    def test_mesmos_valores_do_modo_padrao(self, db_config):
+        padrao = self.gerar(db_config, True)
+        compacto = self.gerar(db_config, True, esquema_compacto=True)
+        padrao.configurar_pool_textos(tamanho=50)
+        compacto.configurar_pool_textos(tamanho=50)
+        for generator in (padrao, compacto):
+            with patch.object(generator, 'get_ultimo_id', return_value=0):
+                generator.gerar_analises(200, vetorizado=True)
+
+        assert isinstance(compacto.df_analises['responsavel'].dtype, pd.CategoricalDtype)
+        for atributo in ('df_origem', 'df_fluxo', 'df_analises'):
+            pd.testing.assert_frame_equal(
+                getattr(padrao, atributo).astype(object), getattr(compacto, atributo).astype(object)
+            )
+
+    def test_valor_fora_do_vocabulario(self, db_config):
+        generator = DataGenerator(db_config, esquema_compacto=True)
+        with pytest.raises(ValueError):
+            generator._compactar(pd.DataFrame({'status': ['ativo', 'arquivado']}))
+
+    def test_relatorio_memoria(self, db_config):
+        generator = self.gerar(db_config, True, esquema_compacto=True)
+        relatorio = generator.relatorio_memoria()
+        assert relatorio['tabela'].tolist() == ['dados_origem', 'fluxo_dados', 'analises']
+        assert relatorio['linhas'].tolist() == [50, 100, 150]
+        fluxo = relatorio.set_index('tabela').loc['fluxo_dados']
+        assert fluxo['bytes'] == generator.df_fluxo.memory_usage(deep=True, index=False).sum()
+        assert fluxo['reducao'] > 2
+
+# Testes das métricas por etapa
+class TestMetricasEtapas:
+    def test_etapas_de_geracao_medidas(self, db_config):
+        memoria = SinkMemoria()
+        generator = DataGenerator(db_config, metricas=Metricas([memoria]))
+        with patch.object(generator, 'get_ultimo_id', return_value=0):
+            generator.gerar_dados_origem(5, vetorizado=True)
+            generator.gerar_fluxo_dados(8, vetorizado=True)
+        
+        assert memoria.histograma('generator_stage_seconds', stage='gerar_dados_origem', status='ok')['n'] == 1
+        assert memoria.contador('generator_rows_total', stage='gerar_dados_origem') == 5
+        assert memoria.contador('generator_rows_total', stage='gerar_fluxo_dados') == 8
+
 # Testes de gerenciamento de conexão
 class TestConnectionManagement:
     def test_close_conexao_ativa(self, data_generator):
@@ -0,0 +1,88 @@
+import pytest
+from unittest.mock import MagicMock
+from id_allocator import AlocadorIds
+
+
+class SequenceFalsa:
+    """Simula pg_get_serial_sequence, last_value/is_called, MAX(id) e setval"""
+
+    def __init__(self, last_value=1, is_called=False, max_id=0):
+        self.last_value = last_value
+        self.is_called = is_called
+        self.max_id = max_id
+        self.executados = []
+        self._resultado = None
+
+    def execute(self, sql, params=None):
+        self.executados.append(sql)
+        if 'pg_get_serial_sequence' in sql:
+            self._resultado = ('public.fluxo_dados_id_fluxo_seq',)
+        elif 'last_value' in sql:
+            self._resultado = (self.last_value, self.is_called)
+        elif 'MAX(' in sql:
+            self._resultado = (self.max_id,)
+        elif 'setval' in sql:
+            self.last_value, self.is_called = params[1], params[2] if len(params) > 2 else True
+            self._resultado = (self.last_value,)
+
+    def fetchone(self):
+        return self._resultado
+
+@pytest.fixture
+def sequence():
+    return SequenceFalsa()
+
+@pytest.fixture
+def alocador(sequence):
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = sequence
+    return AlocadorIds(conn)
+
+# Testes de reserva de blocos
+class TestReserva:
+    def test_primeira_reserva_em_sequence_nova(self, alocador, sequence):
+        assert alocador.reservar('fluxo_dados', 'id_fluxo', 100) == 1
+        assert sequence.last_value == 100
+        alocador.conn.commit.assert_called_once()
+
+    def test_blocos_consecutivos_nao_colidem(self, alocador):
+        primeiro = alocador.reservar('fluxo_dados', 'id_fluxo', 50)
+        segundo = alocador.reservar('fluxo_dados', 'id_fluxo', 30)
+        assert segundo == primeiro + 50
+
+    def test_pula_ids_gravados_explicitamente(self, alocador, sequence):
+        sequence.max_id = 500
+        assert alocador.reservar('fluxo_dados', 'id_fluxo', 10) == 501
+        assert sequence.last_value == 510
+
+    def test_usa_advisory_lock(self, alocador, sequence):
+        alocador.reservar('fluxo_dados', 'id_fluxo', 1)
+        assert any('pg_advisory_xact_lock' in sql for sql in sequence.executados)
+
+    def test_reserva_vazia_nao_avanca(self, alocador, sequence):
+        sequence.last_value, sequence.is_called = 7, True
+        assert alocador.reservar('fluxo_dados', 'id_fluxo', 0) == 8
+        assert sequence.last_value == 7
+
+    def test_quantidade_negativa(self, alocador):
+        with pytest.raises(ValueError):
+            alocador.reservar('fluxo_dados', 'id_fluxo', -1)
+
+    def test_rollback_em_erro(self, alocador, sequence):
+        sequence.execute = MagicMock(side_effect=Exception("Erro de teste"))
+        with pytest.raises(Exception):
+            alocador.reservar('fluxo_dados', 'id_fluxo', 1)
+        alocador.conn.rollback.assert_called_once()
+
+# Testes de ressincronização
+class TestSincronizacao:
+    def test_avanca_ate_max(self, alocador, sequence):
+        sequence.max_id = 42
+        assert alocador.sincronizar('fluxo_dados', 'id_fluxo') == 42
+        assert sequence.last_value == 42
+
+    def test_nunca_recua_a_sequence(self, alocador, sequence):
+        # Bloco reservado por outro processo e ainda não carregado
+        sequence.last_value, sequence.is_called, sequence.max_id = 900, True, 42
+        assert alocador.sincronizar('fluxo_dados', 'id_fluxo') == 900
+        assert sequence.last_value == 900
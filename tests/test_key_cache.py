@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+
+from key_cache import CacheChaves
+
+
+class TabelaFalsa:
+    """Simula mogrify e COPY ... TO STDOUT sobre as linhas (id, data) com id acima da marca"""
+
+    def __init__(self, linhas):
+        self.linhas = linhas
+        self.marcas = []
+
+    def mogrify(self, sql, params):
+        self.marcas.append(params[0])
+        return sql.replace('%s', str(params[0])).encode()
+
+    def copy_expert(self, sql, buffer):
+        for linha in self.linhas:
+            if linha[0] > self.marcas[-1]:
+                buffer.write(','.join(str(v) for v in linha) + '\n')
+
+@pytest.fixture
+def tabela():
+    return TabelaFalsa([(1, '2023-01-01 10:00:00'), (2, '2023-01-02 11:30:00'), (5, '2023-01-05 00:00:00')])
+
+@pytest.fixture
+def cache(tabela):
+    conn = MagicMock()
+    conn.cursor.return_value.__enter__.return_value = tabela
+    return CacheChaves(conn, 'fluxo_dados', 'id_fluxo', ('data_criacao',))
+
+# Testes da atualização por marca d'água
+class TestCacheChaves:
+    def test_carga_inicial(self, cache):
+        assert cache.atualizar() == 3
+        assert cache.ids.dtype == np.int32
+        assert cache.ids.tolist() == [1, 2, 5]
+        assert cache.datas['data_criacao'][1] == np.datetime64('2023-01-02T11:30:00')
+        assert cache.marca == 5
+
+    def test_atualizacao_le_so_o_delta(self, cache, tabela):
+        cache.atualizar()
+        assert cache.atualizar() == 0
+        tabela.linhas.append((6, '2023-02-01 00:00:00'))
+        assert cache.atualizar() == 1
+        assert tabela.marcas == [0, 5, 5]
+        assert cache.ids.tolist() == [1, 2, 5, 6]
+        assert len(cache.datas['data_criacao']) == len(cache) == 4
+
+    def test_recarregar(self, cache, tabela):
+        cache.atualizar()
+        tabela.linhas.pop(0)
+        assert cache.recarregar() == 2
+        assert cache.ids.tolist() == [2, 5]
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lineage import IndiceLinhagem
+from postgres_setup import PostgresConnector
+
+
+@pytest.fixture
+def indice():
+    indice = IndiceLinhagem()
+    indice.acrescentar(
+        [1, 2, 5],
+        pd.DataFrame({
+            'id_fluxo': [10, 11, 12, 13],
+            'id_origem': [1, 5, 1, 1],
+            'destino': ['Data Lake', 'CRM', 'CRM', 'Data Lake']
+        }),
+        pd.DataFrame({'id_analise': [100, 101, 102, 103], 'id_fluxo': [12, 10, 12, 11]})
+    )
+    return indice
+
+@pytest.fixture
+def connector():
+    connector = PostgresConnector(
+        dbname='smart_data_db',
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        host='localhost',
+        port='5432'
+    )
+    connector.create_database_tables()
+    return connector
+
+# Testes das consultas de linhagem sobre o índice em memória
+class TestIndiceLinhagem:
+    def test_jusante(self, indice):
+        assert indice.fluxos_da_origem(1).tolist() == [10, 12, 13]
+        assert indice.fluxos_da_origem(2).tolist() == []
+        assert indice.analises_do_fluxo(12).tolist() == [100, 102]
+        assert indice.analises_da_origem(1).tolist() == [101, 100, 102]
+        assert indice.analises_da_origem(5).tolist() == [103]
+        assert indice.analises_das_origens([5, 1]).tolist() == [103, 101, 100, 102]
+
+    def test_montante(self, indice):
+        assert indice.origem_do_fluxo(11) == 5
+        assert indice.origem_da_analise(100) == 1
+        assert indice.origens_do_destino('CRM').tolist() == [1, 5]
+        assert indice.origens_do_destino('Inexistente').tolist() == []
+        with pytest.raises(KeyError):
+            indice.fluxos_da_origem(3)
+
+    def test_fan_out(self, indice):
+        estatisticas = indice.fan_out()
+        assert estatisticas.loc['fluxos_por_origem', 'max'] == 3
+        assert estatisticas.loc['fluxos_por_origem', 'sem_filhos'] == 1
+        assert estatisticas.loc['analises_por_fluxo', 'count'] == 4
+        assert estatisticas.loc['analises_por_origem', 'mean'] == pytest.approx(4 / 3)
+
+    def test_acrescentar_incremental(self, indice):
+        indice.fan_out()
+        indice.acrescentar([6], pd.DataFrame({'id_fluxo': [14], 'id_origem': [6], 'destino': ['BI']}),
+                           pd.DataFrame({'id_analise': [104], 'id_fluxo': [10]}))
+        assert indice.marcas == {'analises': 104, 'fluxo_dados': 14, 'dados_origem': 6}
+        assert indice.analises_da_origem(1).tolist() == [101, 104, 100, 102]
+        assert indice.origens_do_destino('BI').tolist() == [6]
+        assert indice.ids_fluxo.dtype == np.int32
+
+    def test_carga_invalida_nao_altera_o_indice(self, indice):
+        with pytest.raises(KeyError):
+            indice.acrescentar([7], pd.DataFrame({'id_fluxo': [20], 'id_origem': [8], 'destino': ['BI']}))
+        with pytest.raises(ValueError):
+            indice.acrescentar([3])
+        assert indice.ids_origem.tolist() == [1, 2, 5]
+        assert indice.marcas['dados_origem'] == 5
+
+    def test_atualizacoes_concorrentes(self):
+        tabelas = {
+            'dados_origem': pd.DataFrame({'id_origem': [1, 2]}),
+            'fluxo_dados': pd.DataFrame({'id_fluxo': [10, 11], 'id_origem': [1, 2], 'destino': ['CRM', 'BI']}),
+            'analises': pd.DataFrame({'id_analise': [100], 'id_fluxo': [11]})
+        }
+
+        def ler_delta(cur, consulta, params):
+            # Alarga a janela entre ler a marca e acrescentar o delta
+            time.sleep(0.02)
+            tabela = consulta.split(' FROM ')[1].split()[0]
+            df = tabelas[tabela]
+            return df[df.iloc[:, 0] > params[0]].reset_index(drop=True)
+
+        indice = IndiceLinhagem(MagicMock())
+        erros = []
+
+        def atualizar():
+            try:
+                indice.ao_escrever({'analises'})
+            except Exception as e:
+                erros.append(e)
+
+        with patch('lineage.copy_to_dataframe', side_effect=ler_delta):
+            threads = [threading.Thread(target=atualizar) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert erros == []
+        assert indice.ids_fluxo.tolist() == [10, 11]
+        assert indice.analises_da_origem(2).tolist() == [100]
+
+# Testes contra o banco: o índice deve responder o mesmo que os JOINs
+class TestIndiceLinhagemBanco:
+    def test_igual_aos_joins(self, connector):
+        indice = IndiceLinhagem(connector)
+        indice.reconstruir()
+        origem = int(connector.execute_query(
+            "SELECT id_origem FROM fluxo_dados f JOIN analises a USING (id_fluxo) LIMIT 1"
+        )['id_origem'].iloc[0])
+        esperado = connector.execute_query(
+            "SELECT a.id_analise FROM analises a JOIN fluxo_dados f USING (id_fluxo) WHERE f.id_origem = %s",
+            (origem,)
+        )['id_analise']
+        assert sorted(indice.analises_da_origem(origem).tolist()) == sorted(esperado.tolist())
+
+        destino = connector.execute_query("SELECT destino FROM fluxo_dados LIMIT 1")['destino'].iloc[0]
+        esperado = connector.execute_query(
+            "SELECT DISTINCT id_origem FROM fluxo_dados WHERE destino = %s ORDER BY id_origem", (destino,)
+        )['id_origem']
+        assert indice.origens_do_destino(destino).tolist() == esperado.tolist()
+        assert indice.atualizar() == {}
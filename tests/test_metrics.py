@@ -0,0 +1,125 @@
+import json
+import logging
+from unittest.mock import MagicMock, patch
+
+import pandas as pd
+import pytest
+
+from metrics import Metricas, SinkJsonLog, SinkMemoria, SinkPrometheus, etapa_medida
+from postgres_setup import PostgresConnector
+from query_cache import QueryCache
+
+
+@pytest.fixture
+def memoria():
+    return SinkMemoria()
+
+@pytest.fixture
+def metricas(memoria):
+    return Metricas([memoria])
+
+# Testes do registro de métricas
+class TestMetricas:
+    def test_sem_sinks_nao_mede(self):
+        sink = MagicMock()
+        metricas = Metricas()
+        with metricas.temporizar('x'):
+            pass
+        metricas.sinks.append(sink)
+        with metricas.temporizar('x', etapa='a'):
+            pass
+        sink.observar.assert_called_once()
+        nome, valor, rotulos = sink.observar.call_args[0]
+        assert nome == 'x' and valor >= 0
+        assert rotulos == {'etapa': 'a', 'status': 'ok'}
+
+    def test_temporizar_registra_erro(self, metricas, memoria):
+        with pytest.raises(ValueError):
+            with metricas.temporizar('x'):
+                raise ValueError()
+        assert memoria.histograma('x', status='erro')['n'] == 1
+        assert memoria.histograma('x', status='ok') is None
+
+# Testes dos sinks
+class TestSinks:
+    def test_histograma_em_memoria(self, memoria):
+        for valor in [0.001] * 90 + [0.2] * 10:
+            memoria.observar('q', valor, {})
+        resumo = memoria.histograma('q')
+        assert resumo['n'] == 100
+        assert resumo['min'] == 0.001 and resumo['max'] == 0.2
+        assert resumo['p50'] <= 0.001
+        assert 0.1 <= resumo['p99'] <= 0.2
+        assert resumo['media'] == pytest.approx(0.0209)
+
+    def test_contadores_e_resumo(self, memoria):
+        memoria.contar('linhas', 10, {'tabela': 'analises'})
+        memoria.contar('linhas', 5, {'tabela': 'analises'})
+        memoria.observar('q', 0.01, {'tabela': 'analises'})
+        assert memoria.contador('linhas', tabela='analises') == 15
+        resumo = memoria.resumo()
+        assert set(resumo['tipo']) == {'histograma', 'contador'}
+        memoria.limpar()
+        assert memoria.resumo().empty
+
+    def test_prometheus(self):
+        sink = SinkPrometheus()
+        metricas = Metricas([sink])
+        with metricas.temporizar('postgres_query_seconds', operation='read'):
+            pass
+        metricas.contar('postgres_query_rows_total', 3, operation='read')
+        texto = sink.exportar().decode()
+        assert 'postgres_query_seconds_count{operation="read",status="ok"} 1.0' in texto
+        assert 'postgres_query_rows_total{operation="read"} 3.0' in texto
+
+    def test_json_log(self, caplog):
+        metricas = Metricas([SinkJsonLog()])
+        with caplog.at_level(logging.INFO, logger='metricas'):
+            metricas.contar('generator_rows_total', 7, stage='gerar_analises')
+        registro = json.loads(caplog.records[-1].getMessage())
+        assert registro['metrica'] == 'generator_rows_total'
+        assert registro['valor'] == 7
+        assert registro['rotulos'] == {'stage': 'gerar_analises'}
+
+# Testes da instrumentação
+class TestInstrumentacao:
+    def test_etapa_medida(self, metricas, memoria):
+        class Gerador:
+            def __init__(self):
+                self.metricas = metricas
+
+            @etapa_medida('gerar')
+            def gerar(self, n):
+                return pd.DataFrame({'a': range(n)})
+
+        Gerador().gerar(4)
+        assert memoria.histograma('generator_stage_seconds', stage='gerar', status='ok')['n'] == 1
+        assert memoria.contador('generator_rows_total', stage='gerar') == 4
+
+    @patch('psycopg2.connect')
+    def test_conector_instrumentado(self, mock_connect, metricas, memoria):
+        connector = PostgresConnector('db', 'user', 'senha', metrics=metricas, use_pool=True)
+        mock_connect.return_value.cursor.return_value.rowcount = 2
+        with patch('pandas.read_sql_query', return_value=pd.DataFrame({'a': [1, 2, 3]})):
+            connector.execute_query("SELECT * FROM analises")
+        connector.execute_query("UPDATE analises SET resultado = 'x'", return_data=False)
+        connector.close()
+
+        assert memoria.histograma('postgres_connect_seconds', status='ok')['n'] >= 1
+        assert memoria.histograma('postgres_pool_acquire_seconds', status='ok')['n'] == 2
+        assert memoria.histograma('postgres_query_seconds', operation='read', status='ok')['n'] == 1
+        assert memoria.contador('postgres_query_rows_total', operation='read') == 3
+        assert memoria.contador('postgres_query_rows_total', operation='write') == 2
+
+    @patch('psycopg2.connect')
+    def test_acerto_de_cache_instrumentado(self, mock_connect, metricas, memoria):
+        connector = PostgresConnector('db', 'user', 'senha', metrics=metricas, query_cache=QueryCache())
+        with patch('pandas.read_sql_query', return_value=pd.DataFrame({'a': [1, 2, 3]})) as read_sql:
+            connector.execute_query("SELECT * FROM analises")
+            connector.execute_query("SELECT * FROM analises")
+        assert read_sql.call_count == 1
+
+        assert memoria.histograma('postgres_query_seconds', operation='read', status='ok')['n'] == 1
+        assert memoria.histograma('postgres_query_seconds', operation='cache_hit', status='ok')['n'] == 1
+        assert memoria.contador('postgres_query_rows_total', operation='cache_hit') == 3
+        assert memoria.contador('postgres_query_cache_hits_total') == 1
@@ -6,7 +6,9 @@ import os
 from datetime import datetime
 import logging
 from dotenv import load_dotenv
-from postgres_setup import PostgresConnector  # Importação da classe principal
+from postgres_setup import PostgresConnector, _decoder_context, split_range  # Importação da classe principal
+from query_cache import QueryCache
+from statement_cache import StatementCache
 
 # Carrega as variáveis de ambiente
 load_dotenv()
@@ -220,5 +222,463 @@ class TestPostgresConnectorDataOperations(BaseTestPostgresConnector):
             with self.assertRaises(Error):
                 self.connector.get_table_info('test_table')
 
+class TestPostgresConnectorBatchInsert(BaseTestPostgresConnector):
+    """Test cases for insert_many"""
+    
+    def test_insert_many_pages_in_single_transaction(self):
+        """Test multi-row VALUES paging over one connection and one commit"""
+        rows = [{'col1': i, 'col2': str(i)} for i in range(5)]
+        
+        with patch('psycopg2.connect') as mock_connect, \
+             patch('postgres_setup.execute_values') as mock_execute_values:
+            total = self.connector.insert_many('test_table', rows, page_size=2)
+            
+            self.assertEqual(total, 5)
+            mock_connect.assert_called_once()
+            pages = [c[0][2] for c in mock_execute_values.call_args_list]
+            self.assertEqual([len(page) for page in pages], [2, 2, 1])
+            self.assertEqual(pages[0], [(0, '0'), (1, '1')])
+            query = mock_execute_values.call_args[0][1]
+            self.assertIn('INSERT INTO test_table (col1, col2) VALUES %s', query)
+            self.assertNotIn('RETURNING', query)
+    
+    def test_insert_many_from_iterator(self):
+        """Test that iterators are consumed page by page"""
+        rows = ({'col1': i} for i in range(3))
+        
+        with patch('psycopg2.connect'), \
+             patch('postgres_setup.execute_values') as mock_execute_values:
+            total = self.connector.insert_many('test_table', rows, page_size=2)
+            
+            self.assertEqual(total, 3)
+            self.assertEqual(mock_execute_values.call_count, 2)
+    
+    def test_insert_many_from_dataframe_with_nulls(self):
+        """Test DataFrame input converts NaN to None and keeps integers"""
+        df = pd.DataFrame({'col1': [1.0, None], 'col2': ['a', None]})
+        
+        with patch('psycopg2.connect'), \
+             patch('postgres_setup.execute_values') as mock_execute_values:
+            self.connector.insert_many('test_table', df)
+            
+            page = mock_execute_values.call_args[0][2]
+            self.assertEqual(page, [(1, 'a'), (None, None)])
+            self.assertIsInstance(page[0][0], int)
+    
+    def test_insert_many_returning(self):
+        """Test RETURNING rows come back as one DataFrame"""
+        with patch('psycopg2.connect') as mock_connect, \
+             patch('postgres_setup.execute_values') as mock_execute_values:
+            mock_execute_values.side_effect = [[(1, 'a')], [(2, 'b')]]
+            cursor = mock_connect.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+            cursor.description = [('id',), ('col2',)]
+            
+            result = self.connector.insert_many(
+                'test_table', [{'col2': 'a'}, {'col2': 'b'}], page_size=1, returning=True
+            )
+            
+            self.assertIn('RETURNING *', mock_execute_values.call_args[0][1])
+            self.assertTrue(mock_execute_values.call_args[1]['fetch'])
+            self.assertEqual(result.to_dict('list'), {'id': [1, 2], 'col2': ['a', 'b']})
+    
+    def test_insert_many_copy(self):
+        """Test COPY method streams CSV pages"""
+        with patch('psycopg2.connect') as mock_connect:
+            cursor = mock_connect.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+            buffers = []
+            cursor.copy_expert.side_effect = lambda sql, buf: buffers.append(buf.getvalue())
+            
+            total = self.connector.insert_many(
+                'test_table', [{'col1': 1, 'col2': None}, {'col1': 2, 'col2': 'b'}], method='copy'
+            )
+            
+            self.assertEqual(total, 2)
+            self.assertIn('COPY test_table (col1, col2) FROM STDIN', cursor.copy_expert.call_args[0][0])
+            self.assertEqual(buffers[0].splitlines(), ['1,\\N', '2,b'])
+    
+    def test_insert_many_invalid_options(self):
+        """Test option validation"""
+        with self.assertRaises(ValueError):
+            self.connector.insert_many('test_table', [{'col1': 1}], method='copy', returning=True)
+        with self.assertRaises(ValueError):
+            self.connector.insert_many('test_table', [{'col1': 1}], page_size=0)
+    
+    def test_insert_many_empty(self):
+        """Test empty input does not touch the database"""
+        with patch('psycopg2.connect') as mock_connect:
+            self.assertEqual(self.connector.insert_many('test_table', []), 0)
+            mock_connect.assert_not_called()
+    
+    def test_insert_many_error(self):
+        """Test batch insert error handling"""
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connect.side_effect = Error("Insert error")
+            with self.assertRaises(Error):
+                self.connector.insert_many('test_table', [{'col1': 1}])
+
+class TestPostgresConnectorStreaming(BaseTestPostgresConnector):
+    """Test cases for server-side cursor streaming"""
+    
+    def _mock_named_cursor(self, mock_connect, batches):
+        mock_cursor = MagicMock()
+        mock_cursor.fetchmany.side_effect = batches + [[]]
+        mock_cursor.description = [('id',), ('name',)]
+        conn = mock_connect.return_value.__enter__.return_value
+        conn.cursor.return_value.__enter__.return_value = mock_cursor
+        return conn, mock_cursor
+    
+    def test_stream_yields_dataframe_chunks(self):
+        """Test that results arrive lazily as DataFrame chunks"""
+        with patch('psycopg2.connect') as mock_connect:
+            conn, mock_cursor = self._mock_named_cursor(
+                mock_connect, [[(1, 'a'), (2, 'b')], [(3, 'c')]]
+            )
+            
+            chunks = list(self.connector.stream_query(
+                "SELECT * FROM analises WHERE id_fluxo = %s", params=(1,), itersize=2
+            ))
+            
+            self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+            self.assertEqual(list(chunks[0].columns), ['id', 'name'])
+            self.assertTrue(conn.cursor.call_args[1]['name'].startswith('stream_'))
+            self.assertEqual(mock_cursor.itersize, 2)
+            mock_cursor.fetchmany.assert_called_with(2)
+            mock_cursor.execute.assert_called_once_with(
+                "SELECT * FROM analises WHERE id_fluxo = %s", (1,)
+            )
+    
+    def test_stream_yields_row_batches(self):
+        """Test streaming raw row batches"""
+        with patch('psycopg2.connect') as mock_connect:
+            self._mock_named_cursor(mock_connect, [[(1, 'a')]])
+            
+            batches = list(self.connector.stream_query("SELECT 1", as_dataframe=False))
+            
+            self.assertEqual(batches, [[(1, 'a')]])
+    
+    def test_stream_is_lazy(self):
+        """Test that nothing is executed before the first chunk is requested"""
+        with patch('psycopg2.connect') as mock_connect:
+            self.connector.stream_query("SELECT 1")
+            mock_connect.assert_not_called()
+    
+    def test_stream_invalid_itersize(self):
+        """Test itersize validation"""
+        with self.assertRaises(ValueError):
+            next(self.connector.stream_query("SELECT 1", itersize=0))
+    
+    def test_stream_error(self):
+        """Test streaming error handling"""
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connect.side_effect = Error("Query error")
+            with self.assertRaises(Error):
+                next(self.connector.stream_query("SELECT 1"))
+
+class TestPostgresConnectorCache(BaseTestPostgresConnector):
+    """Test cases for the query result cache"""
+    
+    def setUp(self):
+        super().setUp()
+        self.cache = QueryCache()
+        self.connector = PostgresConnector(**self.test_credentials, query_cache=self.cache)
+    
+    def test_repeated_select_is_served_from_cache(self):
+        """Test that an unchanged query hits the database only once"""
+        with patch('psycopg2.connect'), patch('pandas.read_sql_query') as mock_read_sql:
+            mock_read_sql.return_value = self.sample_dataframe
+            
+            self.connector.execute_query("SELECT * FROM analises")
+            result = self.connector.execute_query("SELECT *\n FROM analises;")
+            
+            mock_read_sql.assert_called_once()
+            pd.testing.assert_frame_equal(result, self.sample_dataframe)
+            self.assertEqual(self.cache.stats['hits'], 1)
+    
+    def test_write_invalidates_affected_entries(self):
+        """Test that return_data=False writes invalidate cached reads of the table"""
+        with patch('psycopg2.connect'), patch('pandas.read_sql_query') as mock_read_sql:
+            mock_read_sql.return_value = self.sample_dataframe
+            
+            self.connector.execute_query("SELECT * FROM analises")
+            self.connector.execute_query("SELECT * FROM dados_origem")
+            self.connector.execute_query(
+                "DELETE FROM analises WHERE id_analise = %s", (1,), return_data=False
+            )
+            self.connector.execute_query("SELECT * FROM analises")
+            self.connector.execute_query("SELECT * FROM dados_origem")
+            
+            self.assertEqual(mock_read_sql.call_count, 3)
+    
+    def test_insert_data_bypasses_and_invalidates_cache(self):
+        """Test that insert_data (INSERT ... RETURNING) is never cached and invalidates"""
+        with patch('psycopg2.connect'), patch('pandas.read_sql_query') as mock_read_sql:
+            mock_read_sql.return_value = self.sample_dataframe
+            
+            self.connector.execute_query("SELECT * FROM dados_origem")
+            self.connector.insert_data('dados_origem', {'nome_origem': 'x'})
+            self.connector.insert_data('dados_origem', {'nome_origem': 'x'})
+            self.connector.execute_query("SELECT * FROM dados_origem")
+            
+            self.assertEqual(mock_read_sql.call_count, 4)
+            self.assertEqual(self.cache.stats['invalidations'], 1)
+    
+    def test_concurrent_write_skips_stale_put(self):
+        """Test that a read overlapping a committed write does not cache its pre-write result"""
+        def read_during_write(*args, **kwargs):
+            # Escrita concorrente confirmada enquanto a leitura executa
+            self.connector.notify_write({'dados_origem'})
+            return self.sample_dataframe
+
+        with patch('psycopg2.connect'), \
+             patch('pandas.read_sql_query', side_effect=read_during_write) as mock_read_sql:
+            self.connector.execute_query("SELECT * FROM dados_origem")
+            self.connector.execute_query("SELECT * FROM dados_origem")
+        self.assertEqual(mock_read_sql.call_count, 2)
+        self.assertEqual(self.cache.stats['stale_puts'], 2)
+    
+    def test_write_listener(self):
+        """Test custom write listeners receive the written tables"""
+        listener = MagicMock()
+        self.connector.add_write_listener(listener)
+        with patch('psycopg2.connect'):
+            self.connector.execute_query(
+                "UPDATE fluxo_dados SET status = 'ativo'", return_data=False
+            )
+        listener.assert_called_once_with({'fluxo_dados'})
+    
+    def test_failing_listener_does_not_fail_write(self):
+        """Test that a listener error neither escapes the committed write nor skips other listeners"""
+        failing = MagicMock(side_effect=ValueError("listener"))
+        listener = MagicMock()
+        self.connector.add_write_listener(failing)
+        self.connector.add_write_listener(listener)
+        with patch('psycopg2.connect'), self.assertLogs(level='ERROR'):
+            self.connector.execute_query(
+                "UPDATE fluxo_dados SET status = 'ativo'", return_data=False
+            )
+        listener.assert_called_once_with({'fluxo_dados'})
+
+class TestPostgresConnectorStatementCache(BaseTestPostgresConnector):
+    """Test cases for prepared statements on pooled connections"""
+    
+    def test_hot_insert_uses_execute(self):
+        """Test that repeated inserts switch to EXECUTE on a pooled connection"""
+        with patch('psycopg2.connect') as mock_connect, \
+             patch('pandas.read_sql_query') as mock_read_sql:
+            mock_connect.return_value.closed = 0
+            mock_connect.return_value.get_transaction_status.return_value = 0
+            connector = PostgresConnector(
+                **self.test_credentials,
+                use_pool=True,
+                pool_min_size=0,
+                statement_cache=StatementCache(prepare_threshold=2)
+            )
+            
+            for _ in range(3):
+                connector.insert_data('test_table', {'col1': 1, 'col2': 'test'})
+            
+            queries = [c[0][0] for c in mock_read_sql.call_args_list]
+            self.assertIn('INSERT INTO test_table', queries[0])
+            self.assertTrue(queries[1].startswith('EXECUTE stmt_'))
+            self.assertTrue(queries[2].startswith('EXECUTE stmt_'))
+            self.assertEqual(mock_read_sql.call_args[1]['params'], (1, 'test'))
+            connector.close()
+    
+    def test_unpooled_connector_never_prepares(self):
+        """Test that short-lived connections keep running plain SQL"""
+        statements = StatementCache(prepare_threshold=1)
+        connector = PostgresConnector(**self.test_credentials, statement_cache=statements)
+        with patch('psycopg2.connect'), patch('pandas.read_sql_query') as mock_read_sql:
+            for _ in range(2):
+                connector.execute_query("SELECT * FROM test WHERE col1 = %s", (1,))
+            
+            for call in mock_read_sql.call_args_list:
+                self.assertEqual(call[0][0], "SELECT * FROM test WHERE col1 = %s")
+            self.assertEqual(statements.stats["SELECT * FROM test WHERE col1 = %s"]['executions'], 2)
+    
+    def test_prepared_query_without_params_keeps_percent(self):
+        """Test that a parameterless query with %% returns the same rows once it runs as EXECUTE"""
+        statements = StatementCache(prepare_threshold=2)
+        connector = PostgresConnector(**self.test_credentials, use_pool=True, statement_cache=statements)
+        query = "SELECT '50%%' AS texto"
+        try:
+            resultados = [connector.execute_query(query) for _ in range(3)]
+            self.assertTrue(statements.stats[query]['prepared'])
+            for resultado in resultados:
+                self.assertEqual(resultado['texto'].tolist(), ['50%%'])
+        finally:
+            connector.close()
+
+    def test_prepared_query_keeps_result_types(self):
+        """Test that preparing a query does not change the dtypes of its result"""
+        statements = StatementCache(prepare_threshold=2)
+        connector = PostgresConnector(**self.test_credentials, use_pool=True, statement_cache=statements)
+        query = "SELECT %s AS x, %s + 1 AS y"
+        try:
+            resultados = [connector.execute_query(query, (5, 5)) for _ in range(4)]
+            for resultado in resultados:
+                self.assertEqual(resultado.dtypes.to_dict(), resultados[0].dtypes.to_dict())
+                self.assertEqual(resultado.iloc[0].tolist(), [5, 6])
+        finally:
+            connector.close()
+
+    def test_prepared_query_with_typed_params(self):
+        """Test that parameters with a server-side type keep running as EXECUTE"""
+        statements = StatementCache(prepare_threshold=2)
+        connector = PostgresConnector(**self.test_credentials, use_pool=True, statement_cache=statements)
+        query = "SELECT %s + 1 AS y"
+        try:
+            resultados = [connector.execute_query(query, (5,)) for _ in range(3)]
+            self.assertTrue(statements.stats[query]['prepared'])
+            for resultado in resultados:
+                self.assertEqual(resultado.dtypes.to_dict(), resultados[0].dtypes.to_dict())
+                self.assertEqual(resultado['y'].tolist(), [6])
+        finally:
+            connector.close()
+
+class TestPostgresConnectorPool(BaseTestPostgresConnector):
+    """Test cases for pooled connection mode"""
+    
+    def test_pool_disabled_by_default(self):
+        """Test that the connector opens plain connections by default"""
+        self.assertIsNone(self.connector.pool)
+    
+    def test_pooled_queries_reuse_connection(self):
+        """Test that pooled queries share a single physical connection"""
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connect.return_value.closed = 0
+            mock_connect.return_value.get_transaction_status.return_value = 0
+            connector = PostgresConnector(
+                **self.test_credentials, use_pool=True, pool_min_size=0
+            )
+            
+            for _ in range(3):
+                connector.execute_query(
+                    "INSERT INTO test (col1) VALUES (%s)",
+                    params=(1,),
+                    return_data=False
+                )
+            
+            mock_connect.assert_called_once_with(**self.test_credentials)
+            self.assertEqual(
+                mock_connect.return_value.cursor.return_value.execute.call_count, 3
+            )
+            connector.close()
+            mock_connect.return_value.close.assert_called_once()
+            self.assertIsNone(connector.pool)
+    
+    def test_pooled_connection_released_on_error(self):
+        """Test that a failing query gives its connection back to the pool"""
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connect.return_value.closed = 0
+            mock_connect.return_value.get_transaction_status.return_value = 0
+            mock_connect.return_value.cursor.return_value.execute.side_effect = Error("Query error")
+            connector = PostgresConnector(
+                **self.test_credentials, use_pool=True, pool_min_size=0, pool_max_size=1
+            )
+            
+            with self.assertRaises(Error):
+                connector.execute_query("DELETE FROM test", return_data=False)
+            
+            self.assertEqual(connector.pool.size, 1)
+            self.assertIs(connector.pool.getconn(), mock_connect.return_value)
+
+class TestPostgresConnectorCopyFormat(BaseTestPostgresConnector):
+    """Test cases for reading query results through COPY TO STDOUT"""
+    
+    def test_copy_formats_match_read_sql(self):
+        """Test that binary and CSV COPY return the same rows as read_sql_query"""
+        query = "SELECT * FROM fluxo_dados WHERE id_fluxo <= %s ORDER BY id_fluxo"
+        esperado = self.connector.execute_query(query, (2000,))
+        for copy_format in ('auto', 'binary', 'csv'):
+            extraido = self.connector.execute_query(query, (2000,), copy_format=copy_format)
+            self.assertEqual(list(extraido.columns), list(esperado.columns))
+            self.assertEqual(extraido['data_criacao'].dtype.kind, 'M')
+            pd.testing.assert_frame_equal(extraido.astype(object), esperado.astype(object))
+    
+    def test_copy_format_with_nulls_and_text(self):
+        """Test that the binary decoder falls back to the row path for NULLs and text"""
+        query = """
+            SELECT id_fluxo, NULLIF(id_origem % 2, 0) AS impar, status, data_atualizacao
+            FROM fluxo_dados WHERE id_fluxo <= 50 ORDER BY id_fluxo
+        """
+        esperado = self.connector.execute_query(query)
+        for copy_format in ('binary', 'csv'):
+            extraido = self.connector.execute_query(query, copy_format=copy_format)
+            self.assertEqual(extraido['impar'].isna().tolist(), esperado['impar'].isna().tolist())
+            self.assertEqual(extraido['status'].tolist(), esperado['status'].tolist())
+            self.assertEqual(extraido['data_atualizacao'].tolist(), esperado['data_atualizacao'].tolist())
+
+class TestPostgresConnectorParallelExtract(BaseTestPostgresConnector):
+    """Test cases for the partitioned parallel extract"""
+    
+    def test_split_integer_range(self):
+        """Test that key ranges cover [low, high] without gaps or empty ranges"""
+        self.assertEqual(split_range(1, 10, 3), [(1, 4, False), (4, 7, False), (7, 11, False)])
+        self.assertEqual(split_range(5, 6, 4), [(5, 6, False), (6, 7, False)])
+        with self.assertRaises(ValueError):
+            split_range(1, 10, 0)
+    
+    def test_split_time_range(self):
+        """Test that the last time range includes the upper bound"""
+        faixas = split_range(datetime(2023, 1, 1), datetime(2023, 1, 5), 2)
+        self.assertEqual(faixas, [
+            (datetime(2023, 1, 1), datetime(2023, 1, 3), False),
+            (datetime(2023, 1, 3), datetime(2023, 1, 5), True)
+        ])
+        self.assertEqual(split_range(datetime(2023, 1, 1), datetime(2023, 1, 1), 3), [
+            (datetime(2023, 1, 1), datetime(2023, 1, 1), True)
+        ])
+    
+    def test_extract_matches_single_query(self):
+        """Test that a parallel extract returns the same rows as execute_query"""
+        connector = PostgresConnector(**self.test_credentials, use_pool=True, pool_max_size=3)
+        try:
+            esperado = connector.execute_query("SELECT * FROM fluxo_dados WHERE id_fluxo <= 3000")
+            for options in (
+                {}, {'partition_column': 'data_criacao'}, {'decode_processes': True},
+                {'columns': ['id_fluxo', 'id_origem', 'data_criacao', 'data_atualizacao']}
+            ):
+                extraido = connector.parallel_extract(
+                    'fluxo_dados', where='id_fluxo <= %s', params=(3000,), partitions=5, workers=4, **options
+                )
+                colunas = options.get('columns', list(esperado.columns))
+                self.assertEqual(list(extraido.columns), colunas)
+                self.assertEqual(extraido['data_criacao'].dtype.kind, 'M')
+                pd.testing.assert_frame_equal(
+                    extraido.sort_values('id_fluxo').reset_index(drop=True).astype(object),
+                    esperado[colunas].sort_values('id_fluxo').reset_index(drop=True).astype(object)
+                )
+        finally:
+            connector.close()
+    
+    def test_extract_with_braced_filter(self):
+        """Test that array literals with braces in the filter reach the server unchanged"""
+        filtro = "status = ANY('{ativo,inativo}') AND id_fluxo <= 3000"
+        esperado = self.connector.execute_query(f"SELECT id_fluxo FROM fluxo_dados WHERE {filtro}")
+        extraido = self.connector.parallel_extract(
+            'fluxo_dados', columns=['id_fluxo'], where=filtro, partitions=3, workers=2
+        )
+        self.assertEqual(sorted(extraido['id_fluxo'].tolist()), sorted(esperado['id_fluxo'].tolist()))
+    
+    def test_decoder_processes_are_not_forked(self):
+        """Test that decoder processes never fork the threaded parent process"""
+        self.assertIn(_decoder_context().get_start_method(), ('forkserver', 'spawn'))
+    
+    def test_extract_empty_result(self):
+        """Test that an empty extract keeps the typed columns"""
+        extraido = self.connector.parallel_extract('analises', columns=['id_analise', 'data_analise'], where='FALSE')
+        self.assertTrue(extraido.empty)
+        self.assertEqual(list(extraido.columns), ['id_analise', 'data_analise'])
+        self.assertEqual(extraido['data_analise'].dtype.kind, 'M')
+    
+    def test_extract_requires_primary_key_or_column(self):
+        """Test that tables without a primary key need an explicit partition column"""
+        with patch('psycopg2.connect') as mock_connect:
+            mock_connect.return_value.cursor.return_value.__enter__.return_value.fetchone.side_effect = [('snap',), None]
+            with self.assertRaises(ValueError):
+                self.connector.parallel_extract('sem_pk')
+            mock_connect.return_value.close.assert_called_once()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,157 @@
+import pytest
+import time
+import pandas as pd
+from query_cache import ALL_TABLES, QueryCache, normalize_query, referenced_tables, is_read_only
+
+
+QUERY_ANALISTAS = """
+SELECT a.responsavel, COUNT(*) as total_analises
+FROM analises a
+JOIN fluxo_dados f ON a.id_fluxo = f.id_fluxo
+JOIN dados_origem d ON f.id_origem = d.id_origem
+GROUP BY a.responsavel;
+"""
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({'a': [1, 2]})
+
+# Testes das funções de análise de SQL
+class TestQueryParsing:
+    def test_normalize_query(self):
+        assert normalize_query("  SELECT *\n   FROM  analises ;") == "SELECT * FROM analises"
+        assert normalize_query("SELECT 1 -- comentário\n") == "SELECT 1"
+        assert normalize_query("SELECT 'a   b'") == "SELECT 'a   b'"
+
+    def test_referenced_tables(self):
+        assert referenced_tables(QUERY_ANALISTAS) == {'analises', 'fluxo_dados', 'dados_origem'}
+        assert referenced_tables("INSERT INTO public.analises (id) VALUES (1)") == {'analises'}
+        assert referenced_tables("SELECT 'from texto' FROM dados_origem") == {'dados_origem'}
+        assert referenced_tables("CREATE TABLE IF NOT EXISTS fluxo_dados (id INT)") == {'fluxo_dados'}
+
+    def test_referenced_tables_join_por_virgula(self):
+        assert referenced_tables(
+            "SELECT * FROM analises a, fluxo_dados f WHERE a.id_fluxo = f.id_fluxo"
+        ) == {'analises', 'fluxo_dados'}
+        assert referenced_tables(
+            "SELECT * FROM analises a JOIN fluxo_dados f ON a.id_fluxo = f.id_fluxo, dados_origem d"
+        ) == {'analises', 'fluxo_dados', 'dados_origem'}
+        assert referenced_tables(
+            "SELECT * FROM (SELECT id_fluxo FROM analises) s, fluxo_dados f WHERE s.id_fluxo = f.id_fluxo"
+        ) == {'analises', 'fluxo_dados'}
+        assert referenced_tables("DELETE FROM analises USING fluxo_dados f, dados_origem d") == {
+            'analises', 'fluxo_dados', 'dados_origem'
+        }
+
+    def test_referenced_tables_truncate(self):
+        assert referenced_tables("TRUNCATE resumo_volume_tipo, resumo_analista;") == {
+            'resumo_volume_tipo', 'resumo_analista'
+        }
+        assert referenced_tables("TRUNCATE TABLE ONLY public.analises CASCADE") == {'analises'}
+
+    def test_referenced_tables_sem_falsos_positivos(self):
+        assert referenced_tables(
+            "SELECT EXTRACT(MONTH FROM data_criacao), SUBSTRING(destino FROM 2) FROM fluxo_dados"
+        ) == {'fluxo_dados'}
+        assert referenced_tables("SELECT * FROM analises WHERE hipoteses IS DISTINCT FROM resultado") == {'analises'}
+        assert referenced_tables("UPDATE fluxo_dados SET status = 'x', destino = 'y'") == {'fluxo_dados'}
+        assert referenced_tables("SELECT * FROM analises FOR UPDATE") == {'analises'}
+
+    def test_referenced_tables_incerto(self):
+        assert ALL_TABLES in referenced_tables("SELECT * FROM generate_series(1, 10) g")
+        assert ALL_TABLES in referenced_tables("SELECT * FROM analises a, minha_funcao(a.id_fluxo) f")
+
+    def test_is_read_only(self):
+        assert is_read_only(QUERY_ANALISTAS)
+        assert is_read_only("WITH x AS (SELECT 1) SELECT * FROM x")
+        assert is_read_only("SELECT * FROM fluxo_dados WHERE status = 'delete'")
+        assert not is_read_only("INSERT INTO analises (id) VALUES (1) RETURNING *")
+        assert not is_read_only("WITH novo AS (DELETE FROM analises RETURNING *) SELECT * FROM novo")
+
+# Testes do cache
+class TestQueryCache:
+    def test_hit_e_miss(self, df):
+        cache = QueryCache()
+        assert cache.get("SELECT * FROM analises") is None
+        cache.put("SELECT * FROM analises", None, df)
+        pd.testing.assert_frame_equal(cache.get("SELECT *  FROM analises;"), df)
+        assert cache.stats['hits'] == 1
+        assert cache.stats['misses'] == 1
+        assert cache.stats['hit_rate'] == 0.5
+
+    def test_params_fazem_parte_da_chave(self, df):
+        cache = QueryCache()
+        cache.put("SELECT * FROM analises WHERE id_fluxo = %s", (1,), df)
+        assert cache.get("SELECT * FROM analises WHERE id_fluxo = %s", (2,)) is None
+
+    def test_resultado_isolado_do_chamador(self, df):
+        cache = QueryCache()
+        cache.put("SELECT 1", None, df)
+        resultado = cache.get("SELECT 1")
+        resultado['a'] = 0
+        assert cache.get("SELECT 1")['a'].tolist() == [1, 2]
+
+    def test_lru(self, df):
+        cache = QueryCache(max_entries=2)
+        cache.put("SELECT 1", None, df)
+        cache.put("SELECT 2", None, df)
+        cache.get("SELECT 1")
+        cache.put("SELECT 3", None, df)
+        assert cache.get("SELECT 2") is None
+        assert cache.get("SELECT 1") is not None
+        assert cache.stats['evictions'] == 1
+
+    def test_ttl(self, df):
+        cache = QueryCache(ttl=0.01)
+        cache.put("SELECT 1", None, df)
+        time.sleep(0.02)
+        assert cache.get("SELECT 1") is None
+        assert cache.stats['expirations'] == 1
+
+    def test_invalidacao_por_tabela(self, df):
+        cache = QueryCache()
+        cache.put(QUERY_ANALISTAS, None, df)
+        cache.put("SELECT * FROM dados_origem", None, df)
+        cache.put("SELECT 1", None, df)
+        assert cache.invalidate_tables({'fluxo_dados'}) == 1
+        assert cache.get(QUERY_ANALISTAS) is None
+        assert cache.get("SELECT * FROM dados_origem") is not None
+        assert cache.stats['size'] == 2
+
+    def test_invalidacao_com_tabelas_incertas(self, df):
+        cache = QueryCache()
+        cache.put("SELECT * FROM dados_origem", None, df)
+        cache.put("SELECT * FROM generate_series(1, 3)", None, df)
+        # Entradas com tabelas desconhecidas caem em qualquer escrita
+        assert cache.invalidate_tables({'analises'}) == 1
+        assert cache.get("SELECT * FROM dados_origem") is not None
+        # Escritas com tabelas desconhecidas invalidam tudo
+        assert cache.invalidate_tables({ALL_TABLES}) == 1
+        assert cache.stats['size'] == 0
+
+    def test_put_descartado_apos_invalidacao_concorrente(self, df):
+        cache = QueryCache()
+        geracao = cache.generation(QUERY_ANALISTAS)
+        # Escrita confirmada enquanto a leitura estava em curso
+        cache.invalidate_tables({'fluxo_dados'})
+        cache.put(QUERY_ANALISTAS, None, df, generation=geracao)
+        assert cache.get(QUERY_ANALISTAS) is None
+        assert cache.stats['stale_puts'] == 1
+
+        # Escritas em outras tabelas não descartam o resultado
+        geracao = cache.generation(QUERY_ANALISTAS)
+        cache.invalidate_tables({'dados_origem_x'})
+        cache.put(QUERY_ANALISTAS, None, df, generation=geracao)
+        assert cache.get(QUERY_ANALISTAS) is not None
+
+    def test_put_com_tabelas_incertas_descartado_em_qualquer_escrita(self, df):
+        cache = QueryCache()
+        geracao = cache.generation("SELECT * FROM dados_origem")
+        cache.invalidate_tables({ALL_TABLES})
+        cache.put("SELECT * FROM dados_origem", None, df, generation=geracao)
+        assert cache.get("SELECT * FROM dados_origem") is None
+
+        geracao = cache.generation("SELECT * FROM generate_series(1, 3)")
+        cache.invalidate_tables({'analises'})
+        cache.put("SELECT * FROM generate_series(1, 3)", None, df, generation=geracao)
+        assert cache.get("SELECT * FROM generate_series(1, 3)") is None
@@ -0,0 +1,112 @@
+import os
+from datetime import date, datetime
+
+import psycopg2
+import pytest
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+from postgres_setup import PostgresConnector, PERFORMANCE_INDEXES_SQL
+from schema_advisor import (
+    adicionar_particoes, comparar_planos, criar_tabelas_particionadas,
+    explicar, remover_indices, tipo_tabela
+)
+
+
+BANCO_PARTICIONADO = 'smart_data_particionado_test'
+
+def credenciais(dbname='smart_data_db'):
+    return {
+        'dbname': dbname,
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'host': 'localhost',
+        'port': '5432'
+    }
+
+def administrar(sql):
+    conn = psycopg2.connect(**credenciais('postgres'))
+    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(sql)
+    finally:
+        conn.close()
+
+@pytest.fixture
+def connector():
+    connector = PostgresConnector(**credenciais())
+    connector.create_database_tables()
+    return connector
+
+@pytest.fixture
+def banco_vazio():
+    administrar(f"DROP DATABASE IF EXISTS {BANCO_PARTICIONADO}")
+    administrar(f"CREATE DATABASE {BANCO_PARTICIONADO}")
+    connector = PostgresConnector(**credenciais(BANCO_PARTICIONADO), use_pool=True)
+    yield connector
+    connector.close()
+    administrar(f"DROP DATABASE IF EXISTS {BANCO_PARTICIONADO}")
+
+def indices_existentes(connector):
+    return set(connector.execute_query(
+        "SELECT indexname FROM pg_indexes WHERE schemaname = 'public'"
+    )['indexname'])
+
+# Testes dos índices de desempenho
+class TestIndices:
+    def test_performance_schema_cria_indices(self, connector):
+        remover_indices(connector)
+        assert not set(PERFORMANCE_INDEXES_SQL) & indices_existentes(connector)
+        connector.create_database_tables(performance_schema=True)
+        assert set(PERFORMANCE_INDEXES_SQL) <= indices_existentes(connector)
+
+    def test_explicar(self, connector):
+        resultado = explicar(connector, "SELECT * FROM analises WHERE id_fluxo = %s", (1,))
+        assert resultado['tempo_execucao_ms'] >= 0
+        assert resultado['nos']
+        assert 'Plan' in resultado['plano']
+
+    def test_comparar_planos_antes_e_depois(self, connector):
+        remover_indices(connector)
+        comparacao = comparar_planos(connector, repeticoes=1)
+
+        assert list(comparacao['consulta']) == ['volume_por_tipo', 'fluxos_mensais', 'desempenho_analistas']
+        assert (comparacao[['antes_ms', 'depois_ms', 'speedup']] > 0).all().all()
+        assert set(PERFORMANCE_INDEXES_SQL) <= indices_existentes(connector)
+
+    def test_comparar_planos_repeticoes_invalidas(self, connector):
+        with pytest.raises(ValueError):
+            comparar_planos(connector, repeticoes=0)
+
+# Testes do particionamento
+class TestParticionamento:
+    def test_criar_tabelas_particionadas(self, banco_vazio):
+        particoes = criar_tabelas_particionadas(banco_vazio, date(2024, 1, 1), date(2024, 7, 1), meses_por_particao=2)
+
+        assert particoes['fluxo_dados'] == ['fluxo_dados_p2024_01', 'fluxo_dados_p2024_03', 'fluxo_dados_p2024_05']
+        assert tipo_tabela(banco_vazio, 'fluxo_dados') == 'p'
+        assert tipo_tabela(banco_vazio, 'analises') == 'p'
+        assert tipo_tabela(banco_vazio, 'dados_origem') == 'r'
+        assert set(PERFORMANCE_INDEXES_SQL) <= indices_existentes(banco_vazio)
+
+        origem = banco_vazio.insert_data('dados_origem', {'nome_origem': 'A', 'tipo_dado': 'log'})
+        for data_criacao in (datetime(2024, 3, 15), datetime(2030, 1, 1)):
+            banco_vazio.insert_data('fluxo_dados', {
+                'id_origem': int(origem['id_origem'].iloc[0]), 'destino': 'DW', 'data_criacao': data_criacao
+            })
+        distribuicao = banco_vazio.execute_query(
+            "SELECT tableoid::regclass::text AS particao FROM fluxo_dados ORDER BY data_criacao"
+        )
+        assert list(distribuicao['particao']) == ['fluxo_dados_p2024_03', 'fluxo_dados_default']
+
+        # A FK de fluxo_dados para dados_origem é mantida
+        with pytest.raises(psycopg2.Error):
+            banco_vazio.insert_data('fluxo_dados', {'id_origem': 999, 'destino': 'DW'})
+
+    def test_recusa_tabela_sem_particionamento(self, connector):
+        with pytest.raises(ValueError):
+            criar_tabelas_particionadas(connector, date(2024, 1, 1), date(2024, 2, 1))
+
+    def test_tabela_sem_particionamento_definido(self, connector):
+        with pytest.raises(ValueError):
+            adicionar_particoes(connector, 'dados_origem', date(2024, 1, 1), date(2024, 2, 1))
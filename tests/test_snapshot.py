@@ -0,0 +1,88 @@
+import os
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from snapshot import carregar_snapshot, categorizar, iterar_lotes, mapear_snapshot, salvar_snapshot
+
+
+@pytest.fixture
+def dataframes():
+    n = 1000
+    return {
+        'dados_origem': pd.DataFrame({
+            'id_origem': range(1, n + 1),
+            'nome_origem': [f'Empresa {i}' for i in range(n)],
+            'tipo_dado': ['log', 'sensor', 'mídia', 'documento'] * (n // 4),
+            'volume': range(n),
+            'latencia': ['batch', 'real-time'] * (n // 2),
+            'descricao': [f'Descrição {i}' for i in range(n)]
+        }),
+        'fluxo_dados': pd.DataFrame({
+            'id_fluxo': range(1, n + 1),
+            'status': ['ativo'] * n,
+            'data_criacao': pd.date_range(datetime(2023, 1, 1), periods=n, freq='h')
+        })
+    }
+
+# Testes de gravação e leitura
+class TestSnapshot:
+    def test_categorizar_colunas_repetidas(self, dataframes):
+        df = categorizar(dataframes['dados_origem'])
+        assert isinstance(df['tipo_dado'].dtype, pd.CategoricalDtype)
+        assert isinstance(df['latencia'].dtype, pd.CategoricalDtype)
+        # Colunas de valores únicos ficam como texto
+        assert not isinstance(df['nome_origem'].dtype, pd.CategoricalDtype)
+        assert df['volume'].dtype == dataframes['dados_origem']['volume'].dtype
+
+    def test_ida_e_volta(self, dataframes, tmp_path):
+        arquivos = salvar_snapshot(dataframes, str(tmp_path))
+        assert set(arquivos) == {'dados_origem', 'fluxo_dados'}
+        assert not any(nome.endswith('.tmp') for nome in os.listdir(tmp_path))
+
+        carregados = carregar_snapshot(str(tmp_path), ['dados_origem', 'fluxo_dados'])
+        origem = carregados['dados_origem']
+        assert isinstance(origem['tipo_dado'].dtype, pd.CategoricalDtype)
+        pd.testing.assert_frame_equal(
+            origem.astype({'tipo_dado': object, 'latencia': object}),
+            dataframes['dados_origem'].astype({'tipo_dado': object, 'latencia': object}),
+            check_dtype=False
+        )
+        assert carregados['fluxo_dados']['data_criacao'].tolist() == dataframes['fluxo_dados']['data_criacao'].tolist()
+
+    def test_carregar_colunas_selecionadas(self, dataframes, tmp_path):
+        salvar_snapshot(dataframes, str(tmp_path))
+        carregados = carregar_snapshot(str(tmp_path), ['fluxo_dados'], colunas={'fluxo_dados': ['id_fluxo']})
+        assert list(carregados['fluxo_dados'].columns) == ['id_fluxo']
+
+    def test_mapear_sem_copia(self, dataframes, tmp_path):
+        salvar_snapshot(dataframes, str(tmp_path))
+        assert os.path.exists(tmp_path / 'fluxo_dados.arrow')
+        antes = pa.total_allocated_bytes()
+        mapeadas = mapear_snapshot(str(tmp_path), ['fluxo_dados'], colunas={'fluxo_dados': ['id_fluxo']})
+        # Os buffers apontam para o arquivo mapeado: nada alocado pelo Arrow
+        assert pa.total_allocated_bytes() == antes
+        assert mapeadas['fluxo_dados'].column('id_fluxo').to_pylist() == list(range(1, 1001))
+
+        ids = carregar_snapshot(str(tmp_path), ['fluxo_dados'])['fluxo_dados']['id_fluxo'].to_numpy()
+        assert not ids.flags.writeable
+
+    def test_carregar_sem_copia_mapeavel_le_parquet(self, dataframes, tmp_path):
+        salvar_snapshot(dataframes, str(tmp_path), copia_mapeavel=False)
+        assert not os.path.exists(tmp_path / 'fluxo_dados.arrow')
+        carregados = carregar_snapshot(str(tmp_path), ['fluxo_dados'])
+        assert carregados['fluxo_dados']['id_fluxo'].tolist() == list(range(1, 1001))
+        with pytest.raises(FileNotFoundError):
+            mapear_snapshot(str(tmp_path), ['fluxo_dados'])
+
+    def test_tabela_ausente(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            carregar_snapshot(str(tmp_path), ['analises'])
+
+    def test_iterar_lotes(self, dataframes, tmp_path):
+        salvar_snapshot(dataframes, str(tmp_path), tamanho_grupo=300)
+        lotes = list(iterar_lotes(str(tmp_path), 'dados_origem', tamanho_lote=250))
+        assert max(len(lote) for lote in lotes) <= 250
+        assert pd.concat(lotes)['id_origem'].tolist() == list(range(1, 1001))
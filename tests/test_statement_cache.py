@@ -0,0 +1,138 @@
+import pytest
+from unittest.mock import MagicMock
+from psycopg2 import Error
+from statement_cache import StatementCache, insert_sql, parameter_types_match, to_server_placeholders
+
+
+QUERY = "SELECT * FROM fluxo_dados WHERE status = %s AND id_fluxo > %s"
+
+def nova_conexao():
+    conn = MagicMock()
+    cursor = conn.cursor.return_value.__enter__.return_value
+    return conn, cursor
+
+def executados(cursor):
+    return [c[0][0] for c in cursor.execute.call_args_list]
+
+# Testes da geração de SQL
+class TestSqlGeneration:
+    def test_insert_sql_memoizado(self):
+        sql = insert_sql('analises', ('id_fluxo', 'responsavel'))
+        assert 'INSERT INTO analises (id_fluxo, responsavel)' in sql
+        assert 'VALUES (%s, %s)' in sql
+        assert 'RETURNING *' in sql
+        assert insert_sql('analises', ('id_fluxo', 'responsavel')) is sql
+
+    def test_insert_sql_sem_returning(self):
+        assert 'RETURNING' not in insert_sql('analises', ('id_fluxo',), returning=False)
+
+    def test_to_server_placeholders(self):
+        assert to_server_placeholders(QUERY + ";") == (
+            "SELECT * FROM fluxo_dados WHERE status = $1 AND id_fluxo > $2", 2
+        )
+        assert to_server_placeholders("SELECT '%s' || %s, 10 %% 3") == ("SELECT '%s' || $1, 10 % 3", 1)
+        assert to_server_placeholders("SELECT %(id)s") is None
+        # Sem parâmetros o psycopg2 não interpola: %% e %s chegam ao servidor como estão
+        assert to_server_placeholders("SELECT * FROM t WHERE s = '50%%' AND 10 %% 3 = 1", interpolated=False) == (
+            "SELECT * FROM t WHERE s = '50%%' AND 10 %% 3 = 1", 0
+        )
+
+# Testes do cache de statements
+class TestStatementCache:
+    def test_abaixo_do_limite_nao_prepara(self):
+        cache = StatementCache(prepare_threshold=3)
+        conn, cursor = nova_conexao()
+        for _ in range(2):
+            assert cache.resolve(conn, QUERY, ('ativo', 1)) == (QUERY, ('ativo', 1))
+        cursor.execute.assert_not_called()
+        assert cache.stats[QUERY] == {'executions': 2, 'prepared': False}
+
+    def test_statement_quente_vira_execute(self):
+        cache = StatementCache(prepare_threshold=2)
+        conn, cursor = nova_conexao()
+        cache.resolve(conn, QUERY, ('ativo', 1))
+        query, params = cache.resolve(conn, QUERY, ('ativo', 2))
+
+        assert query.startswith('EXECUTE stmt_')
+        assert query.endswith('(%s, %s)')
+        assert params == ('ativo', 2)
+        assert any(sql.startswith('PREPARE stmt_') and '$2' in sql for sql in executados(cursor))
+        assert cache.stats[QUERY]['prepared']
+
+    def test_prepara_uma_vez_por_conexao(self):
+        cache = StatementCache(prepare_threshold=1)
+        conn, cursor = nova_conexao()
+        outra, outro_cursor = nova_conexao()
+        for _ in range(3):
+            cache.resolve(conn, QUERY, ('ativo', 1))
+        cache.resolve(outra, QUERY, ('ativo', 1))
+
+        prepares = lambda c: [sql for sql in executados(c) if sql.startswith('PREPARE')]
+        assert len(prepares(cursor)) == 1
+        assert len(prepares(outro_cursor)) == 1
+
+    def test_sem_pool_nao_prepara(self):
+        cache = StatementCache(prepare_threshold=1)
+        conn, cursor = nova_conexao()
+        assert cache.resolve(conn, QUERY, ('ativo', 1), prepare=False) == (QUERY, ('ativo', 1))
+        cursor.execute.assert_not_called()
+
+    def test_falha_no_prepare_volta_ao_savepoint(self):
+        cache = StatementCache(prepare_threshold=1)
+        conn, cursor = nova_conexao()
+        cursor.execute.side_effect = lambda sql: (_ for _ in ()).throw(Error("tipo")) if sql.startswith('PREPARE') else None
+
+        assert cache.resolve(conn, QUERY, ('ativo', 1)) == (QUERY, ('ativo', 1))
+        assert 'ROLLBACK TO SAVEPOINT statement_cache' in executados(cursor)
+        # Statement marcado como não preparável: não tenta de novo
+        cursor.execute.reset_mock()
+        cache.resolve(conn, QUERY, ('ativo', 1))
+        cursor.execute.assert_not_called()
+
+    def test_limite_de_statements_preparados(self):
+        cache = StatementCache(prepare_threshold=1, max_prepared=1)
+        conn, _ = nova_conexao()
+        assert cache.resolve(conn, "SELECT 1", None)[0].startswith('EXECUTE')
+        assert cache.resolve(conn, "SELECT 2", None) == ("SELECT 2", None)
+
+    def test_query_sem_parametros_mantem_porcentagem(self):
+        cache = StatementCache(prepare_threshold=1)
+        conn, cursor = nova_conexao()
+        query = "SELECT * FROM fluxo_dados WHERE destino LIKE '50%%'"
+        assert cache.resolve(conn, query)[0].startswith('EXECUTE stmt_')
+        assert f"AS {query}" in executados(cursor)[1]
+        # Com parâmetros o mesmo texto é outro statement: %% já chega ao servidor como %
+        cache.resolve(conn, query, ())
+        assert any("AS SELECT * FROM fluxo_dados WHERE destino LIKE '50%'" in sql for sql in executados(cursor))
+
+    def test_tipos_dos_parametros(self):
+        assert parameter_types_match(('text', 'integer'), ('ativo', 1))
+        assert parameter_types_match(('integer',), (None,))
+        assert not parameter_types_match(('text',), (5,))
+        assert not parameter_types_match(('integer',), (1.5,))
+        assert not parameter_types_match(('integer',), (True,))
+
+    def test_parametro_sem_tipo_desaloca(self):
+        cache = StatementCache(prepare_threshold=1)
+        conn, cursor = nova_conexao()
+        cursor.fetchone.return_value = (['text', 'integer'],)
+        query = "SELECT %s AS x, %s + 1 AS y"
+
+        assert cache.resolve(conn, query, (5, 5)) == (query, (5, 5))
+        assert any(sql.startswith('DEALLOCATE stmt_') for sql in executados(cursor))
+        assert not cache.stats[query]['prepared']
+        # Não tenta preparar de novo
+        cursor.execute.reset_mock()
+        cache.resolve(conn, query, (5, 5))
+        cursor.execute.assert_not_called()
+
+    def test_params_de_outro_tipo_rodam_sem_execute(self):
+        cache = StatementCache(prepare_threshold=1)
+        conn, cursor = nova_conexao()
+        cursor.fetchone.return_value = (['text', 'integer'],)
+        assert cache.resolve(conn, QUERY, ('ativo', 1))[0].startswith('EXECUTE')
+        assert cache.resolve(conn, QUERY, ('ativo', 1.5)) == (QUERY, ('ativo', 1.5))
+
+    def test_threshold_invalido(self):
+        with pytest.raises(ValueError):
+            StatementCache(prepare_threshold=0)
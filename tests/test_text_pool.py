@@ -0,0 +1,59 @@
+import pytest
+import os
+import numpy as np
+from unittest.mock import patch
+from text_pool import PoolTextos, TIPOS_TEXTO
+
+
+@pytest.fixture
+def pool():
+    return PoolTextos(tamanho=20, seed=1).carregar()
+
+# Testes de geração do pool
+class TestPoolGeneration:
+    def test_gera_todos_os_tipos(self, pool):
+        assert set(pool.textos) == set(TIPOS_TEXTO)
+        for valores in pool.textos.values():
+            assert len(valores) == 20
+            assert len(set(valores)) == len(valores)
+
+    def test_tamanho_invalido(self):
+        with pytest.raises(ValueError):
+            PoolTextos(tamanho=0)
+
+    def test_reprodutivel_pela_seed(self, pool):
+        outro = PoolTextos(tamanho=20, seed=1).carregar()
+        for tipo in TIPOS_TEXTO:
+            assert list(pool.textos[tipo]) == list(outro.textos[tipo])
+
+# Testes de cache em disco
+class TestPoolCache:
+    def test_persiste_e_recarrega(self, tmp_path):
+        pool = PoolTextos(tamanho=10, seed=3, diretorio_cache=str(tmp_path)).carregar()
+        assert os.path.exists(pool.arquivo_cache)
+        assert 'pt_BR_3_10' in pool.arquivo_cache
+
+        with patch.object(PoolTextos, '_gerar_tipo') as mock_gerar:
+            recarregado = PoolTextos(tamanho=10, seed=3, diretorio_cache=str(tmp_path)).carregar()
+            mock_gerar.assert_not_called()
+        assert list(recarregado.textos['nome']) == list(pool.textos['nome'])
+
+    def test_sem_cache(self, pool):
+        assert pool.arquivo_cache is None
+
+# Testes de amostragem
+class TestPoolSampling:
+    def test_amostrar(self, pool):
+        amostra = pool.amostrar('frase', 1000, np.random.default_rng(0))
+        assert len(amostra) == 1000
+        assert set(amostra) <= set(pool.textos['frase'])
+
+    def test_amostrar_carrega_sob_demanda(self):
+        pool = PoolTextos(tamanho=5)
+        amostra = pool.amostrar('empresa', 3, np.random.default_rng(0))
+        assert len(amostra) == 3
+
+    def test_amostrar_categorico_igual_ao_amostrar(self, pool):
+        categorico = pool.amostrar_categorico('nome', 500, np.random.default_rng(7))
+        assert list(categorico.categories) == list(pool.textos['nome'])
+        assert list(categorico) == list(pool.amostrar('nome', 500, np.random.default_rng(7)))
@@ -0,0 +1,100 @@
+import json
+import os
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from faker import Faker
+
+
+"""Tipos de texto do pool e a chamada Faker que gera cada um"""
+
+TIPOS_TEXTO = {
+    'empresa': lambda fake: fake.company(),
+    'texto': lambda fake: fake.text(max_nb_chars=200),
+    'frase': lambda fake: fake.sentence(),
+    'nome': lambda fake: fake.name()
+}
+
+class PoolTextos:
+    """Pool de textos Faker pré-gerados, amostrados por sorteio vetorizado de índices.
+
+    O tamanho do pool define o equilíbrio entre diversidade de texto (mais
+    valores únicos) e custo de geração (uma chamada Faker por valor do pool,
+    e não por linha gerada).
+    """
+
+    def __init__(
+        self,
+        tamanho: int = 1000,
+        locale: str = 'pt_BR',
+        seed: int = 42,
+        diretorio_cache: Optional[str] = None
+    ):
+        if tamanho < 1:
+            raise ValueError("O tamanho do pool de textos deve ser positivo")
+
+        self.tamanho = tamanho
+        self.locale = locale
+        self.seed = seed
+        self.diretorio_cache = diretorio_cache
+        self.textos: Dict[str, np.ndarray] = {}
+
+    @property
+    def arquivo_cache(self) -> Optional[str]:
+        if self.diretorio_cache is None:
+            return None
+        return os.path.join(
+            self.diretorio_cache,
+            f'textos_{self.locale}_{self.seed}_{self.tamanho}.json'
+        )
+
+    """Gera os valores únicos de um tipo com uma instância Faker própria, isolada da seed global"""
+
+    def _gerar_tipo(self, tipo: str) -> np.ndarray:
+        fake = Faker(self.locale)
+        fake.seed_instance(f'{self.seed}-{tipo}')
+        gerar = TIPOS_TEXTO[tipo]
+
+        valores = {}
+        # Limita as tentativas: alguns provedores têm vocabulário menor que o pool
+        for _ in range(self.tamanho * 10):
+            valores.setdefault(gerar(fake), None)
+            if len(valores) == self.tamanho:
+                break
+        return np.asarray(list(valores), dtype=object)
+
+    """Carrega o pool do cache em disco ou gera e persiste os textos"""
+
+    def carregar(self) -> 'PoolTextos':
+        arquivo = self.arquivo_cache
+        if arquivo is not None and os.path.exists(arquivo):
+            with open(arquivo, encoding='utf-8') as f:
+                dados = json.load(f)
+            self.textos = {tipo: np.asarray(valores, dtype=object) for tipo, valores in dados.items()}
+            if set(self.textos) == set(TIPOS_TEXTO):
+                return self
+
+        self.textos = {tipo: self._gerar_tipo(tipo) for tipo in TIPOS_TEXTO}
+
+        if arquivo is not None:
+            os.makedirs(self.diretorio_cache, exist_ok=True)
+            with open(arquivo, 'w', encoding='utf-8') as f:
+                json.dump({tipo: valores.tolist() for tipo, valores in self.textos.items()}, f, ensure_ascii=False)
+        return self
+
+    """Sorteia num_registros valores de um tipo com um único sorteio de índices"""
+
+    def amostrar(self, tipo: str, num_registros: int, rng: np.random.Generator) -> np.ndarray:
+        if not self.textos:
+            self.carregar()
+        valores = self.textos[tipo]
+        return valores[rng.integers(0, len(valores), num_registros)]
+
+    """Como amostrar, mas devolve um Categorical sobre os valores do pool: um código por linha em vez de uma string"""
+
+    def amostrar_categorico(self, tipo: str, num_registros: int, rng: np.random.Generator) -> pd.Categorical:
+        if not self.textos:
+            self.carregar()
+        valores = self.textos[tipo]
+        return pd.Categorical.from_codes(rng.integers(0, len(valores), num_registros), categories=valores)